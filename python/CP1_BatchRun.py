@@ -0,0 +1,233 @@
+# Marine InVEST: Coastal Protection (Batch Runs of the Wave and Erosion Model)
+# Coded for ArcGIS 9.3, 10, 10.1
+#
+# usage: python CP1_BatchRun.py [-w WORKERS] [-e EVENTS] manifest output_directory
+#
+# Runs the wave, runup and erosion chain of CP1_WavesErosion for every row of
+# a manifest, without ArcGIS.  The manifest is a CSV file with a header row,
+# or a JSON list of objects, with for each run:
+#   Label: name of the run (and of its output folder)
+#   InputTable, CSProfile: model input file and cross-shore profile; relative
+#       paths start from the folder of the manifest
+#   Ho, To: wave height [m] and period [s], or Us, Ft, depth: wind speed
+#       [m/s], fetch [m] and water depth [m] to compute them from
+#   StormDur, S: storm duration [hours] and surge [m]
+#   Longshore, PropValue, Tr, disc, TimeHoriz (optional): valuation inputs,
+#       as in the toolbox dialog
+#   Events (optional): storm table (see CPf_Valuation.ReadEvents); -e gives
+#       the table of the runs that have none
+# Each run writes Results_<Label>.csv, Profile_<Label>.csv and
+# Messages_<Label>.txt in output_directory/<Label>; BatchSummary.csv gets one
+# line per run as soon as the run is done.
+# A run with a storm table is valued over the storm climate instead of a
+# single storm: Ho, To, S and Tr are not used, the retreats are left empty,
+# AvoidedDamage is the expected annual damage avoided by the habitats
+# (initial conditions against the management action) and EPV its present
+# value.  Events_<Label>.csv and EventsManagement_<Label>.csv hold the
+# per-event breakdown (CPf_Valuation.StormClimate) of both conditions.
+
+import sys, os, optparse, traceback
+import numpy as num
+import CPf_Site as Site
+import CPf_Erosion as Erosion
+import CPf_WaveKinematics as WaveKinematics
+import CPf_Valuation as Valuation
+import CPf_Workbook as Workbook
+
+Columns=['Label','Status','Backshore','Ho','To','S','Events','RetreatBare','RetreatInitial','RetreatManagement','AvoidedRetreat','AvoidedDamage','EPV','Message']
+ValuationInputs=['Longshore','PropValue','Tr','disc','TimeHoriz']
+ClimateInputs=['Longshore','PropValue','disc','TimeHoriz'] # valuation inputs of a storm climate run
+
+def ReadManifest(FileName):
+    """ runs of a CSV or JSON manifest, as a list of dictionaries """
+    if Workbook.Format(FileName)=='json':
+        Runs=Workbook.ImportJSON().load(open(FileName,"r"))
+    else:
+        Lines=[line for line in open(FileName,"r").read().split("\n") if line.strip() and not line.strip().startswith("#")]
+        Header=[val.strip() for val in Lines[0].split(",")]
+        Runs=[dict(zip(Header,[Workbook.ParseValue(val) for val in line.split(",")])) for line in Lines[1:]]
+    Labels=[str(Run.get('Label')) for Run in Runs]
+    for Label in Labels:
+        if Labels.count(Label)>1:
+            raise ValueError, "Run labels must be unique: "+Label
+    Base=os.path.dirname(os.path.abspath(FileName))
+    for Run in Runs:
+        Run['Label']=str(Run['Label'])
+        for name in ['InputTable','CSProfile']:
+            Run[name]=os.path.join(Base,str(Run[name]))
+        if Run.get('Events') is not None:
+            Run['Events']=os.path.join(Base,str(Run['Events']))
+    return Runs
+
+def Waves(Run):
+    """ wave height and period of a run, given or computed from the wind """
+    if Run.get('Ho') is not None and Run.get('To') is not None:
+        return float(Run['Ho']),float(Run['To'])
+    for name in ['Us','Ft','depth']:
+        if Run.get(name) is None:
+            raise ValueError, "Please provide values for either Wave Height and Wave Period, or Wind Speed, Fetch Distance and Water Depth."
+    H,T=WaveKinematics.WindWave(float(Run['Us']),float(Run['Ft']),float(Run['depth']))
+    return float(H),float(T)
+
+def Avoided(Run,Initial,Management):
+    """ retreat avoided by the habitats, avoided damage and expected present
+    value, as in CP1_WavesErosion; the values are NaN without valuation
+    inputs or if a retreat is negative """
+    E1=max(Initial,Management);E2=min(Initial,Management)
+    if E2<0: # the biophysical model did not run appropriately
+        return num.nan,num.nan,num.nan
+    for name in ValuationInputs:
+        if Run.get(name) is None:
+            return E1-E2,num.nan,num.nan
+    Dav=(E1-E2)*Run['Longshore']*Run['PropValue'] # avoided damage
+    EPV=1.0/Run['Tr']*Dav*Valuation.PresentValueFactor(Run['disc'],Run['TimeHoriz'])
+    return E1-E2,Dav,EPV
+
+def Climate(Run):
+    """ storm climate valuation of a run with a storm table
+
+    The retreats of all events are computed in one batch for both conditions
+    (initial and management action, see CPf_Erosion.ScenarioRetreat); a mud
+    profile depends on the surge, so there is one batch per surge.  Returns the sites, their messages, the
+    events, the CPf_Valuation.ClimateDamage() outputs of both conditions, the
+    expected annual damage avoided by the habitats and its present value.
+    """
+    for name in ClimateInputs:
+        if Run.get(name) is None:
+            raise ValueError, "A storm climate run needs a value for "+name
+    Events=Valuation.ReadEvents(Run['Events'])
+    StormDur=float(Run['StormDur']);n=len(Events['AEP'])
+    Initial,Management,Log=Site.Site(Run['InputTable'],Run['CSProfile'],float(Events['S'][0]),StormDur)
+    if Initial['Sand']: # the beach profile does not depend on the surge
+        Groups=[(num.arange(n),(Initial,Management))]
+    else:
+        Groups=[]
+        for S in num.unique(Events['S']):
+            if S==Events['S'][0]:
+                Cases=Initial,Management
+            else:
+                Cases=Site.Site(Run['InputTable'],Run['CSProfile'],float(S),StormDur)[:2]
+            Groups.append((num.nonzero(Events['S']==S)[0],Cases))
+    Retreats=[[num.zeros(n),num.zeros(n)] for Case in range(2)]
+    for Rows,Cases in Groups:
+        if 'StormDur' in Events:
+            Cases=[dict(Case,StormDur=Events['StormDur'][Rows]) for Case in Cases]
+        Pairs=Erosion.ScenarioRetreat(Cases[0],Cases[1],Events['Ho'][Rows],Events['To'][Rows],Events['S'][Rows],Cases[0]['A'])
+        for ii,(Bare,Hab) in enumerate(Pairs):
+            Retreats[ii][0][Rows]=Bare;Retreats[ii][1][Rows]=Hab
+    Value=float(Run['Longshore'])*float(Run['PropValue'])
+    Out=[Valuation.ClimateDamage(Events['AEP'],Bare,Hab,Value,float(Run['disc']),float(Run['TimeHoriz'])) for Bare,Hab in Retreats]
+    EAAD=abs(Out[1]['EADHabitat']-Out[0]['EADHabitat'])
+    return Initial,Management,Log,Events,Out,EAAD,EAAD*Valuation.PresentValueFactor(Run['disc'],Run['TimeHoriz'])
+
+def WriteRun(OutDir,Run,Row,Initial,Management,Log,Storms=None):
+    # per-run outputs: results, profile with the habitats, messages and the per-event breakdown of a storm climate run
+    Label=Run['Label']
+    RunDir=os.path.join(OutDir,Label)
+    if not os.path.isdir(RunDir):
+        os.makedirs(RunDir)
+    ResultFile=open(os.path.join(RunDir,"Results_"+Label+".csv"),"w")
+    for name in Columns[1:-1]:
+        ResultFile.write(name+","+str(Row[name])+"\n")
+    ResultFile.close()
+    if Initial is not None:
+        ProfileFile=open(os.path.join(RunDir,"Profile_"+Label+".csv"),"w")
+        ProfileFile.write("X,h,Habitat,HabitatManagement\n")
+        for x,h,v,vMA in zip(Initial['X'],Initial['h'],Initial['VegXloc'],Management['VegXloc']):
+            ProfileFile.write("%g,%g,%d,%d\n" % (x,h,v,vMA))
+        ProfileFile.close()
+    MessageFile=open(os.path.join(RunDir,"Messages_"+Label+".txt"),"w")
+    for Kind,Msg in Log:
+        MessageFile.write(Kind[3:]+": "+Msg.strip()+"\n")
+    MessageFile.close()
+    if Storms is not None:
+        Events,Out=Storms
+        for Name,Case in [("Events_",Out[0]),("EventsManagement_",Out[1])]:
+            Valuation.WriteEventTable(Case,os.path.join(RunDir,Name+Label+".csv"),Events.get('Name'))
+
+def RunSite(Args):
+    """ one run of the manifest; Args is (Run, OutDir).  Returns its line of
+    the summary table; errors are reported there and in its messages. """
+    Run,OutDir=Args
+    Row=dict([(name,"") for name in Columns])
+    Row['Label']=Run['Label']
+    Initial=Management=Storms=None;Log=[]
+    try:
+        if Run.get('Events') is not None:
+            Initial,Management,Log,Events,Out,EAAD,EPV=Climate(Run)
+            Storms=(Events,Out)
+            Row.update({'Status':'OK','Backshore':['mud','sand'][Initial['Sand']],'Events':len(Events['AEP']),'AvoidedDamage':EAAD,'EPV':EPV})
+        else:
+            Ho,To=Waves(Run)
+            S=float(Run['S'])
+            Initial,Management,Log=Site.Site(Run['InputTable'],Run['CSProfile'],S,float(Run['StormDur']))
+            (Bare,R1),(Bare2,R2)=Erosion.ScenarioRetreat(Initial,Management,Ho,To,S,Initial['A'])
+            R1=float(R1[0]);R2=float(R2[0])
+            Avoided1,Dav,EPV=Avoided(Run,R1,R2)
+            Row.update({'Status':'OK','Backshore':['mud','sand'][Initial['Sand']],'Ho':Ho,'To':To,'S':S,
+                'RetreatBare':float(Bare[0]),'RetreatInitial':R1,'RetreatManagement':R2,'AvoidedRetreat':Avoided1,'AvoidedDamage':Dav,'EPV':EPV})
+    except Exception, e:
+        Row['Status']='Error';Row['Message']=str(e).strip().replace(","," ").replace("\n"," ")
+        Log=Log+[("AddError",traceback.format_exc())]
+    WriteRun(OutDir,Run,Row,Initial,Management,Log,Storms)
+    return Row
+
+def Text(val):
+    # value in the summary table
+    if isinstance(val,float):
+        return "%g" % val
+    return str(val)
+
+def Batch(Runs,OutDir,Workers=None):
+    """ runs every run of the manifest on a process pool and writes the
+    summary table; Workers=None uses every processor, 1 runs here """
+    if not os.path.isdir(OutDir):
+        os.makedirs(OutDir)
+    Tasks=[(Run,OutDir) for Run in Runs]
+    Pool=None
+    if Workers<>1:
+        try:
+            import multiprocessing
+            Pool=multiprocessing.Pool(Workers)
+        except (ImportError,OSError):
+            Pool=None
+    if Pool is None:
+        Results=(RunSite(Task) for Task in Tasks)
+    else:
+        Results=Pool.imap(RunSite,Tasks) # in the order of the manifest
+
+    Rows=[]
+    SummaryFile=open(os.path.join(OutDir,"BatchSummary.csv"),"w")
+    SummaryFile.write(",".join(Columns)+"\n")
+    try:
+        for Row in Results:
+            SummaryFile.write(",".join([Text(Row[name]) for name in Columns])+"\n")
+            SummaryFile.flush()
+            Rows.append(Row)
+    finally:
+        SummaryFile.close()
+        if Pool is not None:
+            Pool.terminate()
+    return Rows
+
+def Main(argv):
+    Parser=optparse.OptionParser(usage="python %prog [options] manifest output_directory")
+    Parser.add_option("-w","--workers",type="int",default=None,help="number of processes (default: one per processor)")
+    Parser.add_option("-e","--events",default=None,help="storm table of the runs that have none in the manifest")
+    Options,Args=Parser.parse_args(argv)
+    if len(Args)<>2:
+        Parser.error("a manifest and an output directory are required")
+    Runs=ReadManifest(Args[0])
+    if Options.events:
+        for Run in Runs:
+            if Run.get('Events') is None:
+                Run['Events']=os.path.abspath(Options.events)
+    Rows=Batch(Runs,Args[1],Options.workers)
+    Failed=[Row['Label'] for Row in Rows if Row['Status']<>'OK']
+    print "%d runs, %d failed" % (len(Rows),len(Failed))
+    for Label in Failed:
+        print "  "+Label
+    return int(len(Failed)>0)
+
+if __name__=="__main__":
+    sys.exit(Main(sys.argv[1:]))
@@ -0,0 +1,106 @@
+# Marine InVEST: Coastal Protection (Import Time Benchmark)
+# Coded for ArcGIS 9.3, 10, 10.1
+#
+# usage: python CP1_ImportTime.py [-n REPEATS] [-o HISTORY.csv] [module ...]
+#
+# Startup cost of the toolbox scripts: each import is timed in a fresh
+# interpreter (so nothing is already loaded), REPEATS times, and the fastest
+# and median times are printed in milliseconds.  Without module names the
+# benchmark covers:
+#   - the startup imports of the CP1 scripts, i.e. every import statement at
+#     the top level of the script, before any parameter is read
+#   - each CPf_ module
+#   - the slow optional packages that are only imported when needed
+# With -o, the results are appended to a CSV file (date, Python version,
+# name, fastest, median) to follow the startup cost from one change to the
+# next.
+
+import sys, os, glob, datetime, optparse, subprocess
+import ast
+
+Folder=os.path.dirname(os.path.abspath(__file__))
+Scripts=['CP1_WavesErosion.py','CP1_ProfileGenerator.py']
+Optional=[('numpy','import numpy'),('scipy.integrate','import scipy.integrate'),('scipy.interpolate','import scipy.interpolate'),
+    ('matplotlib (CPf_Report.Pyplot)','import CPf_Report; CPf_Report.Pyplot()'),('numba','import numba')]
+
+def StartupImports(FileName):
+    """ import statements run by a script before it reads its parameters:
+    those at the top level and in top level try blocks """
+    Source=open(FileName,"r").read()
+    Lines=Source.split("\n")
+    Nodes=[]
+    for Node in ast.parse(Source).body:
+        if isinstance(Node,ast.TryExcept):
+            Nodes.extend(Node.body)
+        else:
+            Nodes.append(Node)
+    return "\n".join([Lines[Node.lineno-1].strip() for Node in Nodes if isinstance(Node,(ast.Import,ast.ImportFrom))])
+
+def Cases(Names):
+    # (name, code) of the imports to time
+    if Names:
+        return [(Name,"import "+Name) for Name in Names]
+    List=[(Script+" startup",StartupImports(os.path.join(Folder,Script))) for Script in Scripts]
+    for FileName in sorted(glob.glob(os.path.join(Folder,"CPf_*.py"))):
+        Name=os.path.splitext(os.path.basename(FileName))[0]
+        List.append((Name,"import "+Name))
+    return List+Optional
+
+def Time(Code):
+    """ seconds taken by Code in a new interpreter started in this folder,
+    or None if it fails (e.g. a missing optional package) """
+    Child="import time\nt=time.time()\nexec %r\nprint repr(time.time()-t)\n" % Code
+    Process=subprocess.Popen([sys.executable,"-c",Child],cwd=Folder,stdout=subprocess.PIPE,stderr=subprocess.PIPE)
+    Out,Err=Process.communicate()
+    if Process.returncode<>0:
+        return None
+    return float(Out.strip().split("\n")[-1])
+
+def Benchmark(Cases,Repeats=5):
+    """ (name, fastest, median) in milliseconds for each case; None times
+    for the cases that failed """
+    Results=[]
+    for Name,Code in Cases:
+        Times=[]
+        for ii in range(Repeats):
+            t=Time(Code)
+            if t is None:
+                Times=[];break
+            Times.append(1000*t)
+        if Times:
+            Times.sort()
+            Results.append((Name,Times[0],Times[len(Times)//2]))
+        else:
+            Results.append((Name,None,None))
+    return Results
+
+def Main(argv):
+    Parser=optparse.OptionParser(usage="python %prog [options] [module ...]")
+    Parser.add_option("-n","--repeats",type="int",default=5,help="fresh interpreters per import (default: 5)")
+    Parser.add_option("-o","--history",default=None,help="CSV file the results are appended to")
+    Options,Args=Parser.parse_args(argv)
+    Results=Benchmark(Cases(Args),max(Options.repeats,1))
+
+    Width=max([len(Name) for Name,Fast,Median in Results])
+    print "%s %10s %10s" % ("import".ljust(Width),"min [ms]","median")
+    for Name,Fast,Median in Results:
+        if Fast is None:
+            print "%s %10s" % (Name.ljust(Width),"failed")
+        else:
+            print "%s %10.1f %10.1f" % (Name.ljust(Width),Fast,Median)
+
+    if Options.history:
+        New=not os.path.exists(Options.history)
+        History=open(Options.history,"a")
+        if New:
+            History.write("Date,Python,Import,Min,Median\n")
+        Now=datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+        Version="%d.%d.%d" % sys.version_info[:3]
+        for Name,Fast,Median in Results:
+            if Fast is not None:
+                History.write("%s,%s,%s,%.1f,%.1f\n" % (Now,Version,Name,Fast,Median))
+        History.close()
+    return 0
+
+if __name__=="__main__":
+    sys.exit(Main(sys.argv[1:]))
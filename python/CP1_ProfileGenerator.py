@@ -5,13 +5,28 @@
 
 # import libraries
 import CPf_SignalSmooth as SignalSmooth
+import CPf_Lookup as Lookup
+import CPf_Workbook as Workbook
+import CPf_Profile as Profile
+import CPf_Geoprocessor as Geoprocessor
 import string, sys, os, time, datetime, shlex, shutil
 import fpformat, operator
-import arcgisscripting
 from math import *
 
 # create the geoprocessor object
-gp=arcgisscripting.create()
+gp=Geoprocessor.Create(Requires=[
+    "AddField_management","Append_management","Buffer_analysis",
+    "BuildRasterAttributeTable_management","CalculateField_management",
+    "CopyFeatures_management","CostAllocation_sa",
+    "CreateFeatureClass_management","CreateFolder_management","CreateObject",
+    "Delete_management","DeleteField_management","Expand_sa",
+    "ExtractValuesToPoints_sa","FeatureToRaster_conversion","GetCount",
+    "GetCount_management","InsertCursor","Intersect_analysis",
+    "ListFeatureClasses","ListFields","MakeFeatureLayer_management",
+    "Merge_management","MultipartToSinglepart_management",
+    "Project_management","Reclassify_sa","RefreshCatalog","SearchCursor",
+    "Select_analysis","SelectLayerByLocation_management","Union_analysis",
+    "UpdateCursor"])
 gp.AddMessage("\nChecking and preparing inputs...")
 
 # set output handling
@@ -39,29 +54,23 @@ msgMatplotlibNo = "Matplotlib extension (version 1.0 or newer) is required to ru
 # import modules
 try:
     import numpy as num
+    from numpy import any, argmax, average, diff, mean, sort, sum, tanh, transpose # the NumPy functions pylab used to provide
 except:
     gp.AddError(msgNumPyNo)
     raise Exception
+import math
 
+# SciPy and matplotlib are slow to import: they are only looked for here, and
+# imported where they are used (matplotlib in CPf_Report, for the plots)
+import imp
 try:
-    from scipy.interpolate import interp1d
-    from scipy import optimize
+    imp.find_module("scipy")
 except:
     gp.AddError(msgSciPyNo)
     raise Exception
 
 try:
-    from win32com.client import Dispatch
-except:
-    gp.AddError(msgWin32ComNo)
-    raise Exception
-
-try:
-    from matplotlib import *
-    from pylab import *
-    from matplotlib.font_manager import FontProperties
-    fontP = FontProperties()
-    fontP.set_size('small')
+    imp.find_module("matplotlib")
 except:
     gp.AddError(msgMatplotlibNo)
     raise Exception
@@ -334,15 +343,6 @@ try:
         
         return begHABx,finHABx
     
-    def Indexed(x,value): # locates index of point in vector x that has closest value as variable value
-        mylist=abs(x-value)    
-        if isinstance(x,num.ndarray):
-            mylist=mylist.tolist()
-        minval=min(mylist)
-        ind=[i for i,v in enumerate(mylist) if v==minval]
-        ind=ind[0]
-        return ind
-
     def SlopeModif(X,Y,SlopeMod,Offx,Shorex): 
         # this function replaces/adds linear portion to an existing profile 
         # inputs are values of bathy profile along and X axis, as well as information for the linear approx: slope, offshore and shoreward extent
@@ -355,9 +355,11 @@ try:
         
         X=num.array(X)
         Y=num.array(Y)
+        Ascending=Lookup.IsSorted(X) # checked once; lookups on an ascending X bisect
         # store initial values of X and Y
         Xo=X
         Yo=Y
+        from scipy.interpolate import interp1d
         F=interp1d(Xo,Yo)    
     
         # slope 
@@ -367,20 +369,20 @@ try:
             m=0.0
         
         # locate footprint of change
-        ShorePos=Indexed(X,Shorex) # locate position of shoreward point for linear approx
+        ShorePos=Lookup.Indexed(X,Shorex,Ascending) # locate position of shoreward point for linear approx
         if X[ShorePos]>Shorex: # if shoreward bound. outside of existing X vector, add more points
-            X=num.arange(Shorex,X[-1]+1,1)
+            X=num.arange(Shorex,X[-1]+1,1);Ascending=1
             ShorePos=0 # new start point of linear approx
             
-        OffPos=Indexed(X,Offx) # locate position of offshore point for linear approx
+        OffPos=Lookup.Indexed(X,Offx,Ascending) # locate position of offshore point for linear approx
         if X[OffPos]<Offx: # if new offshore bound. outside of existing, add more points
-            X=num.arange(X[0],Offx+1,1)
+            X=num.arange(X[0],Offx+1,1);Ascending=1
             OffPos=len(X)-1 # new end point of linear approx
         
         # create new bathy profile
         Y=X*0+Yo[-1] # new vector Y that will be used to create the linear approx
-        temp1=Indexed(X,Xo[0])
-        temp2=Indexed(X,Xo[-1])
+        temp1=Lookup.Indexed(X,Xo[0],Ascending)
+        temp2=Lookup.Indexed(X,Xo[-1],Ascending)
         Y[temp1:temp2+1]=F(X[temp1:temp2+1]) # map old values of X on new vector Y
         Y[ShorePos:OffPos+1]=m*(X[ShorePos:OffPos+1]-X[OffPos])+Y[OffPos] # create linear approximation in range that user defined
     
@@ -882,11 +884,8 @@ try:
     try:
         # read Excel file inputs
         gp.AddMessage("\nReading Erosion Potential Excel file inputs...")
-        xlApp=Dispatch("Excel.Application")
-        xlApp.Visible=0
-        xlApp.DisplayAlerts=0
-        xlApp.Workbooks.Open(InputTable)
-        cell=xlApp.Worksheets("ModelInput")
+        Book=Workbook.Open(InputTable)
+        cell=Book.Worksheets("ModelInput")
         # sediment
         Diam=cell.Range("e15").Value # sediment diameter (mm)
         A=cell.Range("e17").Value # sediment scale factor
@@ -904,13 +903,9 @@ try:
             DuneCrest=cell.Range("j15").Value # 1) yes,2) no,3) don't know
             
             if Slope==0 :  # user didn't enter enough data
-                xlApp.ActiveWorkbook.Close(SaveChanges=0)
-                xlApp.Quit()
                 gp.AddError('You did not enter beach information')
                 raise Exception
             if BermCrest==0  and DuneCrest==0:  # user didn't enter enough data
-                xlApp.ActiveWorkbook.Close(SaveChanges=0)
-                xlApp.Quit()
                 gp.AddError('You did not enter beach information')
                 raise Exception
             m=1.0/Slope # bed slope
@@ -977,13 +972,7 @@ try:
             ExcelHabIDList,HabAbbrevList=zip(*Hab1Zip)
             HabAbbrevList = list(HabAbbrevList) # convert from tuple to list        
         
-        # save changes and close Excel file
-        xlApp.ActiveWorkbook.Close(SaveChanges=0) # don't save changes
-        xlApp.Quit()
-        
     except:
-        xlApp.ActiveWorkbook.Close(SaveChanges=0)
-        xlApp.Quit()
         gp.AddError(msgReadExcel)
         raise Exception
 
@@ -1244,10 +1233,8 @@ try:
             
             
             # create txt for bathy portion
-            file=open(BathyProfile,"w")
-            for i in range(0,len(Dmeas)):
-                file.writelines(str(Dx[i])+"\t"+str(Dmeas[i])+"\n")
-            file.close()
+            Profile.Write(BathyProfile,Dx[:len(Dmeas)],Dmeas)
+            Profile.Write(Profile.Binary(BathyProfile),Dx[:len(Dmeas)],Dmeas)
 
             # create final point transect file
             if TransectChoice == 1:
@@ -1300,7 +1287,7 @@ try:
             TempX=num.array(Dx)
 
             # remove portions offshore that are shallower than average depth above deepest point
-            LocDeep=Indexed(TempY,min(TempY)) # locate deepest point
+            LocDeep=Lookup.Indexed(TempY,min(TempY)) # locate deepest point
             davg=mean(TempY);davg=average([davg,min(TempY)])
             out=num.nonzero(TempY<davg);out=out[0] # locate points deeper than average depth
 
@@ -1427,8 +1414,8 @@ try:
 
                     # read 'Profile_Pts_Hab' to array 'ProfileHabArray'
                     ProfileHabLength = gp.GetCount_management(Profile_Pts_Hab)
-                    ProfileHabList = np.zeros(ProfileHabLength*8, dtype=np.float64)
-                    ProfileHabArray = np.reshape(ProfileHabList, (ProfileHabLength,8))
+                    ProfileHabList = num.zeros(ProfileHabLength*8, dtype=num.float64)
+                    ProfileHabArray = num.reshape(ProfileHabList, (ProfileHabLength,8))
                     cur=gp.UpdateCursor(Profile_Pts_Hab)
                     row=cur.Next()
                     j=0
@@ -1459,41 +1446,41 @@ try:
                     TempX=temp[0]
                     TempY=temp[1]
                     MG1=temp[2];MR1=temp[3];SG1=temp[4];DN1=temp[5];CR1=temp[6];OT1=temp[7]
-                    MG1[find(MG1==-999)]=0;SG1[find(SG1==-999)]=0;MR1[find(MR1==-999)]=0
-                    DN1[find(DN1==-999)]=0;CR1[find(CR1==-999)]=0;OT1[find(OT1==-999)]=0
+                    MG1[Lookup.Find(MG1==-999)]=0;SG1[Lookup.Find(SG1==-999)]=0;MR1[Lookup.Find(MR1==-999)]=0
+                    DN1[Lookup.Find(DN1==-999)]=0;CR1[Lookup.Find(CR1==-999)]=0;OT1[Lookup.Find(OT1==-999)]=0
                     MG2=MG1*0;MR2=MR1*0;SG2=SG1*0;DN2=DN1*0;CR2=CR1*0;OT2=OT1*0;
                     
                     # mangrove, marsh and dune: switch beginning and end indices b/c they're on land
                     finMGx1,begMGx1=LocateHabitat(TempX,MG1);begMGx2=num.array([]);finMGx2=num.array([]);
                     finMGx1=finMGx1[::-1];begMGx1=begMGx1[::-1]; # switch order to go sea to land
-                    temp1=find(finMGx1>0);temp2=find(begMGx1>0); # if there are points in the water, make a note
+                    temp1=Lookup.Find(finMGx1>0);temp2=Lookup.Find(begMGx1>0); # if there are points in the water, make a note
                     if len(temp1)+len(temp2):
                         gp.AddWarning("......you have mangrove in subtidal areas.  Please double check your habitat input layer.");mangwater=1;
                     del temp1,temp2
                     
                     finMRx1,begMRx1=LocateHabitat(TempX,MR1);begMRx2=num.array([]);finMRx2=num.array([]);
                     finMRx1=finMRx1[::-1];begMRx1=begMRx1[::-1]; # switch order to go sea to land
-                    temp1=find(finMRx1>0);temp2=find(begMRx1>0); # if there are points in the water, make a note
+                    temp1=Lookup.Find(finMRx1>0);temp2=Lookup.Find(begMRx1>0); # if there are points in the water, make a note
                     if len(temp1)+len(temp2):
                         gp.AddWarning("......you have marsh in subtidal areas.  Please double check your habitat input layer.");marwater=1;
                     del temp1,temp2
 
                     begDNx1,finDNx1=LocateHabitat(TempX,DN1);begDNx2=num.array([]);finDNx2=num.array([]);
                     finDNx1=finDNx1[::-1];begDNx1=begDNx1[::-1]; # switch order to go sea to land
-                    temp1=find(finDNx1>0);temp2=find(begDNx1>0); # if there are points in the water, make a note
+                    temp1=Lookup.Find(finDNx1>0);temp2=Lookup.Find(begDNx1>0); # if there are points in the water, make a note
                     if len(temp1)+len(temp2):
                         gp.AddWarning("......you have a dune in subtidal areas.  Please double check your habitat input layer.");dunewater=1;
                     del temp1,temp2
                     
                     # seagrass and corals are in subtidal areas
                     begSGx1,finSGx1=LocateHabitat(TempX,SG1);begSGx2=num.array([]);finSGx2=num.array([]);
-                    temp1=find(finSGx1<0);temp2=find(begSGx1<0); # if there are points on land, make a note
+                    temp1=Lookup.Find(finSGx1<0);temp2=Lookup.Find(begSGx1<0); # if there are points on land, make a note
                     if len(temp1)+len(temp2):
                         gp.AddWarning("......you have seagrass on land.  Please double check your habitat input layer.");seagwater=1;
                     del temp1,temp2
                     
                     begCRx1,finCRx1=LocateHabitat(TempX,CR1);begCRx2=num.array([]);finCRx2=num.array([]);
-                    temp1=find(finCRx1<0);temp2=find(begCRx1<0); # if there are points on land, make a note
+                    temp1=Lookup.Find(finCRx1<0);temp2=Lookup.Find(begCRx1<0); # if there are points on land, make a note
                     if len(temp1)+len(temp2):
                         gp.AddWarning("......you have a coral reef on land.  Please double check your habitat input layer.");coralwater=1;
                     del temp1,temp2
@@ -1510,18 +1497,12 @@ try:
         elif ProfileQuestion=="(2) No, but I will upload a cross-shore profile":
             gp.AddMessage("\nRetrieving your profile...")
             # read in user's cross-shore profile
-            TextData=open(CSProfile,"r") 
-            Dx=[];Dmeas=[]
-            for line in TextData.read().strip("\n").split("\n"):
-                linelist=[float(s) for s in line.split("\t")] # split the list by tab delimiter
-                Dx.append(linelist[0])
-                Dmeas.append(linelist[1])
-            TextData.close()
-
+            Dx,Dmeas=Profile.Read(CSProfile) # tab separated text, or .npy/.npz
             Dmeas=num.array(Dmeas)
             Dx=num.array(Dx)
             Lx=len(Dx)
             if Lx > 5:
+                from scipy.interpolate import interp1d
                 F=interp1d(Dx,Dmeas);
                 xd=num.arange(Dx[0],Dx[-1],1)
                 lx=len(xd)
@@ -1573,7 +1554,7 @@ try:
 
         if BackHelp==1: # create backshore profile for beach systems 
             # add foreshore from MLLW to Berm Elevation
-            MLLW_loc=Indexed(yd,-MSL) #Locate MLLW on profile
+            MLLW_loc=Lookup.Indexed(yd,-MSL) #Locate MLLW on profile
             x,y=SlopeModif(xd,yd,Slope,xd[MLLW_loc],-2000)
             AbvBerm=num.nonzero(y> BermCrest)
             x=num.delete(x,AbvBerm[0],None)
@@ -1606,7 +1587,7 @@ try:
         raise Exception
     
     # locate X=0 at y=0
-    DistZero=xd[Indexed(yd,0)]
+    DistZero=xd[Lookup.Indexed(yd,0)]
     xd=xd-DistZero # x=0 is now located at y=0
 
 
@@ -1616,86 +1597,22 @@ try:
 
     try:
         gp.AddMessage("...plotting profile and creating outputs\n")
+        import CPf_Report as Report # imports matplotlib, only now
         Fig3=0;Fig2=0;Fig6=0
         # plot and save
-        figure(1)
-        ax=subplot(111);plot(xd,yd,xd,yd*0,'k',xd,yd*0-MSL,'--k',xd,yd*0+HT-MSL,'-.k',linewidth=2);grid()
-        box=ax.get_position();
-        ax.set_position([box.x0, box.y0, box.width*1, box.height])
-        ax.legend(('Created Profile','Mean Sea Level','Mean Low Water','Mean High Water'),prop=fontP,loc='upper left',ncol=2)
-        ylabel('Depth [m]',size='large',weight='bold')
-        xlabel('Cross-Shore Distance [m]',size='large',weight='bold')
-        axvline(x=0, linewidth=1, color='k')
-        xlim(xd[-1],xd[0])
-        title('Created Profile',size='large',weight='bold')
-        savefig(html_txt+"CreatedProfile.png",dpi=(640/8));
-
-        Xzoom=Indexed(yd,1) # locate point 1m abv MSL
-        figure(2)
-        if ProfileQuestion=="(1) Yes": # profile was cut with GIS
-            # zoom on nearshore area
-            ax=subplot(211);plot(Dx-DistZero,Dmeas-MSL,'b',xd,yd,'r',linewidth=2);grid()
-            box=ax.get_position();
-            ax.set_position([box.x0, box.y0, box.width*1, box.height])
-            ax.legend(('Initial Profile','Created Profile'), prop=fontP,loc='upper left',ncol=2)
-            title('Bathymetry-Smoothing Factor='+str(SmoothParameter),size='large',weight='bold')
-            xlim(Dx[-1],-MSL)
-            ylabel('Depth [m]',size='large',weight='bold')
-            
-        elif ProfileQuestion=="(2) No, but I will upload a cross-shore profile":
-            # zoom on nearshore area
-            ax=subplot(211);plot(Dx,Dmeas-MSL,'b',xd,yd,'r',linewidth=2);grid()
-            box=ax.get_position();
-            ax.set_position([box.x0, box.y0, box.width*1, box.height])
-            ax.legend(('Initial Profile','Created Profile'), prop=fontP,loc='upper left',ncol=2)
-            title('Bathymetry-Smoothing Factor='+str(SmoothParameter),size='large',weight='bold')
-            xlim(max(Dx[-1],xd[-1]),0);ylim(Dmeas[0]*1.1,MSL)
-            ylabel('Depth [m]',size='large',weight='bold')
-    
-        elif ProfileQuestion=="(3) No, but please create a theoretical profile for me":
-            # zoom on nearshore area
-            ax=subplot(211);plot(xd,yd,'r',linewidth=2);grid()
-            box=ax.get_position();
-            ax.set_position([box.x0, box.y0, box.width*1, box.height])
-            ax.legend(('Created Profile'), prop=fontP,loc='upper left',ncol=2)
-            title('Bathymetry-Smoothing Factor='+str(SmoothParameter),size='large',weight='bold')
-            xlim(Dx[-1],-MSL)
-            ylabel('Depth [m]',weight='bold',size='large')
-                 
+        Report.CreatedProfile(html_txt+"CreatedProfile.png",xd,yd,MSL,HT)
+
+        Xzoom=Lookup.Indexed(yd,1) # locate point 1m abv MSL
         if (any(SlopeM+OffX+ShoreX) or BackHelp==1) and Xzoom>0: # plot point abv MLLW
-            Xzoom=Indexed(yd,-MSL-5) # locate point 5m below MLLW                
-            ax=subplot(212);plot(xd[0:Xzoom],yd[0:Xzoom],xd[0:Xzoom],yd[0:Xzoom]*0,'k',xd[0:Xzoom],yd[0:Xzoom]*0-MSL,'--k',xd[0:Xzoom],yd[0:Xzoom]*0+HT-MSL,'-.k',linewidth=2);grid()
-            ax.legend(('Created Profile','Mean Sea Level','Mean Low Water','Mean High Water'),prop=fontP,loc='upper left',ncol=2)
-            box=ax.get_position();
-            ax.set_position([box.x0, box.y0, box.width*1, box.height])
-            xlabel('Cross-Shore Distance [m]',weight='bold')
-            ylabel('Elevation [m]',size='large',weight='bold')
-            xlim(xd[Xzoom],xd[0]);
-            if yd[0]<yd[Xzoom]:
-                ylim(yd[0]*1.1,yd[Xzoom]*1.1)
-            else:
-                ylim(yd[Xzoom]*1.1,yd[0]*1.1)
-                
-            axvline(x=0, linewidth=1, color='k')
-            title('Foreshore and Backshore Areas',size='large',weight='bold')
-        savefig(html_txt+"ZoomIns.png",dpi=(640/8))
+            Xzoom=Lookup.Indexed(yd,-MSL-5) # locate point 5m below MLLW
+        else:
+            Xzoom=None
+        Report.ZoomIns(html_txt+"ZoomIns.png",ProfileQuestion,xd,yd,Dx,Dmeas,DistZero,MSL,HT,SmoothParameter,Xzoom)
  
         if ProfileQuestion=="(1) Yes": # profile was cut with GIS
             Dorig=num.array(Dorig);
             Xorig=num.array(Xorig)
-            fig=figure(3)
-            ax=subplot(211);plot(Xorig,Dorig,Xorig,Tempy1,'r',Xorig,Dorig*0,'k',linewidth=2);grid()
-            ax.legend(('Raw Profile','Extracted Bathy'), prop=fontP,loc='upper left',ncol=2)            
-            box=ax.get_position();
-
-            ax.set_position([box.x0, box.y0, box.width*1, box.height])
-            title('DEM Profile',size='large',weight='bold')
-            ylabel('Elevation [m]',size='large',weight='bold')
-            xlabel('Cross-Shore Distance [m]',size='large',weight='bold')
-            xlim(Xorig[-1],Xorig[0])
-            axvline(x=0, linewidth=1, color='k')
-            extent = ax.get_window_extent().transformed(fig.dpi_scale_trans.inverted()) # save subplot
-            savefig(html_txt+"GISProfile.png", bbox_inches=extent.expanded(1.8, 1.4),dpi=(640/8))
+            Report.GISProfile(html_txt+"GISProfile.png",Xorig,Dorig,Tempy1)
 
         # plot vegetation 
         if ProfileQuestion=="(1) Yes":
@@ -1710,106 +1627,15 @@ try:
                 # remove points that are too deep (mostly lack of data) and resample to dx=1
                 out=num.nonzero(TempY<-500);out=out[0] # points that are in ok water depths
                 TempY[out]=0
-                leg=1; # only one legend
-                
-                fig=figure(4);HabCount=1
-                if any(MG1):
-                    ax=subplot(HabPrst,1,HabCount); temp1=TempY+nan;temp2=TempY+nan
-                    la=num.nonzero(MG1);temp1[la]=TempY[la]
-                    la=num.nonzero(MG2);temp2[la]=TempY[la]
-                    plot(TempX,TempY);plot(TempX-shift,temp1,'or',markersize=15);grid()
-                    xlim(TempX[-1],TempX[0])     
-                    if leg:
-                        ax.legend(('Raw Profile (GIS)','Habitat'), prop=fontP,loc='upper left',ncol=2);leg=0
-                    ylabel('Mangrove',size='large',weight='bold');HabCount=HabCount+1
-                    axvline(x=0, linewidth=1, color='k')
-                if any(DN1):
-                    ax=subplot(HabPrst,1,HabCount); temp1=TempY+nan;temp2=TempY+nan
-                    la=num.nonzero(DN1);temp1[la]=TempY[la]
-                    la=num.nonzero(DN2);temp2[la]=TempY[la]
-                    plot(TempX,TempY,xd,yd,'r');plot(TempX-shift,temp1,'or',markersize=15);grid()
-                    xlim(TempX[-1],TempX[0])                    
-                    if leg:
-                        ax.legend(('Raw Profile (GIS)','Created Profile','Habitat'), prop=fontP,loc='upper left',ncol=2);leg=0
-                    box=ax.get_position();
-                    ax.set_position([box.x0, box.y0, box.width*1, box.height])
-                    ylabel('Dunes',size='large',weight='bold');HabCount=HabCount+1
-                    axvline(x=0, linewidth=1, color='k')
-                if any(MR1):
-                    ax=subplot(HabPrst,1,HabCount); temp1=TempY+nan;temp2=TempY+nan
-                    la=num.nonzero(MR1);temp1[la]=TempY[la]
-                    la=num.nonzero(MR2);temp2[la]=TempY[la]
-                    plot(TempX,TempY,xd,yd,'r');plot(TempX-shift,temp1,'or',markersize=15);grid()
-                    xlim(TempX[-1],TempX[0])                    
-                    if leg:
-                        ax.legend(('Raw Profile (GIS)','Created Profile','Habitat'), prop=fontP,loc='upper left',ncol=2);leg=0
-                    ylabel('Marsh',size='large',weight='bold');HabCount=HabCount+1
-                    box=ax.get_position();
-                    ax.set_position([box.x0, box.y0, box.width*1, box.height])
-                    axvline(x=0, linewidth=1, color='k')
-                if any(SG1):
-                    ax=subplot(HabPrst,1,HabCount); temp1=TempY+nan;temp2=TempY+nan
-                    la=num.nonzero(SG1);temp1[la]=TempY[la]
-                    la=num.nonzero(SG2);temp2[la]=TempY[la]
-                    plot(TempX,TempY,xd,yd,'r');plot(TempX,temp1,'or',markersize=15);grid()
-                    xlim(TempX[-1],TempX[0])                    
-                    if leg:
-                        ax.legend(('Raw Profile (GIS)','Created Profile','Habitat'), prop=fontP,loc='upper left',ncol=2);leg=0
-                    ylabel('Seagrass',size='large',weight='bold');HabCount=HabCount+1
-                    box=ax.get_position();
-                    ax.set_position([box.x0, box.y0, box.width*1, box.height])
-                    axvline(x=0, linewidth=1, color='k')
-                if any(CR1):
-                    ax=subplot(HabPrst,1,HabCount); temp1=TempY+nan;temp2=TempY+nan
-                    la=num.nonzero(CR1);temp1[la]=TempY[la]
-                    la=num.nonzero(CR2);temp2[la]=TempY[la]
-                    plot(TempX,TempY,xd,yd,'r');plot(TempX-shift,temp1,'or',markersize=15);grid()
-                    xlim(TempX[-1],TempX[0])                    
-                    if leg:
-                        ax.legend(('Raw Profile (GIS)','Created Profile','Habitat'), prop=fontP,loc='upper left',ncol=2);leg=0
-                    ylabel('Coral',size='large',weight='bold');HabCount=HabCount+1
-                    box=ax.get_position();
-                    ax.set_position([box.x0, box.y0, box.width*1, box.height])
-                    axvline(x=0, linewidth=1, color='k')
-                if any(OT1):
-                    ax=subplot(HabPrst,1,HabCount); temp1=TempY+nan;temp2=TempY+nan
-                    la=num.nonzero(OT1);temp1[la]=TempY[la]
-                    la=num.nonzero(OT2);temp2[la]=TempY[la]
-                    plot(TempX,TempY,xd,yd,'r');plot(TempX-shift,temp1,'or',markersize=15);grid()
-                    xlim(TempX[-1],TempX[0])                    
-                    if leg:
-                        ax.legend(('Raw Profile (GIS)','Created Profile','Habitat'), prop=fontP,loc='upper left',ncol=2);leg=0
-                    ylabel('Other',size='large',weight='bold');HabCount=HabCount+1
-                    box=ax.get_position();
-                    ax.set_position([box.x0, box.y0, box.width*1, box.height])
-                xlabel('Cross-Shore Distance [m]',weight='bold')
-                axvline(x=0, linewidth=1, color='k')
-                savefig(html_txt+"HabFigure.png",dpi=(640/8))
+
+                # one panel per habitat: name, habitat codes, shift of the habitat points, created profile drawn
+                Panels=[('Mangrove',MG1,shift,0),('Dunes',DN1,shift,1),('Marsh',MR1,shift,1),('Seagrass',SG1,0,1),('Coral',CR1,shift,1),('Other',OT1,shift,1)]
+                Panels=[Panel for Panel in Panels if any(Panel[1])]
+                Report.HabitatProfile(html_txt+"HabFigure.png",TempX,TempY,xd,yd,Panels)
 
         # fetch and wind rose plots
         if FetchQuestion=='(1) Yes':
-            # plot fetch on rose    
-            radians=(num.pi/180.0)
-            pi=num.pi
-            theta16=[0*radians,22.5*radians,45*radians,67.5*radians,90*radians,112.5*radians,135*radians,157.5*radians,180*radians,202.5*radians,225*radians,247.5*radians,270*radians,292.5*radians,315*radians,337.5*radians]
-            rc('grid',color='#316931',linewidth=1,linestyle='-')
-            rc('xtick',labelsize=0)
-            rc('ytick',labelsize=15)
-            # force square figure and square axes looks better for polar,IMO
-            width,height=matplotlib.rcParams['figure.figsize']
-            size=min(width,height)
-            # make a square figure
-            fig1=plt.figure()
-            ax=fig1.add_axes([0.1,0.1,0.8,0.8],polar=True,axisbg='w')
-            # plot
-            bars=ax.bar(theta16,FetchList,width=.35,color='#ee8d18',lw=1)
-            for r,bar in zip(FetchList,bars):
-                bar.set_facecolor(cm.YlOrRd(r/10.))
-                bar.set_alpha(.65)
-            ax.set_rmax(max(FetchList)+1)
-            grid(True)
-            ax.set_title("Average Fetch (meters)",fontsize=15,weight='bold')
-            plt.savefig(Fetch_Plot,dpi=(640/8))
+            Report.Rose(Fetch_Plot,FetchList,"Average Fetch (meters)")
 
         if WW3_Pts:
             # modify 'Wi10' list so it conforms to rose order
@@ -1818,34 +1644,11 @@ try:
                 Wi10List.append(Wi10[i])
             for i in range(len(dirList)-1,3,-1):
                 Wi10List.append(Wi10[i])
-            # plot wind on rose    
-            radians=(num.pi/180.0)
-            pi=num.pi
-            theta16=[0*radians,22.5*radians,45*radians,67.5*radians,90*radians,112.5*radians,135*radians,157.5*radians,180*radians,202.5*radians,225*radians,247.5*radians,270*radians,292.5*radians,315*radians,337.5*radians]
-            rc('grid',color='#316931',linewidth=1,linestyle='-')
-            rc('xtick',labelsize=0)
-            rc('ytick',labelsize=15)
-            # force square figure and square axes looks better for polar,IMO
-            width,height=matplotlib.rcParams['figure.figsize']
-            size=min(width,height)
-            # make a square figure
-            fig1=plt.figure()
-            ax=fig1.add_axes([0.1,0.1,0.8,0.8],polar=True,axisbg='w')
-            # plot
-            bars=ax.bar(theta16,Wi10List,width=.35,color='#ee8d18',lw=1)
-            for r,bar in zip(Wi10List,bars):
-                bar.set_facecolor(cm.YlOrRd(r/10.))
-                bar.set_alpha(.65)
-            ax.set_rmax(max(Wi10List)+1)
-            grid(True)
-            ax.set_title("Wind Speed (meters/second)",fontsize=15,weight='bold')
-            plt.savefig(Wind_Plot,dpi=(640/8))
+            Report.Rose(Wind_Plot,Wi10List,"Wind Speed (meters/second)")
 
         # create txt profile for created portion
-        file=open(CreatedProfile,"w")
-        for i in range(0,len(yd)):
-            file.writelines(str(xd[i])+"\t"+str(yd[i])+"\n")
-        file.close()
+        Profile.Write(CreatedProfile,xd[:len(yd)],yd)
+        Profile.Write(Profile.Binary(CreatedProfile),xd[:len(yd)],yd) # memory-mapped by the Waves and Erosion model
 
         # return projected point to geographic (unprojected)
         gp.Project_management(LandPoint,LandPoint_Geo,geo_projection)
@@ -1957,10 +1760,18 @@ try:
                 htmlfile.write("We indicate below the type, start and end locations of the habitats at your site.  Distances are referenced in meters from the shoreline.\
                                 Positive distances are oriented seaward and negative distances landward. In other words, if a distance is positive, your habitat is in the water, and if a distance is negative, your habitat in on land.<p>")
                 
-                # open Excel sheet to write extent of habitats
-                xlApp=Dispatch("Excel.Application")
-                xlApp.Workbooks.Open(InputTable)
-                cell=xlApp.Worksheets("ModelInput")
+                # open Excel sheet (or JSON/CSV parameter file) to write extent of habitats
+                if Book.Format in ['json','csv']:
+                    cell=Book.Worksheets("ModelInput")
+                else:
+                    try:
+                        from win32com.client import Dispatch
+                    except:
+                        gp.AddError(msgWin32ComNo)
+                        raise Exception
+                    xlApp=Dispatch("Excel.Application")
+                    xlApp.Workbooks.Open(InputTable)
+                    cell=xlApp.Worksheets("ModelInput")
                 
                 if any(MG1):
                     htmlfile.write("You have a mangrove field that starts and ends at the locations indicated below:<br>")
@@ -2106,8 +1917,11 @@ try:
                         
                 htmlfile.write("</td></tr></table>")
                
-                xlApp.ActiveWorkbook.Close(SaveChanges=1) # save changes in Excel
-                xlApp.Quit()
+                if Book.Format in ['json','csv']:
+                    Book.Save()
+                else:
+                    xlApp.ActiveWorkbook.Close(SaveChanges=1) # save changes in Excel
+                    xlApp.Quit()
             
             elif HabDirectory and 'HabCount' not in locals():
                 htmlfile.write("<hr><H2><u>Location of Natural Habitats</u></H2>")
@@ -4,13 +4,23 @@
 # 10/19/12
 
 import sys, os, string, time, datetime
-import CPf_SignalSmooth as SignalSmooth
+import CPf_WaveKinematics as WaveKinematics
+import CPf_WaveTransform as WaveTransform
+import CPf_Erosion as Erosion
+import CPf_Coral as Coral
+import CPf_Lookup as Lookup
+import CPf_Breakwater as Breakwater
+import CPf_Valuation as Valuation
+import CPf_Workbook as Workbook
+import CPf_InputCache as InputCache
+import CPf_Profile as Profile
+import CPf_Site as Site
+import CPf_Geoprocessor as Geoprocessor
 from math import *
 import fpformat, operator
-import arcgisscripting
 
 # create the geoprocessor object
-gp=arcgisscripting.create()
+gp=Geoprocessor.Create()
 gp.AddMessage("\nChecking and preparing inputs...")
 
 # set output handling
@@ -33,34 +43,27 @@ msgPlotErosion = "\nError plotting erosion."
 msgHTMLOutputs = "\nError generating HTML outputs."
 msgNumPyNo = "NumPy extension is required to run the Coastal Protection Model.  Please consult the Marine InVEST FAQ for instructions on how to install."
 msgSciPyNo = "SciPy extension is required to run the Coastal Protection Model.  Please consult the Marine InVEST FAQ for instructions on how to install."
-msgWin32ComNo = "PythonWin extension is required to run the Coastal Protection Model.  Please consult the Marine InVEST FAQ document for instructions on how to install."
 msgMatplotlibNo = "Matplotlib extension (version 1.0 or newer) is required to run the Coastal Protection Model.  Please consult the Marine InVEST FAQ document for instructions on how to install."
 
 # import modules
 try:
 	import numpy as num
+	from numpy import any, diff, floor, isnan, mean, nonzero, pi, sinh, sqrt # the NumPy functions pylab used to provide
 except:
 	gp.AddError(msgNumPyNo)
 	raise Exception
 
+# SciPy and matplotlib are slow to import: they are only looked for here, and
+# imported where they are used (matplotlib in CPf_Report, for the plots)
+import imp
 try:
-	from scipy.interpolate import interp1d
-	from scipy.special import erf
-	from scipy import optimize
-	from scipy.integrate import trapz
+	imp.find_module("scipy")
 except:
 	gp.AddError(msgSciPyNo)
 	raise Exception
 
 try:
-	from win32com.client import Dispatch
-except:
-	gp.AddError(msgWin32ComNo)
-	raise Exception
-
-try:
-	from matplotlib import *
-	from pylab import *
+	imp.find_module("matplotlib")
 except:
 	gp.AddError(msgMatplotlibNo)
 	raise Exception
@@ -193,65 +196,16 @@ try:
 		gp.AddError(msgCheckInputs)
 		raise Exception
 
-	def gradient(f,z): # calculates the differences between consecutive entries in a list (f) scaled by a factor (z) 
-		length=len(f)
-		df=length*[0.0]
-		df[0]=(f[1]-f[0])/z
-		for i in range(1,length-1):
-			df[i]=(f[i+1]-f[i-1])/(2.0*z)
-		df[length-1]=(f[length-1]-f[length-2])/z
-		return df
-
-	def Indexed(x,value): # locates index of point in vector x (type = array) that has closest value as variable value
-		mylist=abs(x-value);    
-		if isinstance(x,num.ndarray):
-			mylist=mylist.tolist()
-		minval=min(mylist)
-		ind=[i for i,v in enumerate(mylist) if v==minval]
-		ind=ind[0]
-		return ind
-
-	def FindRootKD(fun,a,b,tol=1e-16):
-		a=float(a);b=float(b)
-		assert(sign(fun(a)) != sign(fun(b)))
-		c=(a+b)/2
-		while math.fabs(fun(c))>tol:
-			if a==c or b==c:
-				break
-			if sign(fun(c))==sign(fun(b)):
-				b=c
-			else:
-				a=c
-			c=(a+b)/2
-		return c
-
 	# calculates the wave number given an angular frequency (sigma) and local depth (dh)
 	def iterativek(sigma,dh):
-		g=9.81;rho=1024;
-		kestimated=(sigma**2)/(g*(sqrt(tanh((sigma**2)*dh/g)))) # intial guess for the wave number
-		tol = 1 # initialize the tolerence that will determine if the iteration should continue
-		count=0
-		while (tol>0.00005) and (count<1000): # iterate over the dispersion relationship
-			count += 1
-			kh=kestimated*dh
-			tol = kestimated-(sigma**2)/(tanh(kh)*g) # check the difference between the previous and the current iterations
-			kcalculated=(sigma**2)/(tanh(kh)*g) # k values for current iteration
-			kestimated=kcalculated # set the current value for k as the previous value for the subsequent iteration
-		qk=kcalculated # return the value of k when accuracy tolerance is achieved
+		qk=WaveKinematics.WaveNumber(sigma,dh) # same solver as the wave models use for whole depth arrays
 		return qk
 
 	# wind-wave generation
 	def WindWave(U,F,d):
 		# calculates wind waves which are a function of Wind Speed (U), Fetch length (F), and local depth (d) using empirical equations
-		g=9.81;rho=1024;
-		ds=g*d/U**2.0;Fs=g*F/U**2.0
-		A=tanh(0.343*ds**1.14)
-		B=tanh(4.14e-4*Fs**0.79/A)
-		H=0.24*U**2/g*(A*B)**0.572 # wave height
-		A=tanh(0.1*ds**2.01)
-		B=tanh(2.77e-7*Fs**1.45/A)
-		T=7.69*U/g*(A*B)**0.18 # wave period
-		return H,T
+		H,T=WaveKinematics.WindWave(U,F,d) # shared with the batch runs
+		return float(H),float(T)
 
 	# wave transformation model
 	def WaveModel(X,h,Ho,To,Etao,Roots,Trunk,Canop,VegXloc,TrigRange):
@@ -266,291 +220,27 @@ try:
 		# VegXloc: A vector with a numeric code indicate what (if any) natural habitat is present at the cross-shore location.  0 = No Habitat, 1 = Mangrove, 2 = Marsh, 3 = Seagrass, 4 = Coral, 5 = Oyster Reef
 		# TrigRange: Defines the segment of the cross-shore domain where a given model is valid.  Where VegXloc is 0, 1, 2, or 3 the same wave model is applicable.  If a coral or oyster reef is present the model is interupted, the reef model is run and that output is carried onto the next segment of the cross-shore domain.
 
-		# constants
-		g=9.81;rho=1024.0;B=1.0;Beta=0.05;Cf=0.01
-
-		# extract vegetation characteristics
-		NRoots=Roots[0];dRoots=Roots[1];hRoots=Roots[2]
-		NTrunk=Trunk[0];dTrunk=Trunk[1];hTrunk=Trunk[2]
-		NCanop=Canop[0];dCanop=Canop[1];hCanop=Canop[2]
-
-		# input characteristics in segment of interest
-		NRoots=NRoots[TrigRange];dRoots=dRoots[TrigRange];hRoots=hRoots[TrigRange]
-		NTrunk=NTrunk[TrigRange];dTrunk=dTrunk[TrigRange];hTrunk=hTrunk[TrigRange]
-		NCanop=NCanop[TrigRange];dCanop=dCanop[TrigRange];hCanop=hCanop[TrigRange]
-		Vegxloc=VegXloc[TrigRange];
-		lx=len(X);dx=abs(X[1]-X[0])
-
-		# create relative depth values for roots, trunk and canopy
-		alphr=hRoots/h;alpht=hTrunk/h;alphc=hCanop/h
-		for kk in range(lx): 
-			if alphr[kk]>1:
-				alphr[kk]=1;alpht[kk]=0;alphc[kk]=0 # roots only
-			elif alphr[kk]+alpht[kk]>1:
-				alpht[kk]=1-alphr[kk];alphc[kk]=0 # roots and trunk
-			elif alphr[kk]+alpht[kk]+alphc[kk]>1:
-				alphc[kk]=1-alphr[kk]-alpht[kk] # roots, trunk and canopy
-
-		# drag coefficent for vegetation; mangrove and marsh win over seagrass if they overlap
-		CdVeg=num.arange(0.0,lx,dx)*0.0;
-		CdVeg[Vegxloc==1]=1 # mangrove        
-		CdVeg[Vegxloc==2]=0.1 # marsh        
-		CdVeg[Vegxloc==3]=0.1 # seagrass
-		CdVeg=SignalSmooth.smooth(num.array(CdVeg),len(CdVeg)*0.01,'hanning') 
-
-		# initialize vectors for wave model
-		H=lx*[0.0]; # RMS Wave Height
-		Db=lx*[0.0];Df=lx*[0.0];Dveg=lx*[0.0] 
-		k=lx*[0.0];L=lx*[0.0] # wave number; wave length
-		C=lx*[0.0];n=lx*[0.0];Cg=lx*[0.0] # wave celerity; shoaling factor group velocity (C*n)
-		Er=lx*[0.0]; Ef=lx*[0.0]; Br=lx*[0.0] # roller energy; energy flux; roller flux 
-		Hs=lx*[0.0]; Etas=lx*[0.0] # wave height; setup in the absence of vegetation
-		Dbs=lx*[0.0]; Dfs=lx*[0.0]; Ers=lx*[0.0] # dissipation due to breaking; dissipation due to bottom friction; roller energy
-		Efs=lx*[0.0]; Brs=lx*[0.0] # energy flux in the absence of veg; roller flux in the absence of vegetation
-
-		# wave parameter at 1st grid pt
-		ash=[h[ii] for ii in range(lx)] # ash is same as h, but is now an independent variable
-		fp=1.0/To; sig=2.0*pi*fp # wave frequency and angular frequency
-		k[0]=iterativek(sig,h[0]) # wave number at 1st grid pt
-		L[0]=2.0*pi/k[0] # wave length @ 1st grid pt
-		n[0]=0.5*(1+(2.0*k[0]*h[0]/sinh(2.0*k[0]*h[0]))) # to compute Cg at 1st grid pt
-		C[0]=L[0]/To;Cg[0]=C[0]*n[0] # phase and group velocity at 1st grid pt
-		So=Ho/L[0] # deep water wave steepness
-		Gam=0.5+0.4*num.tanh(33.0*So) # Gam from Battjes and Stive 85 (as per Alsina & Baldock)
-
-		# RMS wave height at first grid point; assume no dissipation occurs
-		H[0]=Ho/sqrt(2.0) # transform significant wave height to rms wave height         
-		Ef[0]=0.125*rho*g*H[0]**2*Cg[0];Efs[0]=Ef[0];Hs[0]=H[0] # energy flux @ 1st grid pt
-
-		# begin wave model 
-		for xx in range(lx-1): # transform waves,take MWL into account
-			# wave in presence of veg.
-			Ef[xx]=0.125*rho*g*(H[xx]**2.0)*Cg[xx] # Ef at (xx)      
-			Ef[xx+1]=Ef[xx]-dx*(Db[xx]+Df[xx]+Dveg[xx]) # Ef at [xx+1] (subtract dissipation due to: breaking, bottom friction, and vegetation)
-
-			# phase and group velocity
-			k[xx+1]=iterativek(sig,h[xx+1]) # compute wave number
-			n[xx+1]=0.5*(1.0+(2.0*k[xx+1]*h[xx+1]/sinh(2.0*k[xx+1]*h[xx+1])))
-			C[xx+1]=sig/k[xx+1];Cg[xx+1]=C[xx+1]*n[xx+1] # phase and group velocity
-
-			# roller info
-			H[xx+1]=num.sqrt(8.0*Ef[xx+1]/(rho*g*Cg[xx+1])) # wave height at [xx+1]      
-			Br[xx+1]=Br[xx]-dx*(g*Er[xx]*sin(Beta)/C[xx]-0.5*Db[xx]) # roller flux
-			Er[xx+1]=Br[xx+1]/(C[xx+1]) # roller energy
-
-			# dissipation due to brkg            
-			Var=0.25*rho*g*fp*B
-			Hb=0.88/k[xx+1]*tanh(Gam*k[xx+1]*h[xx+1]/0.88)                
-			temp1=((Hb/H[xx+1])**3.0+1.5*Hb/H[xx+1])*num.exp(-(Hb/H[xx+1])**2.0)
-			if isreal(H[xx+1]): temp2=0.75*num.sqrt(pi)*(1-erf(Hb/H[xx+1]))
-			else: temp2=0
-			Db[xx+1]=Var*H[xx+1]**3/h[xx+1]*(temp1+temp2) # dissipation due to brkg
-
-			# dissipation due to bot friction 
-			Df[xx+1]=rho*Cf/(12.0*pi)*(2.0*pi*fp*H[xx+1]/sinh(k[xx+1]*h[xx+1]))**3.0 
-
-			# dissipation due to vegetation
-			V1=3*sinh(k[xx+1]*alphr[xx+1]*h[xx+1])+sinh(k[xx+1]*alphr[xx+1]*h[xx+1])**3 # roots
-			V2=(3*sinh(k[xx+1]*(alphr[xx+1]+alpht[xx+1])*h[xx+1])-3*sinh(k[xx+1]*alphr[xx+1]*h[xx+1])+
-				sinh(k[xx+1]*(alphr[xx+1]+alpht[xx+1])*h[xx+1])**3-
-				sinh(k[xx+1]*alphr[xx+1]*h[xx+1])**3) # trunk
-			V3=(3*sinh(k[xx+1]*(alphr[xx+1]+alpht[xx+1]+alphc[xx+1])*h[xx+1])
-				-3*sinh(k[xx+1]*(alphr[xx+1]+alpht[xx+1])*h[xx+1])+
-				sinh(k[xx+1]*(alphr[xx+1]+alpht[xx+1]+alphc[xx+1])*h[xx+1])**3-
-				sinh(k[xx+1]*(alphr[xx+1]+alpht[xx+1])*h[xx+1])**3) # canopy
-
-			CdDN=CdVeg[xx+1]*(dRoots[xx+1]*NRoots[xx+1]*V1+dTrunk[xx+1]*NTrunk[xx+1]*V2+dCanop[xx+1]*NCanop[xx+1]*V3)
-			temp1=rho*CdDN*(k[xx+1]*g/(2.0*sig))**3.0/(2.0*sqrt(pi))
-			temp3=(3.0*k[xx+1]*cosh(k[xx+1]*h[xx+1])**3)
-			Dveg[xx+1]=temp1/temp3*H[xx+1]**3 # dissipation due to vegetation
-
-			# wave in absence of vegetation
-			Hs[xx+1]=H[xx+1]
-			if sum(Vegxloc)<>0: # compute if there's vegetation (time saver)
-				Efs[xx]=0.125*rho*g*(Hs[xx]**2.0)*Cg[xx] # Ef at (xx)      
-				Efs[xx+1]=Efs[xx]-dx*(Dbs[xx]+Dfs[xx]) # Ef at [xx+1] 
-
-				Hs[xx+1]=num.sqrt(8.0*Efs[xx+1]/(rho*g*Cg[xx+1])) # wave height at [xx+1]      
-				Brs[xx+1]=Brs[xx]-dx*(g*Ers[xx]*sin(Beta)/C[xx]-0.5*Dbs[xx]) # roller flux
-				Ers[xx+1]=Brs[xx+1]/(C[xx+1]) # roller energy
-
-				temp1=((Hb/Hs[xx+1])**3.0+1.5*Hb/Hs[xx+1])*num.exp(-(Hb/Hs[xx+1])**2.0)
-				if isreal(Hs[xx+1]):  temp2=0.75*num.sqrt(pi)*(1-erf(Hb/Hs[xx+1]))
-				else: temp2=0
-				Dbs[xx+1]=Var*Hs[xx+1]**3/h[xx+1]*(temp1+temp2) # dissipation due to brkg
-
-				Dfs[xx+1]=rho*Cf/(12.0*pi)*(2.0*pi*fp*Hs[xx+1]/sinh(k[xx+1]*h[xx+1]))**3.0 # dissipation due to bottom friction 
-
-		Ew=lx*[0.0];Ew=[0.125*rho*g*(H[i]**2.0) for i in range(lx)] # energy density
-		Ews=lx*[0.0];Ews=[0.125*rho*g*(Hs[i]**2.0) for i in range(lx)] # energy density in the absence of vegetation
-
-		# force on plants if they were emergent; take a portion if plants occupy only portion of wc
-		Fxgr=[rho*g*CdVeg[i]*dRoots[i]*NRoots[i]*H[i]**3.0*k[i]/(12.0*pi*tanh(k[i]*ash[i])) for i in range(lx)]
-		Fxgt=[rho*g*CdVeg[i]*dTrunk[i]*NTrunk[i]*H[i]**3.0*k[i]/(12.0*pi*tanh(k[i]*ash[i])) for i in range(lx)]
-		Fxgc=[rho*g*CdVeg[i]*dCanop[i]*NCanop[i]*H[i]**3.0*k[i]/(12.0*pi*tanh(k[i]*ash[i])) for i in range(lx)]
-		fx=[-alphr[i]*Fxgr[i]-alpht[i]*Fxgt[i]-alphc[i]*Fxgc[i] for i in range(lx)] # scale by height of indiv. elements
-
-		# estimate MWS
-		dx=1;Xi=num.arange(X[0],X[-1]+dx,dx);lxi=len(Xi) # use smaller dx to get smoother result
-		F=interp1d(X,ash);ashi=F(Xi);
-		F=interp1d(X,k);ki=F(Xi);
-		F=interp1d(X,Ew);Ewi=F(Xi);
-		F=interp1d(X,Er);Eri=F(Xi);
-		F=interp1d(X,fx);fxi=F(Xi);
-		Sxx=lxi*[0.0];Rxx=lxi*[0.0];Eta=lxi*[0.0];O=0;
-
-		while O<8: # iterate until convergence of water level
-			hi=[ashi[i]+Eta[i] for i in range(lxi)] # water depth        
-			Sxx=[0.5*Ewi[i]*(4.0*ki[i]*hi[i]/sinh(2.0*ki[i]*hi[i])+1.0) for i in range(lxi)] # wave radiation stress
-			Rxx=[2.0*Eri[i] for i in range(lxi)] # roller radiation stress
-			# estimate MWL along Xshore transect
-			temp1=[Sxx[i]+Rxx[i] for i in range(lxi)]
-			temp2=gradient(temp1,dx)
-
-			Integr=[(-temp2[i]+fxi[i])/(rho*g*hi[i]) for i in range(lxi)]
-			Eta[0]=Etao
-			Eta[1]=Eta[0]+Integr[0]*dx
-			for i in range(1,lxi-2):
-				Eta[i+1]=Eta[i-1]+Integr[i]*2*dx
-			Eta[lxi-1]=Eta[lxi-2]+Integr[lxi-1]*dx
-			O=O+1
-		F=interp1d(Xi,Eta);Eta=F(X);Etas=F(X);
-
-		if sum(Vegxloc)<>0: # compute if there's vegetation (time saver)
-			Sxxs=lx*[0.0]; Rxxs=lx*[0.0];Etas=lx*[0.0];dx=1;O=0;
-			while O<5: # iterate until convergence of water level
-				h=[ash[i]+Etas[i] for i in range(lx)] # water depth        
-				Sxxs=[0.5*Ews[i]*(4.0*k[i]*h[i]/sinh(2.0*k[i]*h[i])+1.0) for i in range(lx)] # wave radiation stress
-				Rxxs=[2.0*Ers[i] for i in range(lx)] # roller radiation stress
-				# estimate MWL along Xshore transect
-				temp1=[Sxxs[i]+Rxxs[i] for i in range(lx)]
-				temp2=gradient(temp1,dx)
-
-				Integr=[(-temp2[i])/(rho*g*h[i]) for i in range(lx)]
-				Etas[0]=Etao
-				Etas[1]=Eta[0]+Integr[0]*dx
-				for i in range(1,lx-2):
-					Etas[i+1]=Etas[i-1]+Integr[i]*2*dx
-				Etas[lx-1]=Etas[lx-2]+Integr[lx-1]*dx
-				O=O+1    
-
-		Ubot=[pi*H[ii]/(To*sinh(k[ii]*h[ii])) for ii in range(lx)] # bottom velocity
-		H=[H[ii]*sqrt(2) for ii in range(lx)]
-		Hs=[Hs[ii]*sqrt(2) for ii in range(lx)]
-
-		# Ds1=num.array(H); Ds2=num.array(Hs)
-		Ds1=gradient(Ef,dx);Ds1=[-Ds1[ii] for ii in range(len(Ef))]
-		if sum(Vegxloc)<>0: # compute if there's vegetation (time saver)
-			Ds2=gradient(Efs,dx);Ds2=[-Ds2[ii] for ii in range(len(Efs))]
-		else:
-			Ds2=Ds1;
+		# vegetated and bare bed waves come from one pass of the transformation model; the setup grid is WaveTransform.SetupGrid
+		Plants=WaveTransform.Vegetation(h,Roots,Trunk,Canop,VegXloc,TrigRange)
+		Out=WaveTransform.Transform(X,h,Ho,To,Etao,0.01,Plants,None)
+		H,Eta,Hs,Etas,Ubot=[Out[val][0] for val in ['H','Eta','Hs','Etas','Ubot']]
 
-		# Diss=mean(Ds1[find(num.array(Dveg)<>0)]**3/(Ds2[find(num.array(Dveg)<>0)]**3)) # dissipation difference
-		Diss=[Ds1,Ds2] # dissipation difference
+		Diss=[Out['Ds'][0],Out['Dss'][0]] # dissipation difference
 		if num.isnan(mean(Diss)) == True:
-			Diss=[Ds1*0.0,Ds1*0.0]
+			Diss=[Diss[0]*0.0,Diss[0]*0.0]
 
 		return H,Eta,Hs,Etas,Diss,Ubot # returns: wave height, wave setup, wave height w/o veg., wave setup w/o veg, wave dissipation, bottom wave orbital velocity over the cross-shore domain
 
 	# a wave model independent of habitat with dissipation only due to breaking and bottom friction 
 	def WaveModelSimple(X,h,Ho,To,Cf):
-		# constants
-		g=9.81;rho=1024.0;B=1.0;Beta=0.05
-		lx=len(X);dx=X[1]-X[0];
-
 		if diff(h).all()==0:
 			flat=1;
 		else:
 			flat=0
 
-		# initialize vectors for wave model
-		H=lx*[0.0];Eta=lx*[0.0];L=lx*[0.0]
-		Db=lx*[0.0];Df=lx*[0.0]
-		Er=lx*[0.0];Ef=lx*[0.0];Br=lx*[0.0]
-		C=lx*[0.0];n=lx*[0.0];Cg=lx*[0.0]
-		k=lx*[0.0];
-
-		# wave parameter at 1st grid pt
-		ash=[h[ii] for ii in range(lx)] # ash is same as h, but is now an independent variable
-		fp=1.0/To; sig=2.0*pi*fp
-		H[0]=Ho/sqrt(2.0) # transform significant wave height to rms wave height
-		Ef[0]=0.125*rho*g*H[0]**2*Cg[0] # energy flux @ 1st grid pt
-		k[0]=iterativek(sig,h[0]) # wave number at 1st grid pt
-		L[0]=2.0*pi/k[0] # wave length @ 1st grid pt
-		n[0]=0.5*(1+(2.0*k[0]*h[0]/sinh(2.0*k[0]*h[0]))) # to compute Cg at 1st grid pt
-		C[0]=L[0]/To;Cg[0]=C[0]*n[0] # phase and group velocity at 1st grid pt
-
-		So=Ho/L[0] # deep water wave steepness
-		Gam=0.5+0.4*num.tanh(33.0*So) # Gam from Battjes and Stive 85 (as per Alsina & Baldock)
-
-		# begin wave model 
-		for xx in range(lx-1): # transform waves,take MWL into account
-			Ef[xx]=0.125*rho*g*(H[xx]**2.0)*Cg[xx] # Ef at (xx)      
-			Ef[xx+1]=Ef[xx]-dx*(Db[xx]+Df[xx]) # Ef at [xx+1] 
-
-			k[xx+1]=iterativek(sig,h[xx+1])
-			n[xx+1]=0.5*(1.0+(2.0*k[xx+1]*h[xx+1]/sinh(2.0*k[xx+1]*h[xx+1])))
-			C[xx+1]=sig/k[xx+1];Cg[xx+1]=C[xx+1]*n[xx+1] # phase and group velocity
-
-			H[xx+1]=num.sqrt(8.0*Ef[xx+1]/(rho*g*Cg[xx+1])) # wave height at [xx+1]      
-			Br[xx+1]=Br[xx]-dx*(g*Er[xx]*sin(Beta)/C[xx]-0.5*Db[xx]) # roller flux
-			Er[xx+1]=Br[xx+1]/(C[xx+1]) # roller energy
-
-			Var=0.25*rho*g*fp*B
-			Hb=0.88/k[xx+1]*tanh(Gam*k[xx+1]*h[xx+1]/0.88)                
-			temp1=((Hb/H[xx+1])**3.0+1.5*Hb/H[xx+1])*num.exp(-(Hb/H[xx+1])**2.0)
-			if isreal(H[xx+1]): temp2=0.75*num.sqrt(pi)*(1-erf(Hb/H[xx+1]))
-			else: temp2=0
-			Db[xx+1]=Var*H[xx+1]**3/h[xx+1]*(temp1+temp2) # dissipation due to brkg
-
-			if flat:
-				Er[xx+1]=0.0
-				Db[xx+1]=0.0            
-
-			Df[xx+1]=1.0*rho*Cf/(12.0*pi)*(2.0*pi*fp*H[xx+1]/sinh(k[xx+1]*h[xx+1]))**3.0 # dissipation due to bottom friction 
-
-		Ew=lx*[0.0];Ew=[0.125*rho*g*(H[i]**2.0) for i in range(lx)]
-
-		# estimate MWS
-		val=1.0;dell=1.0;O=0.0 # for setup calculations
-		Sxx=lx*[0.0]; Rxx=lx*[0.0]
-
-		while dell>1e-10: # iterate until convergence of water level
-			val1=val
-			h=[ash[i]+Eta[i] for i in range(lx)] # water depth
-
-			Sxx=[0.5*Ew[i]*(4.0*k[i]*h[i]/sinh(2.0*k[i]*h[i])+1.0) for i in range(lx)] # wave radiation stress
-			Rxx=[2.0*Er[i] for i in range(lx)] # roller radiation stress
-			# estimate MWL along Xshore transect
-			Tem=[Sxx[i]+Rxx[i] for i in range(lx)]
-			Temp=gradient(Tem,dx)
-			Terms=[-Temp[i] for i in range(lx)]
-			Integr=[Terms[i]/(rho*g*h[i]) for i in range(lx)]
-			if flat:
-				Eta[0]=0
-			else:
-				Eta[0]=-0.125*H[0]**2.0*k[0]/sinh(2.0*k[0]*h[0])
-			Eta[1]=Eta[0]+Integr[0]*dx
-
-			for i in range(1,lx-2):
-				Eta[i+1]=Eta[i-1]+Integr[i]*2*dx
-
-			Eta[lx-1]=Eta[lx-2]+Integr[lx-1]*dx
-
-			Temp_eta=gradient(Eta,dx)
-			valn=[Temp[i]+rho*g*h[i]*Temp_eta[i] for i in range(lx)]
-			valn[lx-3]=0;valn[lx-2]=0;valn[lx-1]=0
-			dell1=[valn[i]-val1 for i in range(lx)]
-			dell1me=sum(dell1)/len(dell1)
-			dell1mx=max(dell1)
-
-			O=O+1
-			if O<5: dell=13
-			else: dell=max(dell1me,dell1mx)
-
-
-		H=[H[ii]*sqrt(2) for ii in range(lx)]
-		return H,Eta # returns wave height and setup over the cross-shore domain
+		# setup at the first grid point is the setdown under the incident wave
+		Out=WaveTransform.Transform(X,h,Ho,To,None,Cf,None,'profile',flat)
+		return Out['H'][0],Out['Eta'][0] # returns wave height and setup over the cross-shore domain
 
 	# wave attenuation by coral reefs
 	def WavesCoral(Ho,AlphF ,AlphR,he,hr,Wr,Cf,dx):
@@ -560,55 +250,19 @@ try:
 			Kp=mean(kp) # assume waves break on face
 			ha=hr
 		else:
-			# reef profile
-			Xreef=num.arange(0.0,10000.0,dx)
-			Yreef=AlphR*Xreef-he
-			loc=find(Yreef>-hr)
-			Yreef[loc]=-hr # reef profile
-
 			D=To*sqrt(g/hr) # relative subm
-			Lo=g*To**2.0/(2.0*pi)
 			if D==8: # first check for breaking location
-				if Ho>=0.5*he:
-					BrkFace=1; # wave break on face
-					loc=Indexed(TanAlph,AlphF)
-					Kp=kp[loc] # reef shape factor
-
-					ha=hr # rep. depth
-
-				elif Ho>=0.5*hr:
-					BrkRim=1 # wave break on rim
-					loc=Indexed(TanAlph,AlphR)
-					Kp=kp2[loc] # reef shape factor
-
-					db=0.259*Ho*(tan(AlphR)**2*Ho/Lo)**(-0.17) # breaking wave height
-					if db<hr: db=hr
-					elif db>he: db=he
-
-					xs=(2+1.1*Ho/he)*To*(g*he)**.5 # surf zone width
-					loc1=Indexed(Yreef,-db); # start brkg
-					loc2=Indexed(Xreef,Xreef[loc1]+xs) # end brkg
-					ha=-average(Yreef[loc1:loc2+1]) # rep. depth
+				Frac=0.5
 			else:  # second check for breaking location
-				if Ho>=0.4*he:
-					BrkFace=1 # wave break on face
-					loc=Indexed(TanAlph,AlphF)
-					Kp=kp[loc] # reef shape factor
-					ha=hr
-
-				elif Ho>=0.4*hr:
-					BrkRim=1 # wave break on rim
-					loc=Indexed(TanAlph,AlphR)
-					Kp=kp2[loc] # reef shape factor
-
-					db=0.259*Ho*(tan(AlphR)**2.0*Ho/Lo)**(-0.17) # breaking wave height
-					if db<hr: db=hr
-					elif db>he: db=he
-
-					xs=(2+1.1*Ho/he)*To*(g*he)**.5 # surf zone width
-					loc1=Indexed(Yreef,-db) # start brkg
-					loc2=Indexed(Xreef,Xreef[loc1]+xs) # end brkg
-					ha=-average(Yreef[loc1:loc2+1]) # rep. depth
+				Frac=0.4
+			if Ho>=Frac*he:
+				BrkFace=1 # wave break on face
+				Kp=Coral.ShapeFactor(ReefTable,AlphF,'kp') # reef shape factor
+				ha=hr # rep. depth
+			elif Ho>=Frac*hr:
+				BrkRim=1 # wave break on rim
+				Kp=Coral.ShapeFactor(ReefTable,AlphR,'kp2') # reef shape factor
+				ha=Coral.RimDepth(Ho,To,AlphR,he,hr,dx) # rep. depth over the surf zone on the rim
 
 		# wave transformation on top of coral reef
 		Etar=0.0;delta=10;
@@ -636,55 +290,11 @@ try:
 
 	# wave attenuation by reef breakwater
 	def BreakwaterKt(Hi,To,hi,hc,Cwidth,Bwidth,OysterReefType):
-		Lo=9.81*To**2.0/(2.0*pi)
-		Rc=hc-hi # depth of submergence
-		Boff=(Bwidth-Cwidth)/2.0 # base dif on each side
-		ksi=(hc/Boff)/sqrt(Hi/Lo)
-
-		if hc/hi<0.5: # the reef is too submerged
-			Kt=1
-			gp.AddError("\nYour reef is too small and we cannot compute the wave transmission coefficient. Please increase your reef height so it's closer to the water surface, or assume that it does not protect your shoreline.")
-			raise Exception
-		if hc/hi>1.25: # the reef is too submerged
-			Kt=1
-			gp.AddError("\nYour reef is too high above the water level and we cannot compute the wave transmission coefficient. Please assume that no waves pass through and the transmission coefficient is zero.")
+		Kt,Status=Breakwater.Kt(Hi,To,hi,hc,Cwidth,Bwidth,OysterReefType)
+		Status=num.atleast_1d(Status)
+		if (Status<>Breakwater.OK).any(): # the reef is outside the range of validity of the model
+			gp.AddError(Breakwater.Messages[Status[Status<>Breakwater.OK][0]])
 			raise Exception
-		if abs(Rc/Hi)>5:
-			Kt=1
-			gp.AddError("\nYour reef is too small and outside the range of validity of our model. Please increase your reef height so it's closer to the water surface.")
-			raise Exception
-		if OysterReefType=="Trapezoidal": # it's not a reef ball
-			# van der Meer (2005)
-			Kt1=-0.4*Rc/Hi+0.64*(Cwidth/Hi)**(-.31)*(1.0-num.exp(-0.5*ksi)) # transmission coeff: d'Angremond
-			Kt1=max(Kt1,0.075);Kt1=min(0.8,Kt1);
-
-			Kt2=-0.35*Rc/Hi+0.51*(Cwidth/Hi)**(-.65)*(1.0-num.exp(-0.41*ksi)) # transmission coeff: van der Meer
-			Kt2=max(Kt2,0.05);Kt2=min(Kt2,-0.006*Cwidth/Hi+0.93)
-
-			if Cwidth/Hi<8.0: # d'Angremond
-				Kt=Kt1
-			elif Cwidth/Hi>12.0: # van der Meer
-				Kt=Kt2
-			else: # linear interp
-				temp1=(Kt2-Kt1)/4.0;temp2=Kt2-temp1*12.0
-				Kt=temp1*Cwidth/Hi+temp2
-
-		elif OysterReefType=="Dome": # it's a reef ball
-			Kt=1.616-31.322*Hi/(9.81*To**2)-1.099*hc/hi+0.265*hc/Bwidth # D'Armono and Hall
-			if hc>hi:
-				Kt=1
-				gp.AddError("\nThe reef balls are emerged. We cannot compute the wave transmission coefficient.")
-				raise Exception       
-			elif hc<0.1*hi:
-				Kt=1
-				gp.AddError("\nThe reef is smaller than 10% of your water depth.  We cannot compute a transmission coeffcient and you can assume that they do not protect your shoreline.")
-				raise Exception       
-			elif Kt<0:
-				Kt=1  # no transmission; breakwater fully emerged
-				gp.AddError("\nWe were not able to compute a transmission coefficient. Please create a reef that is closer to the water level, but not too emerged.")
-				raise Exception       
-			elif Kt>1:
-				Kt=1
 		return Kt
 
 	# K&D Erosion model
@@ -696,127 +306,24 @@ try:
 		# D: Dune Height
 		# W: Dune Width
 		# m: Foreshore Slope
-		global BetaKD
-		# constants
-		BD=D+B; 
-		msg=0 # tracks whether or not certain messages should be displayed
-		B_adj1=0 # The berm may need to be elevated if TWL value is too great (first method)
-		B_adj2=0 # The berm may need to be elevated if TWL value is too great (second method)
-		inundation=0 # tracks whether or not the backshore is inundated 
-		if TWL>BD:
-			# TWL=BD
+		R0,R01,R02,B_adj,inundation,Diag=Erosion.KDRetreat(A,Ho,To,StormDur,TWL,B,D,W,m)
+		if inundation:
 			if count == 0:
 				count += 1
 				gp.AddMessage("...Water level is higher than your backshore elevation. You will probably experience flooding.") # only display this message if it is the first time the backshore is inundated
-			inundation=1
-
-		# Erosion model 1
-		hb=(((Ho**2.0)*g*To/(2*pi))/2.0)**(2.0/5.0)/(g**(1.0/5.0)*0.73**(4.0/5.0)) # breaking depth
-		xb=(hb/A)**1.5;Hb=0.78*hb # cross-shore breaking location
-		if B + hb <= TWL/2: # if this condition is true, the K&D model with blow up or given erroneous values 
+		if Diag['BermAdj1']>0:
 			gp.AddWarning("...The surge and wave setup are too great to run erosion on your beach!  The berm elevation has been increased to generate erosion profiles!")
-			testval = -9999
-			while testval < .1:
-				B_adj1 += 0.5
-				testval = B_adj1 + B + hb - TWL/2
-			BD1 = B+B_adj1+D
-			B1 = B+B_adj1
-			gp.AddWarning("...The berm has been increased by"+str(B_adj1)+"meters in elevation.") 
-		else:
-			BD1=BD
-			B1=B
-
-		Term1=xb-hb/m
-		Rinf1=(TWL*Term1)/(B1+hb-TWL/2.) # erosion without taking width into account   
-		if D>0:
-			Rinf=(TWL*Term1)/(BD1+hb-TWL/2.)-W*(B1+hb-0.5*TWL)/(BD1+hb-0.5*TWL) # potential erosion distance
-			if Rinf < 0:
-				Rinf=(TWL*Term1)/(B1+hb-TWL/2.); msg+=1
-		else:
-			Rinf=Rinf1
-
-		TS=(320.0*(Hb**(3.0/2.0)/(g**.5*A**3.0))*(1.0/(1.0+hb/BD1+(m*xb)/hb)))/3600.0 # response time scale
-		BetaKD=2.0*pi*(TS/StormDur)
-		expr="num.exp(-2.0*x/BetaKD)-num.cos(2.0*x)+(1.0/BetaKD)*num.sin(2.0*x)" # solve this numerically
-		fn=eval("lambda x: "+expr)
-		z=FindRootKD(fn,pi,pi/2) # find zero in function,initial guess from K&D
-		R01=0.5*Rinf*(1.0-num.cos(2.0*z)) # final erosion distance
-
-
-		# 2nd method
-		x=num.arange(0,10000,1)
-		y=A*x**(2.0/3);y=y[::-1]
-		y=y[find(y>0.5)];x=x[find(y>0.5)]    
-		Hs,Etas=WaveModelSimple(x,y,Ho,To,0.01) 
-		hb=y[argmin(Etas)]
-		xb=(hb/A)**1.5 # surf zone width
-		if B + hb <= TWL/2: # if this condition is true, the K&D model with blow up or given erroneous values 
+			gp.AddWarning("...The berm has been increased by"+str(float(Diag['BermAdj1']))+"meters in elevation.") 
+		if Diag['BermAdj2']>0:
 			gp.AddWarning("...The surge and wave setup are too great to run erosion on your beach!  The berm elevation as been increased to generate erosion profiles!")
-			testval = -9999
-			while testval < 1:
-				B_adj2 += 0.5
-				testval = B_adj2 + B + hb - TWL/2
-			BD2 = B+B_adj2+D
-			B2 = B+B_adj2
-		else:
-			BD2 = BD
-			B2 = B
-		Term1=xb-hb/m
-		Rinf1=(TWL*Term1)/(B2+hb-TWL/2) # erosion without taking width into account
-		if D>0:
-			Rinf=(TWL*Term1)/(BD2+hb-TWL/2)-W*(B2+hb-0.5*TWL)/(BD2+hb-0.5*TWL) # potential erosion distance
-			if Rinf < 0:
-				Rinf=(TWL*Term1)/(B2+hb-TWL/2); msg+=1
-		else:
-			Rinf = Rinf1
-		TS=(320.0*(Hb**(3.0/2.0)/(g**.5*A**3.0))*(1.0/(1.0+hb/BD2+(m*xb)/hb)))/3600.0 # response time scale
-		BetaKD=2.0*pi*(TS/StormDur)
-		expr="num.exp(-2.0*x/BetaKD)-num.cos(2.0*x)+(1.0/BetaKD)*num.sin(2.0*x)" # solve this numerically
-		fn=eval("lambda x: "+expr)
-		z=FindRootKD(fn,pi,pi/2) # find zero in function,initial guess from K&D
-		R02=0.5*Rinf*(1.0-num.cos(2.0*z)) # final erosion distance        
-		R0=max([R01,R02])
-		if R0<0:    R0=0
-		if msg==2:
+		if Diag['DuneNotEroding']:
 			gp.AddMessage("...Berm is so wide that the dune is not eroding.")
-			msg=2;
-		B_adj = min([B_adj1,B_adj2]) # return the minimum of the required berm elevation adjustments ('0' if one or both methods did not require adjusting 
 		# returns: the average retreat value, the retreat values by method 1, by method 2, berm increase value, whether or not inundation occured, and a variable tracking what message to display later. 
-		return R0,R01,R02,B_adj,inundation,count
+		return float(R0),float(R01),float(R02),float(B_adj),int(inundation),count
 
 	def MudErosion(Uc,Uw,h,To,me,Cm):
-		rho=1024.0;nu=1.36e-6;d50=0.00003
-		ks=2.5*d50;kap=0.4
-
-		# current
-		if max(Uc)<>0:
-			us1=0.01;zo1=0.01;dif=10 # initial value for u* and zo  
-			Tc=h*0; # shear stress
-			while dif>1e-4:
-				zo2=ks/30*(1-num.exp(-us1*ks/(27*nu)))+nu/(9*us1)
-				us2=kap*Uc/(num.log(h/zo2)-1)
-				dif1=abs(us1-us2);dif2=abs(zo1-zo2);dif=mean(dif1+dif2);
-				zo1=zo2;us1=us2;
-			Tc=rho*us1**2 # shear stress due to current
-		else:    Tc=h*0
-
-		# waves
-		Rw=Uw**2*To/(2*num.pi)/nu
-		fw=0.0521*Rw**(-0.187) # smooth turbulent flow
-		Tw=0.5*rho*fw*Uw**2
-
-		# combined wave and current
-		temp=Tc*(1+1.2*(Tw/(Tc+Tw))**3.2)
-		Trms=(temp**2+0.5*Tw**2)**0.5
-
-		# erosion 
-		Te=h*0+0.0012*Cm**1.2 # erosion threshold
-		dmdt=me*(Trms-Te) # erosion rate
-		dmdt[find(dmdt<=0)]=0
-		Erosion=3600*dmdt/Cm*100 # rate of bed erosion [cm/hr]
-
 		# erosion: bed erosion rate, Trms: wave and current shear stress, Tc: current shear stress, Tw: wave shear stress, Te: erosion threshold
-		return Erosion,Trms,Tc,Tw,Te
+		return Erosion.MudErosion(Uc,Uw,h,To,me,Cm)
 
 	def ParseSegment(X):
 		# this function returns location of beg. and end of segments that have same value in a vector
@@ -836,23 +343,19 @@ try:
 		return Values,Beg_ar,End_ar,L_seg
 
 
-	################################################
-	#### READING DEPTH PROFILE AND EXCEL INPUTS ####
-	################################################
+	def LogMessage(Kind,Msg): # messages of the input parsing are kept with the cached inputs
+		ParseLog.append((Kind,Msg))
+		getattr(gp,Kind)(Msg)
 
-	try:
-		gp.AddMessage("\nReading Erosion Protection Excel file and depth profile...")
-		# constants
-		g=9.81;rho=1024.0
-		Fig2=0; # for HTML
+	# inputs kept by the parsed input cache
+	ParsedInputs=["MSL","MHW","sand","mud","X","h","Xinit","m","dx","Cm","me","d50","B1","W1","D1","Dred","D2","Slope","A","hogr","dogr","Nogr","Xsg","Xog","XsMAg","XoMAg","densdeltagr","dNogr","hogc","dogc","Nogc","densdeltagc","dNogc","densdeltagt","hogt","dogt","Nogt","dNogt","hor","dor","Nor","Xsr","Xor","XsMAr","XoMAr","densdeltar","dNor","hos","dos","Nos","Xss","Xos","XsMAs","XoMAs","densdeltas","dNos","CoralType","Xco","Xcn","AlphF","AlphR","he","hr","Wr","CoralMA","TanAlph","kp","kp2","OysterReefType","Xr","hc","Bw","Cw","OysterMA"]
 
-		# input from user via Excel table
-		xlApp=Dispatch("Excel.Application")
-		xlApp.Visible=0
-		xlApp.DisplayAlerts=0
-		xlApp.Workbooks.Open(InputTable)
-		cell1=xlApp.Worksheets("ModelInput")
-		cell3=xlApp.Worksheets("ReefShapeFactor")
+	def ParseInputs(InputTable,CSProfile,S,dx):
+		""" reads the input table and the cross-shore profile; returns the ParsedInputs as a dictionary """
+		# input from user via Excel table (or JSON/CSV parameter file)
+		Book=Workbook.Open(InputTable)
+		cell1=Book.Worksheets("ModelInput")
+		cell3=Book.Worksheets("ReefShapeFactor")
 
 		# read general information
 		MSL=cell1.Range("f5").Value # mean sea level
@@ -867,39 +370,17 @@ try:
 			mud=1
 		try:
 			# read in user's cross-shore profile
-			TextData=open(CSProfile,"r") 
-			X_lst=[];h_lst=[]
-			for line in TextData.read().strip("\n").split("\n"):
-				linelist=[float(s) for s in line.split("\t")] # split the list by comma delimiter
-				X_lst.append(linelist[0])
-				h_lst.append(linelist[1])
-			TextData.close()
-			Xinit = num.array(X_lst)
-			X=num.array(X_lst);h=num.array(h_lst)
-	
-			# Adjust Bathy
-			if any(h[0:100]>0) or h[0]>h[-1]:
-				flip=1;
-			else:
-				h=h[::-1] # reverse order if profile starts offshore
-				flip=0 # flip later to profile starts offshore
-	
-			h=h-MSL; # adjust water level so that 0 is at MSL
+			X,h=Profile.Read(CSProfile) # tab separated text, or .npy/.npz
+			Xinit = num.array(X)
 	
+			# Adjust Bathy: starts offshore, points below water only (and below the surge for mud), depth positive
 			if mud: # if there's a marsh or a mangrove
-				gp.AddMessage("...your backshore is a *marsh/mangrove*")            
-				h=h-S # add surge level by decreasing depth (increasing the absolute value)
-				out=find(h>-0.1)
-				h=h[out[-1]+1:-1];X=X[out[-1]+1:-1] # only keep values that are below water
-				dx=abs(X[1]-X[0]);m=abs(h[-1]-h[-int(10.0/dx)])/10 # average slope 10m from end of transect
-	
+				LogMessage("AddMessage","...your backshore is a *marsh/mangrove*")
 			elif sand: # it's a beach
-				gp.AddMessage("...your backshore is a *sandy beach*")            
-				keep=find(h<-0.1)
-				h=h[keep];X=X[keep] # only keep values that are below water
-			h=-h # depth is now positive
-			if flip: # original profile starts onshore
-				h=h[::-1] # reverse order if profile starts at onshore
+				LogMessage("AddMessage","...your backshore is a *sandy beach*")
+			X,h,m=Site.AdjustProfile(X,h,MSL,S,sand) # shared with batch runs
+			if mud:
+				dx=abs(X[1]-X[0])
 	
 		except:
 			gp.AddError(msgReadCSProfile)
@@ -923,7 +404,7 @@ try:
 		A=cell1.Range("e17").Value # sediment scale factor
 
 		if sand+mud<>1:
-			gp.AddWarning("...You didn't specify a backshore type.  We won't be able to estimate amount of erosion.")
+			LogMessage("AddWarning","...You didn't specify a backshore type.  We won't be able to estimate amount of erosion.")
 
 		# read vegetation information
 		XelVal=cell1.Range("f49:m53").Value # all vegetation information
@@ -962,32 +443,8 @@ try:
 		Nogt=temp1[2] # density of mangrove trunks
 		dNogt=(1-densdeltagt *1.0/100.0) # density change in mangrove trunks
 
-		if Xog>0:
-			gp.AddWarning("...Mangrove landward edge should be above mean sea level.  We'll move it for you.")            
-			Xog=-Xog
-		if Xsg<Xog:
-			gp.AddWarning("...You switched mangrove edge distances.  We'll change them for you.")
-			temp=Xog;Xog=Xsg;Xsg=temp
-		if XsMAg<XoMAg:
-			gp.AddWarning("...You switched mangrove edge distances for the management action.  We'll change them for you.")
-			temp=XoMAg;XoMAg=XsMAg;XsMAg=temp
-		if Xog<min(Xinit) and Xsg<min(Xinit):
-			gp.AddWarning("...The mangrove footprint you applied lies completely outside the extent of your topo/bathy profile. The mangrove has been excluded in the analysis. Check your inputs.")
-			Xog = 0; Xsg = 0; XoMAg =0; XsMAg = 0;
-		elif Xog<min(Xinit):
-			gp.AddWarning("...The mangrove footprint you applied extends beyond the limits of your topo/bathy profile. The inland limit of the mangrove has been set to the inland limit of the topo/bathy profile. Check your inputs.")
-			Xog = min(Xinit)
-		if XoMAg<min(Xinit):
-			gp.AddWarning("...The mangrove footprint you applied for the managment action extends beyond the limits of your topo/bathy profile. The inland limit of the mangrove post management action has been set to the inland limit of the topo/bathy profile. Check your inputs.")
-			XoMAg = min(Xinit)			
-		
-		if XsMAg+XoMAg<>0: # if there is vegetation in management action
-			if XsMAg>Xsg:
-				gp.AddWarning("...Your impacted mangrove footprint has to be within your initial conditon footprint.  We'll change it for you.")
-				XsMAg=Xsg
-			if XoMAg<Xog:
-				gp.AddWarning("...Your impacted mangrove footprint has to be within your initial conditon footprint.  We'll change it for you.")
-				XoMAg=Xog
+		Log=[] # footprint corrections, shared with batch runs (CPf_Site); reported once all are read
+		Xsg,Xog,XsMAg,XoMAg=Site.Footprint("mangrove",[Xsg,Xog,XsMAg,XoMAg],min(Xinit),Log)
 
 		temp1=XelVal[3]
 		hor=temp1[0] # height of marsh
@@ -1002,31 +459,7 @@ try:
 			del densdeltar
 			densdeltar = 100.0        
 		dNor=(1-densdeltar *1.0/100.0) # density change in marsh
-		if Xor>0:
-			gp.AddWarning("...Marshes landward edge should be above mean sea level.  We'll move it for you.")  
-			Xor=-Xor;
-		if Xsr<Xor:
-			gp.AddWarning("...You switched marsh offshore and shoreward edge.  We'll change them for you.")
-			temp=Xor;Xor=Xsr;Xsr=temp
-		if XsMAr<XoMAr:
-			gp.AddWarning("...You switched marsh offshore and shoreward edge for the management action.  We'll change them for you.")
-			temp=XoMAr;XoMAr=XsMAr;XsMAr=temp
-		if Xor<min(Xinit) and Xsr<min(Xinit):
-			gp.AddWarning("...The marsh footprint you applied lies completely outside the extent of your topo/bathy profile. The marsh has been excluded in the analysis. Check your inputs.")
-			Xor = 0; Xsr = 0; XoMAr =0; XsMAr = 0;
-		elif Xor<min(Xinit):
-			gp.AddWarning("...The marsh footprint you applied extends beyond the limits of your topo/bathy profile. The inland limit of the marsh has been set to the inland limit of the topo/bathy profile. Check your inputs.")
-			Xor = min(Xinit)
-		if XoMAr<min(Xinit):
-			gp.AddWarning("...The marsh footprint you applied post management extends beyond the limits of your topo/bathy profile. The inland limit of the marsh post management has been set to the inland limit of the topo/bathy profile. Check your inputs.")
-			XoMAr = min(Xinit)			
-		if XsMAr+XoMAr<>0: # if there is vegetation in management action
-			if XsMAr>Xsr:
-				gp.AddWarning("...Your impacted marsh footprint has to be within your initial conditon footprint.  We'll change it for you.")
-				XsMAr=Xsr
-			if XoMAr<Xor:
-				gp.AddWarning("...Your impacted marsh footprint has to be within your initial conditon footprint.  We'll change it for you.")
-				XoMAr=Xor
+		Xsr,Xor,XsMAr,XoMAr=Site.Footprint("marsh",[Xsr,Xor,XsMAr,XoMAr],min(Xinit),Log)
 
 		temp1=XelVal[4]
 		hos=temp1[0] # height of seagrass
@@ -1041,29 +474,9 @@ try:
 			del densdeltas
 			densdeltas = 100.0        
 		dNos=(1-densdeltas *1.0/100.0) # density change in seagrass        
-		if Xss>Xos:
-			gp.AddWarning("...You switched seagrass offshore and shoreward edge.  We'll change them for you.")
-			temp=Xos;Xos=Xss;Xss=temp
-
-		if XsMAs>XoMAs:
-			gp.AddWarning("...You switched seagrass offshore and shoreward edge for the management action.  We'll change them for you.")
-			temp=XoMAs;XoMAs=XsMAs;XsMAs=temp
-		if Xos>max(Xinit) and Xss>max(Xinit):
-			gp.AddWarning("...The seagrass footprint you applied lies completely outside the extent of your topo/bathy profile. The seagrass has been excluded in the analysis. Check your inputs.")
-			Xos = 0; Xss = 0; XoMAs =0; XsMAs = 0;
-		elif Xos>max(Xinit):
-			gp.AddWarning("...The seagrass footprint you applied extends beyond the limits of your topo/bathy profile. The offshore limit of the seagrass has been set to the offshore limit of the topo/bathy profile. Check your inputs.")
-			Xos = max(Xinit)
-		if XoMAs>max(Xinit):
-			gp.AddWarning("...The seagrass footprint you applied post management action extends beyond the limits of your topo/bathy profile. The offshore limit of the seagrass post management action has been set to the offshore limit of the topo/bathy profile. Check your inputs.")
-			XoMAs = max(Xinit)			
-		if XsMAs+XoMAs<>0: # if there is vegetation in management action
-			if XsMAs<Xss:
-				gp.AddWarning("...Your impacted seagrass footprint has to be within your initial conditon footprint.  We'll change it for you.")
-				XsMAs=Xss
-			if XoMAs>Xos:
-				gp.AddWarning("...Your impacted seagrass footprint has to be within your initial conditon footprint.  We'll change it for you.")
-				XoMAs=Xos		
+		Xss,Xos,XsMAs,XoMAs=[-val for val in Site.Footprint("seagrass",[-Xss,-Xos,-XsMAs,-XoMAs],-max(Xinit),Log)] # X negated: seagrass ends offshore
+		for Kind,Msg in Log:
+			LogMessage(Kind,Msg)
 
 		# read coral info
 		CoralType=cell1.Range("d56").Value
@@ -1079,18 +492,18 @@ try:
 		hr=XelVal[5] # reef top depth
 		Wr=XelVal[6] # reef top width
 		CoralMA=XelVal[7]
-		TanAlph=cell3.Range("a2:a202").Value;TanAlph=num.array(TanAlph)
-		kp=cell3.Range("b2:b202").Value;kp=num.array(kp) # reef shape factor
-		kp2=cell3.Range("c2:c202").Value;kp2=num.array(kp2) # reef shape factor
+		TanAlph=cell3.Range("a2:a202").Value;TanAlph=num.array(TanAlph,dtype=float) # empty cells are NaN
+		kp=cell3.Range("b2:b202").Value;kp=num.array(kp,dtype=float) # reef shape factor
+		kp2=cell3.Range("c2:c202").Value;kp2=num.array(kp2,dtype=float) # reef shape factor
 		if CoralMA is None:
 			CoralMA="None"
 		if AlphF+AlphR+he+hr+Wr==0:
 			CoralMA="None"        
 		if Xcn>Xco:
-			gp.AddWarning("...You switched coral offshore and shoreward edge.  We'll change them for you.")
+			LogMessage("AddWarning","...You switched coral offshore and shoreward edge.  We'll change them for you.")
 			temp=Xco;Xco=Xcn;Xcn=temp
 		if Xco>max(Xinit):
-			gp.AddWarning("...The coral reef footprint you applied is offshore of the limits of your profile. The reef will be placed at the offshore limit of the profile (Barrier Reef).")
+			LogMessage("AddWarning","...The coral reef footprint you applied is offshore of the limits of your profile. The reef will be placed at the offshore limit of the profile (Barrier Reef).")
 			Xcn=-1.0; Xco = -1.0; CoralType = "Barrier"
 
 		# read oyster reef information
@@ -1108,16 +521,48 @@ try:
 		if Xr+hc+Bw+Cw==0:
 			OysterMA="None"; OysterReefType="None"
 
-		xlApp.ActiveWorkbook.Close(SaveChanges=0)
-		xlApp.Quit()
-
 		if Xsr+Xor+XsMAr+XoMAr<>0 and Xsg+Xog+XsMAg+XoMAg<>0:
 			gp.AddError(msgTwoHabitats)
 			raise Exception
 
+		Parsed=locals()
+		return dict([(name,Parsed[name]) for name in ParsedInputs])
+
+	################################################
+	#### READING DEPTH PROFILE AND EXCEL INPUTS ####
+	################################################
+
+	try:
+		gp.AddMessage("\nReading Erosion Protection Excel file and depth profile...")
+		# constants
+		g=9.81;rho=1024.0
+		Fig2=0; # for HTML
+
+		# inputs parsed by an earlier run with the same files, surge and resolution
+		CacheDir=interws+"InputCache"
+		CacheKey=InputCache.Key([InputTable,CSProfile],[S,dx])
+		Cached=InputCache.Load(CacheDir,CacheKey)
+		if Cached is not None:
+			gp.AddMessage("...using the inputs parsed by a previous run")
+			Params,ParseLog=Cached
+			for Kind,Msg in ParseLog: # same messages as when the inputs were parsed
+				getattr(gp,Kind)(Msg)
+		else:
+			ParseLog=[]
+			Params=ParseInputs(InputTable,CSProfile,S,dx)
+			try:
+				Stored=InputCache.Save(CacheDir,CacheKey,Params,ParseLog)
+			except (IOError,OSError):
+				Stored=False
+			if not Stored:
+				gp.AddWarning("...the parsed inputs could not be cached; they will be read again next time")
+		(MSL,MHW,sand,mud,X,h,Xinit,m,dx,Cm,me,d50,B1,W1,D1,Dred,D2,Slope,A,hogr,dogr,Nogr,Xsg,Xog,XsMAg,XoMAg,
+			densdeltagr,dNogr,hogc,dogc,Nogc,densdeltagc,dNogc,densdeltagt,hogt,dogt,Nogt,dNogt,hor,dor,Nor,Xsr,Xor,
+			XsMAr,XoMAr,densdeltar,dNor,hos,dos,Nos,Xss,Xos,XsMAs,XoMAs,densdeltas,dNos,CoralType,Xco,Xcn,AlphF,AlphR,
+			he,hr,Wr,CoralMA,TanAlph,kp,kp2,OysterReefType,Xr,hc,Bw,Cw,OysterMA)=[Params[name] for name in ParsedInputs]
+		ReefTable=Coral.ShapeFactorTable(TanAlph,kp,kp2) # sorted once for the shape factor lookups
+
 	except:
-		xlApp.ActiveWorkbook.Close(SaveChanges=0)
-		xlApp.Quit()
 		gp.AddError(msgReadExcel)
 		raise Exception
 
@@ -1156,6 +601,7 @@ try:
 			Ho,To=WindWave(Us,Ft,depth) # compute wave from wind speed
 
 		# fill up vegetation information
+		XSorted=Lookup.IsSorted(X) # checked once; the habitat edges below are found by bisection on an ascending X
 		VegXloc=num.array(X)*0.0;VegXlocMA=num.array(X)*0.0; # x-axis locating habitats
 		HabTrigg=num.array(X)*0.0+100.0; # habitats function triggers; assume it's all wave model for now
 		NRoots=num.array(X)*0.0;NRootsMA=num.array(X)*0.0; # density of roots
@@ -1170,16 +616,16 @@ try:
 
 		# prepare seagrass data
 		if Xos+Xss<>0: # there's a seagrass bed
-			temp1=X[-1]-X[0]-Indexed(X,Xos) # offshore boundary of habitat
-			temp2=X[-1]-X[0]-Indexed(X,Xss) # shoreward boundary of habitat
+			temp1=X[-1]-X[0]-Lookup.Indexed(X,Xos,XSorted) # offshore boundary of habitat
+			temp2=X[-1]-X[0]-Lookup.Indexed(X,Xss,XSorted) # shoreward boundary of habitat
 			VegXloc[temp1:temp2+1]=3 # '3' for seagrass
 			NTrunk[temp1:temp2+1]=Nos 
 			dTrunk[temp1:temp2+1]=dos
 			hTrunk[temp1:temp2+1]=hos
 
 		if XoMAs+XsMAs<>0: # there's a seagrass bed after management action
-			temp1=X[-1]-X[0]-Indexed(X,XoMAs) # offshore boundary of habitat
-			temp2=X[-1]-X[0]-Indexed(X,XsMAs) # shoreward boundary of habitat
+			temp1=X[-1]-X[0]-Lookup.Indexed(X,XoMAs,XSorted) # offshore boundary of habitat
+			temp2=X[-1]-X[0]-Lookup.Indexed(X,XsMAs,XSorted) # shoreward boundary of habitat
 			VegXlocMA[temp1:temp2+1]=3 # '3' for seagrass
 			NTrunkMA[temp1:temp2+1]=Nos *dNos
 			dTrunkMA[temp1:temp2+1]=dos
@@ -1207,16 +653,16 @@ try:
 
 		# prepare marsh data
 		if Xor+Xsr<>0: # there's a marsh 
-			temp2=X[-1]-X[0]-Indexed(X,Xor) # landward boundary of habitat
-			temp1=X[-1]-X[0]-Indexed(X,Xsr) # shoreward boundary of habitat
+			temp2=X[-1]-X[0]-Lookup.Indexed(X,Xor,XSorted) # landward boundary of habitat
+			temp1=X[-1]-X[0]-Lookup.Indexed(X,Xsr,XSorted) # shoreward boundary of habitat
 			VegXloc[temp1:temp2+1]=2 # '2' for marsh
 			NTrunk[temp1:temp2+1]=Nor 
 			dTrunk[temp1:temp2+1]=dor
 			hTrunk[temp1:temp2+1]=hor
 
 		if XoMAr+XsMAr<>0: # there's a marsh after management action
-			temp2=X[-1]-X[0]-Indexed(X,XoMAr) # landward boundary of habitat
-			temp1=X[-1]-X[0]-Indexed(X,XsMAr) # shoreward boundary of habitat
+			temp2=X[-1]-X[0]-Lookup.Indexed(X,XoMAr,XSorted) # landward boundary of habitat
+			temp1=X[-1]-X[0]-Lookup.Indexed(X,XsMAr,XSorted) # shoreward boundary of habitat
 			VegXlocMA[temp1:temp2+1]=2 # '2' for marsh
 			NTrunkMA[temp1:temp2+1]=Nor *dNor
 			dTrunkMA[temp1:temp2+1]=dor
@@ -1244,8 +690,8 @@ try:
 
 		# prepare mangrove data
 		if Xog+Xsg<>0: # there's a mangrove
-			temp2=X[-1]-X[0]-Indexed(X,Xog) # landward boundary of habitat
-			temp1=X[-1]-X[0]-Indexed(X,Xsg) # shoreward boundary of habitat
+			temp2=X[-1]-X[0]-Lookup.Indexed(X,Xog,XSorted) # landward boundary of habitat
+			temp1=X[-1]-X[0]-Lookup.Indexed(X,Xsg,XSorted) # shoreward boundary of habitat
 			VegXloc[temp1:temp2+1]=1 # '1' for mangroves
 			NRoots[temp1:temp2+1]=Nogr
 			dRoots[temp1:temp2+1]=dogr
@@ -1258,8 +704,8 @@ try:
 			hCanop[temp1:temp2+1]=hogc
 
 		if XoMAg+XsMAg<>0: # there's a mangrove
-			temp2=X[-1]-X[0]-Indexed(X,XoMAg) # landward boundary of habitat
-			temp1=X[-1]-X[0]-Indexed(X,XsMAg) # shoreward boundary of habitat
+			temp2=X[-1]-X[0]-Lookup.Indexed(X,XoMAg,XSorted) # landward boundary of habitat
+			temp1=X[-1]-X[0]-Lookup.Indexed(X,XsMAg,XSorted) # shoreward boundary of habitat
 			VegXlocMA[temp1:temp2+1]=1 # '1' for mangroves
 			NRootsMA[temp1:temp2+1]=Nogr*dNogr
 			dRootsMA[temp1:temp2+1]=dogr
@@ -1319,8 +765,8 @@ try:
 				if Xco-Xcn<Wr: # in case footprint is smaller than reef width; take footprint=width
 					Xcn=Xco+Wr
 
-				temp1=X[-1]-X[0]-Indexed(X,Xco) # offshore boundary of habitat
-				temp2=X[-1]-X[0]-Indexed(X,Xcn) # shoreward boundary of habitat
+				temp1=X[-1]-X[0]-Lookup.Indexed(X,Xco,XSorted) # offshore boundary of habitat
+				temp2=X[-1]-X[0]-Lookup.Indexed(X,Xcn,XSorted) # shoreward boundary of habitat
 				VegXloc[temp1:temp2+1]=4 # '4' for coral reefs
 				HabTrigg[temp1:temp2+1]=400. # coral function will be calledfunction will be called
 				VegXlocMA[temp1:temp2+1]=4 # '4' for coral reefs          
@@ -1353,7 +799,7 @@ try:
 				if AddMActionHeader == 'yes':
 					htmlfile.write("<HR><H2><u>Management Action</u></H2>"); AddMActionHeader = 'no'
 
-			OysterX=X[-1]-X[0]-Indexed(X,Xr) # shoreward boundary of habitat
+			OysterX=X[-1]-X[0]-Lookup.Indexed(X,Xr,XSorted) # shoreward boundary of habitat
 			VegXloc[OysterX]=5 # '5' for oyster
 			HabTrigg[OysterX]=500. # oyster function will be called
 
@@ -1455,6 +901,7 @@ try:
 		H_r=[];Xn=[];ho=[];
 		Retreat2 = -9999
 		MErodeLen2= -9999
+		Trms2=None # bed shear stress after the management action, on mud
 		EqualRetreat = "Null"
 		Xaxis=[];Depth=[]; # vector of X distances and depth will be filled with coral and oyster if applicable as we move along profile
 		Wave=[];WaveMA=[];Setup=[];SetupMA=[]; Dis1=[];DisSimple1=[];DisMA=[];DisSimpleMA=[] # vector of wave height and setup will be filled as we move along the profile        
@@ -1586,9 +1033,10 @@ try:
 
 			if mud == 1:
 				gp.AddMessage("...estimating erosion amount for muddy substrate")
+				from scipy.integrate import trapz # only muddy backshores need SciPy
 				lx=len(X);
 				Retreat1,Trms1,Tc1,Tw1,Te=MudErosion(BottVelo*0,BottVelo,Depth,To,me,Cm)
-				ErodeLoc=find(Trms1>Te[0]); ErodeLoc=ErodeLoc[ErodeLoc>=Zero] # indices where erosion rate greater than Threshold
+				ErodeLoc=Lookup.Find(Trms1>Te[0]); ErodeLoc=ErodeLoc[ErodeLoc>=Zero] # indices where erosion rate greater than Threshold
 				MErodeLen1=len(ErodeLoc)*dx # erosion rate greater than threshold at each location shoreward of the shoreline (pre-management)
 				if any(ErodeLoc)>0:
 					MErodeVol1=trapz(Retreat1[ErodeLoc]/100.0,Xaxis[ErodeLoc],dx)* StormDur # volume of mud eroded shoreward of the shoreline (m^3/m)
@@ -1639,12 +1087,10 @@ try:
 
 				elif TrigVal==400: # coral reef
 					H_r,Eta_r1=WavesCoral(Ho1,AlphF,AlphR,he,hr,Wr,Cf_coral,dx)
-					ECg=[-0.125*1024*9.81*H_r[ii]**2*sqrt(9.81*(hr+Eta_r1[-1])) for ii in range(len(H_r))]
-					Diss=gradient(ECg,dx);Diss=H_r[1:-1]**3;Dis1=num.append(Dis1,Diss);
+					Diss=H_r[1:-1]**3;Dis1=num.append(Dis1,Diss);
 
 					H_temp,temp=WavesCoral(Ho1,AlphF,AlphR,he,hr,Wr,0.01,dx)
-					ECg=[-0.125*1024*9.81*H_temp[ii]**2*sqrt(9.81*(hr+temp[-1])) for ii in range(len(H_temp))]
-					Diss=gradient(ECg,dx);Diss=H_temp[1:-1]**3;DisSimple1=num.append(DisSimple1,Diss);
+					Diss=H_temp[1:-1]**3;DisSimple1=num.append(DisSimple1,Diss);
 
 					if Xco-Xcn>Wr: # if the reef is trapezoidal (the foot print is bigger than the width of the reef top)
 						H_reef=num.arange(0,Xco-Xcn+1)*0.0+Ho1 # initialize the wave height across the reef footprint as the incoming wave height value
@@ -1770,9 +1216,10 @@ try:
 
 			if mud == 1:
 				gp.AddMessage("...estimating erosion amount for muddy substrate")
+				from scipy.integrate import trapz # only muddy backshores need SciPy
 				lx=len(X);
 				Retreat1,Trms1,Tc1,Tw1,Te=MudErosion(BottVelo*0,BottVelo,Depth,To,me,Cm) # before management action
-				ErodeLoc=find(Trms1>Te[0]); ErodeLoc=ErodeLoc[ErodeLoc>=Zero]# Indices where erosion rate greater than Threshold
+				ErodeLoc=Lookup.Find(Trms1>Te[0]); ErodeLoc=ErodeLoc[ErodeLoc>=Zero]# Indices where erosion rate greater than Threshold
 				MErodeLen1=len(ErodeLoc)*dx # erosion rate greater than threshold at each location shoreward of the shoreline (pre-managament)
 				if any(ErodeLoc)>0:
 					MErodeVol1=trapz(Retreat1[ErodeLoc]/100.0,Xaxis[ErodeLoc],dx)* StormDur # volume of mud eroded shoreward of the shoreline (m^3/m)
@@ -1817,12 +1264,10 @@ try:
 
 				elif TrigVal==400: # coral reef
 					H_r,Eta_r1=WavesCoral(Ho1,AlphF,AlphR,he,hr,Wr,Cf_coral,dx)
-					ECg=[-0.125*1024*9.81*H_r[ii]**2*sqrt(9.81*(hr+Eta_r1[-1])) for ii in range(len(H_r))]
-					Diss=gradient(ECg,dx);Diss=H_r[1:-1]**3;Dis1=num.append(Dis1,Diss);
+					Diss=H_r[1:-1]**3;Dis1=num.append(Dis1,Diss);
 
 					H_temp,temp=WavesCoral(Ho1,AlphF,AlphR,he,hr,Wr,0.01,dx)
-					ECg=[-0.125*1024*9.81*H_temp[ii]**2*sqrt(9.81*(hr+temp[-1])) for ii in range(len(H_temp))]
-					Diss=gradient(ECg,dx);Diss=H_temp[1:-1]**3;DisSimple1=num.append(DisSimple1,Diss);
+					Diss=H_temp[1:-1]**3;DisSimple1=num.append(DisSimple1,Diss);
 
 					if Xco-Xcn>Wr: # if the reef is trapezoidal (the foot print is bigger than the width of the reef top)
 						H_reef=num.arange(0,Xco-Xcn+1)*0.0+Ho1 # initialize the wave height across the reef footprint as the incoming wave height value
@@ -1897,12 +1342,10 @@ try:
 
 				elif TrigVal==400: # coral reef
 					H_r,Eta_rMA=WavesCoral(Ho1MA,AlphF,AlphR,he,hr,Wr,Cf_coralMA,dx)
-					ECg=[-0.125*1024*9.81*H_r[ii]**2*sqrt(9.81*(hr+Eta_rMA[-1])) for ii in range(len(H_r))]
-					Diss=gradient(ECg,dx);Diss=H_r[1:-1]**3;DisMA=num.append(DisMA,Diss);
+					Diss=H_r[1:-1]**3;DisMA=num.append(DisMA,Diss);
 
 					H_temp,temp=WavesCoral(Ho1MA,AlphF,AlphR,he,hr,Wr,0.01,dx)
-					ECg=[-0.125*1024*9.81*H_temp[ii]**2*sqrt(9.81*(hr+temp[-1])) for ii in range(len(H_temp))]
-					Diss=gradient(ECg,dx);Diss=H_temp[1:-1]**3;DisSimpleMA=num.append(DisSimpleMA,Diss);
+					Diss=H_temp[1:-1]**3;DisSimpleMA=num.append(DisSimpleMA,Diss);
 
 					if Xco-Xcn>Wr:
 						H_reef=num.arange(0,Xco-Xcn+1)*0.0+Ho1MA
@@ -2042,7 +1485,7 @@ try:
 					B_adj_post = B_adj_pre
 					inundation_post = inundation_pre
 				else:
-					R2,temp1,temp2,B_adj_post,inundation_post,inundationcount=ErosionKD(A,Ho,RnpMA+S,B1,D2,W1,mo,inundationcount) # erosion of beach
+					R2,KD1,KD2,B_adj_post,inundation_post,inundationcount=ErosionKD(A,Ho,RnpMA+S,B1,D2,W1,mo,inundationcount) # erosion of beach; temp1 and temp2 still hold the retreats before the management action
 
 				if RnpvegMA>RnpMA:
 					RnpvegMA=RnpMA                        
@@ -2069,18 +1512,19 @@ try:
 
 			elif mud==1: # compute erosion amount for consolidated sediments
 				gp.AddMessage("...estimating erosion amount for muddy substrate")
+				from scipy.integrate import trapz # only muddy backshores need SciPy
 				lx=len(Xaxis);msg=0
 				#values=range(Zero,lx)
 				Retreat1,Trms1,Tc1,Tw1,Te=MudErosion(BottVelo*0,BottVelo,Depth,To,me,Cm) # before management action
 				Retreat2,Trms2,Tc2,Tw2,Te=MudErosion(BottVeloMA*0,BottVeloMA,Depth,To,me,Cm) # after                        
-				ErodeLoc=find(Trms1>Te[0]); ErodeLoc=ErodeLoc[ErodeLoc>=Zero]# Indices where erosion rate greater than Threshold
+				ErodeLoc=Lookup.Find(Trms1>Te[0]); ErodeLoc=ErodeLoc[ErodeLoc>=Zero]# Indices where erosion rate greater than Threshold
 				MErodeLen1=len(ErodeLoc)*dx # Erosion rate greater than Threshold at each location shoreward of the shoreline (pre managament)
 				if any(ErodeLoc)>0:
 					MErodeVol1=trapz(Retreat1[ErodeLoc]/100.0,Xaxis[ErodeLoc],dx)* StormDur #Volume of mud eroded shoreward of the shoreline (m^3/m)
 				else:
 					MErodeVol1=0
 
-				ErodeLoc=find(Trms2>Te[0]); ErodeLoc=ErodeLoc[ErodeLoc>=Zero]# Indices where erosion rate greater than Threshold
+				ErodeLoc=Lookup.Find(Trms2>Te[0]); ErodeLoc=ErodeLoc[ErodeLoc>=Zero]# Indices where erosion rate greater than Threshold
 				MErodeLen2=len(ErodeLoc)*dx # Erosion rate greater than Threshold at each location shoreward of the shoreline (post managament)
 				if any(ErodeLoc)>0:
 					MErodeVol2=trapz(Retreat2[ErodeLoc]/100.0,Xaxis[ErodeLoc],dx)* StormDur #Volume of mud eroded shoreward of the shoreline (m^3/m)
@@ -2116,9 +1560,7 @@ try:
 
 	try:
 		gp.AddMessage("\nPlotting wave profiles...")
-		from matplotlib.font_manager import FontProperties
-		fontP = FontProperties()
-		fontP.set_size('small')
+		import CPf_Report as Report # imports matplotlib, only now
 		# percent wave attenuation
 		if scenario == "E": # only if management actions were performed on non-dune habitats will the wave height profile change ("scenario" E)
 			AtnH=Wave*0;AtnE=Wave*0;
@@ -2130,133 +1572,19 @@ try:
 			gp.AddWarning("There was a management action taken along your profile, but it was not captured by the wave model.")
 
 		# plots of wave height
-		figure(1)
-		if scenario == "E": # only if management actions were performed on non-dune habitats will the wave height profile change ("scenario" E)
-			ax=subplot(211);plot(Xaxis,WaveMA, 'r-', Xaxis,Wave, 'g.', linewidth=2);grid()
-			box=ax.get_position();
-			ax.set_position([box.x0, box.y0, box.width*1, box.height])
-			ylabel('Wave Height[m]',size='large')
-			xlim(X[-1],X[0])
-			ax.legend(('After Mgmt','Before Mgmt'),prop=fontP,loc='upper left',ncol=2)
-		else:
-			ax=subplot(211);plot(Xaxis,Wave, 'g', linewidth=2);grid()
-			box=ax.get_position();
-			ax.set_position([box.x0, box.y0, box.width*1, box.height])
-			ylabel('Wave Height[m]',size='large')
-			xlim(X[-1],X[0])
-			ax.legend(('Wave Ht. Prof.'),prop=fontP,loc='upper left',ncol=2)  
-
-		ax=subplot(212);plot(Xaxis,-Depth,linewidth=2);grid()  
-		xlim(X[-1],X[0])
-		vegleg=['Bed']  
-		if scenario == "E" or scenario == "D" or scenario == "C": # only if there are non-dune habitats
-			if any(VegXloc==1): # if mangrove is present
-				veg=Depth*0.+NaN;veg[VegXloc==1]=-Depth[VegXloc==1]
-				plot(Xaxis,veg,'.r',linewidth=1)
-				vegleg.append('Mangrove')
-			if any(VegXloc==2): # if marsh is present
-				veg=Depth*0.+NaN;veg[VegXloc==2]=-Depth[VegXloc==2]
-				plot(Xaxis,veg,'xr',linewidth=1)
-				vegleg.append('Marsh')
-			if any(VegXloc==3): # if Seagrass is present
-				veg=Depth*0.+NaN;veg[VegXloc==3]=-Depth[VegXloc==3]
-				plot(Xaxis,veg,'+g',linewidth=1)
-				vegleg.append('Seagrass')
-			if any(VegXloc==4): # if coral is present
-				veg=Depth*0.+NaN;veg[VegXloc==4]=-Depth[VegXloc==4]
-				plot(Xaxis,veg,'og',linewidth=1)
-				vegleg.append('Coral Reef')
-			if any(VegXloc==5): # if an oyster reef is present
-				hi=-Depth[VegXloc==5]
-				Yrf=num.arange((hi),0.0,0.05);Xrf=(Yrf*0.0+Xr) # x-axis
-				plot(Xrf,Yrf,'g',Xrf+.05,Yrf,'g',Xrf+.1,Yrf,'g',linewidth=2);grid()
-				vegleg.append('Oyster Reef')
-		box=ax.get_position();
-		ax.set_position([box.x0, box.y0, box.width*1, box.height])                
-		xlabel('Cross-Shore Distance from Shoreline',size='large')
-		ax.legend((vegleg),prop=fontP,loc='upper left',ncol=2)
-		axvline(x=0, linewidth=1, color='k')
-		annotate('Shoreline',xy=(1000,0))
-		ylabel('Depth[m]',size='large')
-		savefig(outputws+"WavePlot_"+subwsStr+".png",dpi=(640/8))
-
-		figure(2) # zoom in of figure 1
-		ax=subplot(211)
-		vegleg=['Bed'] 
-		if scenario == "D" or scenario == "E" or scenario == "C":    
-			VegEnd=find(VegXloc>0); VegEnd=min(VegEnd[-1]+300,len(Wave)) # location of most offshore vegetation stem
-		else:
-			VegEnd=min(1000,len(Wave))
-		if scenario == "E": # only if some management action has been taken to effect the wave height profile. ("Scenario" E)
-			plot(Xaxis,WaveMA, 'r-', Xaxis,Wave, 'g.', linewidth=2);grid()
-			box=ax.get_position();
-			ax.set_position([box.x0, box.y0, box.width*1, box.height])
-			ylabel('Wave Height[m]',size='large')
-			ax.legend(('After Mgmt','Before Mgmt'),prop=fontP,loc='upper left',ncol=2)
-			xlim(VegEnd+100,Xaxis[0]);
-			if VegEnd == len (Wave):
-				xlim(Xaxis[-1],Xaxis[0]);  
-				ylim(0,Wave[-1]+.3)                
-			else:
-				xlim(Xaxis[VegEnd],Xaxis[0]);  
-				ylim(0,Wave[VegEnd]+.3)          
-		else: # if no management action was taken on non-dune habitat
-			plot(Xaxis,Wave, 'g', linewidth=2);grid()
-			box=ax.get_position();
-			ax.set_position([box.x0, box.y0, box.width*1, box.height])
-			ylabel('Wave Height[m]',size='large')
-			ax.legend(('Wave Ht. Prof.'),prop=fontP,loc='upper left',ncol=2)
-			if VegEnd == len (Wave):
-				xlim(Xaxis[-1],Xaxis[0]);  
-				ylim(0,Wave[-1]+.3)                
-			else:
-				xlim(Xaxis[VegEnd],Xaxis[0]);  
-				ylim(0,Wave[VegEnd]+.3)
-		ax=subplot(212)
-		plot(Xaxis,-Depth,linewidth=2);grid()  
-		if any(VegXloc==1): # if mangrove is present
-			veg=Depth*0.+NaN;veg[VegXloc==1]=-Depth[VegXloc==1]
-			plot(Xaxis,veg,'.r',linewidth=1)
-			vegleg.append('Mangrove')
-		if any(VegXloc==2): # if marsh is present
-			veg=Depth*0.+NaN;veg[VegXloc==2]=-Depth[VegXloc==2]
-			plot(Xaxis,veg,'xr',linewidth=1)
-			vegleg.append('Marsh')
-		if any(VegXloc==3): # if Seagrass is present
-			veg=Depth*0.+NaN;veg[VegXloc==3]=-Depth[VegXloc==3]
-			plot(Xaxis,veg,'+g',linewidth=1)
-			vegleg.append('Seagrass')
-		if any(VegXloc==4): # if coral is present
-			veg=Depth*0.+NaN;veg[VegXloc==4]=-Depth[VegXloc==4]
-			plot(Xaxis,veg,'og',linewidth=1)
-			vegleg.append('Coral Reef')
-		if any(VegXloc==5): # if an oyster reef is present
-			hi=-Depth[VegXloc==5]
-			Yrf=num.arange((hi),0.0,0.05);Xrf=(Yrf*0.0+Xr) # x-axis
-			plot(Xrf,Yrf,'g',Xrf+.05,Yrf,'g',Xrf+.1,Yrf,'g',linewidth=2);grid()
-			vegleg.append('Oyster Reef')        
-		box=ax.get_position();
-		ax.set_position([box.x0, box.y0, box.width*1, box.height])                
-		ylabel('Depth[m]',size='large')
-		xlabel('Cross-Shore Distance from Shoreline',size='large')
-		ax.legend((vegleg),prop=fontP,loc='upper left',ncol=2)
-		if VegEnd == len (Wave):
-			xlim(Xaxis[-1],Xaxis[0]);                
-		else:
-			xlim(Xaxis[VegEnd],Xaxis[0]);        
-		axvline(x=0, ymin=0.75, linewidth=1, color='k') 
-		savefig(outputws+"WavePlotZoomin_"+subwsStr+".png",dpi=(640/8))    
-		
+		Report.WavePlot(outputws+"WavePlot_"+subwsStr+".png",X,Xaxis,Wave,WaveMA,Depth,VegXloc,Xr,scenario)
+		Report.WavePlotZoom(outputws+"WavePlotZoomin_"+subwsStr+".png",Xaxis,Wave,WaveMA,Depth,VegXloc,Xr,scenario) # zoom in of the wave plot
+
 		# erosion plot
 		if sand==1:
 			# beach profile plot
 			# create a profile that is a linear slope up to the berm elevation, flat across the berm, and a dune is placed at the end of the berm (if there is one).
 			Xp=num.arange(0,500+W1,1)
 			Yp=m*Xp
-			loc=find(Yp>=B1)
+			loc=Lookup.Find(Yp>=B1)
 			Yp[loc]=B1
 
-			Lberm=loc[0];Ltoe=Indexed(Xp,Xp[Lberm+W1])
+			Lberm=loc[0];Ltoe=Lookup.Indexed(Xp,Xp[Lberm+W1],1)
 			Yp[Ltoe:-1]=B1+D1           
 			# initialize message declaring whether dune or inland erosion occurs for output later
 			preduneretreatmsg = "Null" 
@@ -2265,14 +1593,15 @@ try:
 			postinlanderrormsg = "Null"
 			noaffect = "Null"
 			mgmtbermgone = "Null"
+			Ypv=None;W00_inlanderosion=None;W0v_inlanderosion=None
 
 			Yp0=m*Xp-1*m*Retreat1 # profile of erosion before management action
-			loc=find(Yp0>=B1)
+			loc=Lookup.Find(Yp0>=B1)
 			if Retreat1 <= W1:
 				Yp0[loc]=B1
 				Lberm0=loc[0]
 				W00=W1-(Xp[Lberm0]-Xp[Lberm])
-				Ltoe0=Indexed(Xp,Xp[Lberm0+W00])
+				Ltoe0=Lookup.Indexed(Xp,Xp[Lberm0+W00],1)
 				Yp0[Ltoe0:-1]=B1+D1
 			elif Retreat1 > W1 and D1<>0:
 				preduneretreatmsg = "Your entire berm has been eroded and your dune will be retreated."
@@ -2286,7 +1615,7 @@ try:
 
 			if scenario == "B" or scenario == "D" or scenario == "E":
 				Ypv=m*Xp-1*m*Retreat2 # profile of erosion after management action
-				loc=find(Ypv>=B1)
+				loc=Lookup.Find(Ypv>=B1)
 				if Retreat1==Retreat2:
 					noaffect = "Your dune height reduction does not change beach retreats under these forcing conditions."
 				elif Retreat2 <= W1:
@@ -2306,180 +1635,13 @@ try:
 					Lbermv=loc[0]
 					W0v_inlanderosion=-1*(W1-(Xp[Lbermv]-Xp[Lberm]))
 
-			figure(3)
-			ax=subplot(211)
-			if scenario == "B" or scenario == "D"  or scenario == "E" and Retreat1 <> Retreat2:
-				if Retreat2<=W1: # this means that the berm is wider than the erosion distance both pre- and post-management action (MA)
-					axes_beg = max(Lberm-Retreat2, Lberm/2) # the start of the plot will begin offshore of the berm location by the same distance as post MA erosion
-					axes_end = Lberm+W1 + 10 # the plot will only show the true berm length plus 10 meters
-					plot(Xp,Yp,Xp,Yp0,'-.g',Xp,Ypv,'--r',linewidth=2);grid()
-					xlim(Xp[axes_beg],Xp[axes_end]);ylim(0,B1+D1+.2)
-					box=ax.get_position();
-					ax.set_position([box.x0, box.y0, box.width*1,box.height])                
-					ax.legend(('Initital','Before Mgmt','After Mgmt'),prop=fontP,loc='upper left',ncol=2)
-					axvline(x=Lberm+W1, linewidth=2, color='k')
-					annotate('Berm Limit',xy=(Lberm+W1,B1+.1))                
-					ylabel('Backsh. Elev.[m]',size='large')
-					xlabel('Cross-Shore Distance [m] from Shoreline',size='large')
-					title('Erosion Profiles',size='large',weight='bold') 
-				elif Retreat1 > W1: # this means that erosion for both pre- and post-MA has removed the entire berm
-					if D1 <> 0 and D2 <> 0: # the dune will retreat both pre and post
-						axes_beg = Lberm/2. # the start of the plot will be half way between the berm location and the shoreline
-						axes_end = Lberm+Retreat2 + 10 # the profile plot will extend 10 meters past the limit of dune retreat
-						plot(Xp,Yp,Xp,Yp0,'-.g',Xp,Ypv,'--r',linewidth=2);grid()
-						xlim(Xp[axes_beg],Xp[axes_end]);ylim(0,B1+D1+.2)
-						box=ax.get_position();
-						ax.set_position([box.x0, box.y0, box.width*1,box.height])
-						axvline(x=Lberm+W1, linewidth=2, color='k')
-						annotate('Berm Limit',xy=(Lberm+W1,B1+.1))             
-						ax.legend(('Initital','Before Mgmt','After Mgmt'),prop=fontP,loc='upper left',ncol=2)
-						ylabel('Backsh. Elev.[m]',size='large')
-						xlabel('Cross-Shore Distance [m] from Shoreline',size='large')
-						title('Erosion Profiles',size='large',weight='bold')
-
-					elif D1 == 0 or D2 == 0: # there is no dune pre- and/or post-management so erosion will extend past erodable portion and the inland area will be severly threatened.
-						axes_beg = Lberm/2. # the start of the plot will be half way between the berm location and the shoreline
-						axes_end = Lberm+Retreat2 + 10 # the profile plot will extend 10 meters past the erosion limit
-						if D1 == 0:
-							plot(Xp,Yp,Xp,Yp0,'-.g',Xp,Ypv,'--r',linewidth=2);grid()
-							xlim(Xp[axes_beg],Xp[axes_end]);ylim(0,B1+D1+.2)
-							fill_between(Xp[Lberm+W1:Lberm+W1+W00_inlanderosion],0,10,facecolor = 'g', alpha = 0.5)
-							fill_between(Xp[Lberm+W1:Lberm+W1+ W0v_inlanderosion],0,10,facecolor = 'r', alpha = 0.5)
-							axvline(x=Lberm+W1, linewidth=2, color='k')
-							annotate('Berm Limit',xy=(Lberm+W1,B1+.1))                              
-							ylabel('Backsh. Elev.[m]',size='large')
-							xlabel('Cross-Shore Distance [m] from Shoreline',size='large')                            
-							box=ax.get_position();
-							ax.set_position([box.x0, box.y0, box.width*1,box.height])                
-							ax.legend(('Initital','Before Mgmt','After Mgmt'),prop=fontP,loc='upper left',ncol=2)
-						else:
-							plot(Xp,Yp,Xp,Yp0,'-.g',Xp,Ypv,'--r',linewidth=2);grid()
-							xlim(Xp[axes_beg],Xp[axes_end]);ylim(0,B1+D1+.2)
-							fill_between(Xp[Lberm+W1:Lberm+W1+ W0v_inlanderosion],0,10,facecolor = 'r', alpha = 0.5)
-							ylabel('Backsh. Elev.[m]',size='large')
-							xlabel('Cross-Shore Distance [m] from Shoreline',size='large')
-							box=ax.get_position();
-							axvline(x=Lberm+W1, linewidth=2, color='k')
-							annotate('Berm Limit',xy=(Lberm+W1,B1+.1))               
-							ax.set_position([box.x0, box.y0, box.width*1,box.height])     
-							ax.legend(('Initital','Before Mgmt','After Mgmt'),prop=fontP,loc='upper left',ncol=2) 
-				else: 
-					axes_beg = Lberm/2. # the start of the plot will be half way between the berm location and the shoreline
-					axes_end = Lberm+Retreat2 + 10 # the profile plot will extend 10 meters past the limit of dune retreat                    
-					plot(Xp,Yp,Xp,Yp0,'-.g',Xp,Ypv,'--r',linewidth=2);grid()
-					xlim(Xp[axes_beg],Xp[axes_end]);ylim(0,B1+D1+.2)
-					fill_between(Xp[Lberm+W1:Lberm+W1+ W0v_inlanderosion],0,10,facecolor = 'r', alpha = 0.5)
-					ylabel('Backsh. Elev.[m]',size='large')
-					xlabel('Cross-Shore Distance [m] from Shoreline',size='large')
-					box=ax.get_position();
-					axvline(x=Lberm+W1, linewidth=2, color='k')
-					annotate('Berm Limit',xy=(Lberm+W1,B1+.1))                      
-					ax.set_position([box.x0, box.y0, box.width*1,box.height])                
-					ax.legend(('Initital','Before Mgmt','After Mgmt'),prop=fontP,loc='upper left',ncol=2)   
-					mgmtbermgone = "Your management action has caused the your entire berm to be lost and inland areas are severely threatened under these conditions."
-
-			else: # for all other scenarios or for scenarios 'B' and 'D' when then dune reduction has no impact on erosion, only one erosion plot is required
-				if D1 <> 0 or Retreat1<=W1: # either the erosion does not completely remove the berm or, if it does, a berm is present to retreat
-					axes_beg = Lberm/2. # start of the plot will be half way between the berm location and the shoreline
-					axes_end = Lberm+max(Retreat1,W1)+ 10 # profile plot will extend 10 meters past the limit of berm erosion or dune retreat
-					plot(Xp,Yp,Xp,Yp0,'-.g',linewidth=2);grid()
-					xlim(Xp[axes_beg],Xp[axes_end]);ylim(0,B1+D1+.2)
-					box=ax.get_position();
-					ax.set_position([box.x0, box.y0, box.width*1,box.height])                
-					ax.legend(('Initital','After Storm'),prop=fontP,loc='upper left',ncol=2)
-					ylabel('Backsh. Elev.[m]',size='large')
-					xlabel('Cross-Shore Distance [m] from Shoreline',size='large')
-					title('Erosion Profile',size='large',weight='bold')
-				else: # erosion has removed the berm and the lack of dune means that inland areas are severely threatened.
-					axes_beg = Lberm/2. # start of the plot will be half way between the berm location and the shoreline
-					axes_end = Lberm+max(Retreat1,W1)+ 10 # profile plot will extend 10 meters past the limit of berm erosion or dune retreat
-					plot(Xp,Yp,Xp,Yp0,'-.g',linewidth=2);grid()
-					xlim(Xp[axes_beg],Xp[axes_end]);ylim(0,B1+D1+.2)
-					fill_between(Xp[Lberm+W1:Lberm+W1+W00_inlanderosion],0,10,facecolor = 'g', alpha = 0.5)
-					box=ax.get_position();
-					ax.set_position([box.x0, box.y0, box.width*1,box.height])                
-					ax.legend(('Initital','After Storm'),prop=fontP,loc='upper left',ncol=2)
-					ylabel('Backsh. Elev.[m]',size='large')
-					xlabel('Cross-Shore Distance [m] from Shoreline',size='large')
-					title('Erosion Profile',size='large',weight='bold')                    
-
-			savefig(outputws+"ErosionBed_"+subwsStr+".png",dpi=(640/8))
+			# the berm survives the storm, but not after the management action
+			if (scenario == "B" or scenario == "D" or scenario == "E" and Retreat1 <> Retreat2) and Retreat2 > W1 and Retreat1 <= W1:
+				mgmtbermgone = "Your management action has caused the your entire berm to be lost and inland areas are severely threatened under these conditions."
+			Report.BeachErosion(outputws+"ErosionBed_"+subwsStr+".png",Xp,Yp,Yp0,Ypv,Lberm,W1,B1,D1,D2,Retreat1,Retreat2,W00_inlanderosion,W0v_inlanderosion,scenario)
 
 		elif mud==1: # compute erosion amount for consolidated sediments
-			figure(2)
-			Xplot = Xaxis   
-			Shorel=find(abs(Depth)==min(abs(Depth)) )
-			if scenario == "E":
-				ax=subplot(311)               
-				plot(Xplot,Retreat1,'--g',Xplot,Retreat2,'r',linewidth=2);grid()
-				box=ax.get_position();
-				ax.set_position([box.x0, box.y0, box.width*1, box.height])     
-				axvline(x=0, linewidth=1, color='k')
-				xlim(0,Xplot[0])
-				ylim(-0.,max(max(Retreat1[0:Shorel+10]),max(Retreat2[0:Shorel+10]))*1.1)
-				ylabel('Erosion[cm/hr]',size='large')
-				ax=subplot(312)
-				plot(Xplot,Trms1,'--g',Xplot,Trms2,'r',Xplot,Te,'.k',linewidth=2);grid()
-				box=ax.get_position();
-				ax.set_position([box.x0, box.y0, box.width*1, box.height])                
-				ax.legend(('Before Mgmt', 'After Mgmt', 'Mvt Thresh.'),prop=fontP,loc='upper left',ncol=2)
-				xlim(0,Xplot[0]) 
-				ylim(-0.,max([max(Trms1[0:Shorel+10]),max(Trms2[0:Shorel+10]),max(Te[0:Shorel+10])])*1.1)
-				axvline(x=0, linewidth=1, color='k')
-				ylabel('Stress[Nm-2]',size='large')
-			else:
-				ax=subplot(311) 
-				plot(Xplot,Retreat1,'--g',linewidth=2);grid()
-				box=ax.get_position();
-				ax.set_position([box.x0, box.y0, box.width*1, box.height])     
-				axvline(x=0, linewidth=1, color='k')
-				xlim(10,Xplot[0]-10)
-				ylabel('Erosion[cm/hr]',size='large')
-
-				ax=subplot(312)
-				plot(Xplot,Trms1,'--g',Xplot,Te,'.k',linewidth=2);grid()
-				box=ax.get_position();
-				ax.set_position([box.x0, box.y0, box.width*1, box.height])                
-				ax.legend(('Bed Shear Stress', 'Mvt Thresh.'),prop=fontP,loc='upper left',ncol=2)
-				xlim(10,Xplot[0]-10)  
-				ylim(-0.,max(max(Trms1[0:Shorel+10]),max(Te[0:Shorel+10]))*1.1)
-				axvline(x=0, linewidth=1, color='k')
-				ylabel('Stress[Nm-2]',size='large')  
-
-			ax=subplot(313)
-			plot(Xplot,-Depth,'b',linewidth=2);grid()
-			vegleg=['Bed']   
-
-			if any(VegXloc==1): # if mangrove is present
-				veg=Depth*0.+NaN;veg[VegXloc==1]=-Depth[VegXloc==1]
-				plot(Xaxis,veg,'.r',linewidth=1)
-				vegleg.append('Mangrove')
-			if any(VegXloc==2): # if marsh is present
-				veg=Depth*0.+NaN;veg[VegXloc==2]=-Depth[VegXloc==2]
-				plot(Xaxis,veg,'xr',linewidth=1)
-				vegleg.append('Marsh')
-			if any(VegXloc==3): # if Seagrass is present
-				veg=Depth*0.+NaN;veg[VegXloc==3]=-Depth[VegXloc==3]
-				plot(Xaxis,veg,'+g',linewidth=1)
-				vegleg.append('Seagrass')
-			if any(VegXloc==4): # if coral is present
-				veg=Depth*0.+NaN;veg[VegXloc==4]=-Depth[VegXloc==4]
-				plot(Xaxis,veg,'og',linewidth=1)
-				vegleg.append('Coral Reef')
-			if any(VegXloc==5): # if an oyster reef is present
-				hi=-Depth[VegXloc==5]
-				Yrf=num.arange((hi),0.0,0.05);Xrf=(Yrf*0.0+Xr) # x-axis
-				plot(Xrf,Yrf,'g',Xrf+.05,Yrf,'g',Xrf+.1,Yrf,'g',linewidth=2);grid()
-				vegleg.append('Oyster Reef')               
-			box=ax.get_position();
-			ax.set_position([box.x0, box.y0, box.width*1, box.height])           
-			ax.legend((vegleg),prop=fontP,loc='upper left',ncol=2)
-			ylabel('Depth[m]',size='large')
-			xlabel('Cross-Shore Distance [m]',size='large')
-			xlim(10,Xaxis[0]-10)
-			axvline(x=0, linewidth=1, color='k')
-			ylim(-.25,-Depth[0]+1)
-			savefig(outputws+"ErosionBed_"+subwsStr+".png",dpi=(640/8))
+			Report.MudErosion(outputws+"ErosionBed_"+subwsStr+".png",Xaxis,Retreat1,Retreat2,Trms1,Trms2,Te,Depth,VegXloc,Xr,scenario)
 			Fig2=1 # for HTML
 
 	except:
@@ -2523,9 +1685,7 @@ try:
 					D2=E2*PropValue;
 					Dav=D1-D2; # avoided erosion
 					p=1.0/Tr # return frequency
-					temp1=1.0+disc;
-					temp2=[(1.0/temp1)**t for t in range(1,int(TimeHoriz)+1)]
-					EPV=p*Dav*sum(temp2)
+					EPV=p*Dav*Valuation.PresentValueFactor(disc,TimeHoriz)
 					gp.AddMessage("...Avoided Erosion between scenarios is "+str(round(Eav))+" meters squared.\n...Avoided Damage Value is $"+splitthousands(str(int(Dav)))+" (in your local currency)\n...Expected Projected Value of habitat is $"+splitthousands(str(int(EPV)))+" (in your local currency)")
 
 
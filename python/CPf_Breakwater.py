@@ -0,0 +1,113 @@
+# Marine InVEST: Coastal Protection (Reef Breakwaters)
+# Coded for ArcGIS 9.3, 10, 10.1
+
+import numpy as num
+from math import pi
+
+g=9.81
+
+ReefTypes=["Trapezoidal","Dome"]
+
+# status codes returned with every transmission coefficient; 0 is a valid one
+OK=0;TooSubmerged=1;TooEmerged=2;OutOfRange=3;DomeEmerged=4;DomeTooSmall=5;NoTransmission=6;BadGeometry=7
+Messages={
+    TooSubmerged:"\nYour reef is too small and we cannot compute the wave transmission coefficient. Please increase your reef height so it's closer to the water surface, or assume that it does not protect your shoreline.",
+    TooEmerged:"\nYour reef is too high above the water level and we cannot compute the wave transmission coefficient. Please assume that no waves pass through and the transmission coefficient is zero.",
+    OutOfRange:"\nYour reef is too small and outside the range of validity of our model. Please increase your reef height so it's closer to the water surface.",
+    DomeEmerged:"\nThe reef balls are emerged. We cannot compute the wave transmission coefficient.",
+    DomeTooSmall:"\nThe reef is smaller than 10% of your water depth.  We cannot compute a transmission coeffcient and you can assume that they do not protect your shoreline.",
+    NoTransmission:"\nWe were not able to compute a transmission coefficient. Please create a reef that is closer to the water level, but not too emerged.",
+    BadGeometry:"\nThe base of your reef must be wider than its crest."}
+
+def Kt(Hi,To,hi,hc,Cwidth,Bwidth,ReefType):
+    """ wave transmission coefficient of a submerged reef breakwater
+
+    Hi, To: incident wave height and period; hi: water depth at the reef
+    hc: reef height; Cwidth, Bwidth: crest and base width
+    ReefType: "Trapezoidal" (d'Angremond and van der Meer (2005)) or "Dome"
+        (reef balls, D'Armono and Hall)
+
+    All inputs but ReefType broadcast against each other.  Returns Kt and a
+    status array: 0 where Kt is valid, otherwise the code of the first check
+    that failed (see Messages), in which case Kt is NaN.
+    """
+    if ReefType not in ReefTypes:
+        raise ValueError, "Unknown reef type: "+str(ReefType)
+    Hi,To,hi,hc,Cwidth,Bwidth=num.broadcast_arrays(*[num.asarray(val,dtype=float) for val in [Hi,To,hi,hc,Cwidth,Bwidth]])
+    Lo=g*To**2.0/(2.0*pi)
+    Rc=hc-hi # depth of submergence
+    Status=num.zeros(Hi.shape,dtype=int)
+    Checks=[(hc/hi<0.5,TooSubmerged),(hc/hi>1.25,TooEmerged),(abs(Rc/Hi)>5,OutOfRange)]
+
+    Err=num.seterr(divide='ignore',invalid='ignore')
+    try:
+        if ReefType=="Trapezoidal": # it's not a reef ball
+            Boff=(Bwidth-Cwidth)/2.0 # base dif on each side
+            ksi=(hc/Boff)/num.sqrt(Hi/Lo)
+            Kt1=-0.4*Rc/Hi+0.64*(Cwidth/Hi)**(-.31)*(1.0-num.exp(-0.5*ksi)) # transmission coeff: d'Angremond
+            Kt1=num.minimum(num.maximum(Kt1,0.075),0.8)
+            Kt2=-0.35*Rc/Hi+0.51*(Cwidth/Hi)**(-.65)*(1.0-num.exp(-0.41*ksi)) # transmission coeff: van der Meer
+            Kt2=num.minimum(num.maximum(Kt2,0.05),-0.006*Cwidth/Hi+0.93)
+            temp1=(Kt2-Kt1)/4.0;temp2=Kt2-temp1*12.0 # linear interp between the two
+            Kt=num.where(Cwidth/Hi<8.0,Kt1,num.where(Cwidth/Hi>12.0,Kt2,temp1*Cwidth/Hi+temp2))
+        else: # it's a reef ball
+            Kt=1.616-31.322*Hi/(g*To**2)-1.099*hc/hi+0.265*hc/Bwidth
+            Checks=Checks+[(hc>hi,DomeEmerged),(hc<0.1*hi,DomeTooSmall),(Kt<0,NoTransmission)]
+            Kt=num.minimum(Kt,1.0)
+    finally:
+        num.seterr(**Err)
+
+    for Failed,Code in Checks: # keep the first check that fails
+        Status=num.where((Status==0)&Failed,Code,Status)
+    Kt=num.where(Status==0,Kt,num.nan)
+    if Kt.ndim==0:
+        return float(Kt),int(Status)
+    return Kt,Status
+
+def DesignSweep(Hi,To,hi,hc,Cwidth,Bwidth,ReefTypes=ReefTypes):
+    """ transmission coefficients over a grid of reef designs
+
+    Hi, To, hi: incident conditions, one value per condition
+    hc, Cwidth, Bwidth: grids of reef heights, crest widths and base widths
+
+    Every design is evaluated for every condition and reef type.  Returns a
+    dictionary with the inputs (1D arrays) and, for each reef type, a
+    dictionary of (conditions x hc x Cwidth x Bwidth) arrays: Kt, Status and
+    Valid.  Trapezoidal reefs whose base isn't wider than their crest are
+    flagged BadGeometry.
+    """
+    Hi,To,hi=[num.atleast_1d(val) for val in num.broadcast_arrays(*[num.asarray(val,dtype=float) for val in [Hi,To,hi]])]
+    hc,Cwidth,Bwidth=[num.atleast_1d(num.asarray(val,dtype=float)) for val in [hc,Cwidth,Bwidth]]
+    Grid=[Hi[:,None,None,None],To[:,None,None,None],hi[:,None,None,None],
+        hc[None,:,None,None],Cwidth[None,None,:,None],Bwidth[None,None,None,:]]
+
+    Sweep={'Hi':Hi,'To':To,'hi':hi,'hc':hc,'Cwidth':Cwidth,'Bwidth':Bwidth,'ReefTypes':list(ReefTypes)}
+    for ReefType in ReefTypes:
+        K,Status=Kt(*(Grid+[ReefType]))
+        if ReefType=="Trapezoidal":
+            Bad=(Status==0)&(Grid[5]<=Grid[4])
+            Status=num.where(Bad,BadGeometry,Status);K=num.where(Bad,num.nan,K)
+        Sweep[ReefType]={'Kt':K,'Status':Status,'Valid':Status==0}
+    return Sweep
+
+def WriteSweepTable(Sweep,FileName,ValidOnly=0):
+    """ writes the results of DesignSweep() as a comma separated table, one
+    row per reef type, condition and design; ValidOnly skips invalid designs """
+    Cond,Ih,Ic,Ib=num.indices((len(Sweep['Hi']),len(Sweep['hc']),len(Sweep['Cwidth']),len(Sweep['Bwidth'])))
+    Cond,Ih,Ic,Ib=Cond.ravel(),Ih.ravel(),Ic.ravel(),Ib.ravel()
+    TableFile=open(FileName,"w")
+    TableFile.write("ReefType,Condition,Hi,To,hi,hc,Cwidth,Bwidth,Kt,Valid,Status\n")
+    for ReefType in Sweep['ReefTypes']:
+        K=Sweep[ReefType]['Kt'].ravel();Status=Sweep[ReefType]['Status'].ravel()
+        Rows=num.arange(len(K))
+        if ValidOnly:
+            Rows=Rows[Status==0]
+        for ii in Rows:
+            c=Cond[ii]
+            if Status[ii]==0:
+                Ktxt="%.4f" % K[ii]
+            else:
+                Ktxt=""
+            TableFile.write("%s,%d,%g,%g,%g,%g,%g,%g,%s,%d,%d\n" % (ReefType,c,Sweep['Hi'][c],Sweep['To'][c],Sweep['hi'][c],
+                Sweep['hc'][Ih[ii]],Sweep['Cwidth'][Ic[ii]],Sweep['Bwidth'][Ib[ii]],Ktxt,Status[ii]==0,Status[ii]))
+    TableFile.close()
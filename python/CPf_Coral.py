@@ -0,0 +1,64 @@
+# Marine InVEST: Coastal Protection (Coral Reef Breaking)
+# Coded for ArcGIS 9.3, 10, 10.1
+
+import numpy as num
+from math import sqrt, tan
+import CPf_Lookup as Lookup
+
+g=9.81
+
+def ShapeFactorTable(TanAlph,kp,kp2):
+    """ sorted lookup table for the ReefShapeFactor sheet
+
+    TanAlph: reef slopes; kp, kp2: shape factors for waves breaking on the
+    reef face and on the reef rim.  Empty rows are dropped.  The slopes are
+    sorted once (keeping the sheet order among equal slopes) so that
+    ShapeFactor() is a bisection instead of a scan of the sheet.
+    """
+    TanAlph=num.asarray(TanAlph,dtype=float).ravel()
+    kp=num.asarray(kp,dtype=float).ravel();kp2=num.asarray(kp2,dtype=float).ravel()
+    Rows=num.nonzero(~num.isnan(TanAlph))[0]
+    Order=Rows[num.argsort(TanAlph[Rows],kind='mergesort')] # sheet rows by increasing slope
+    Table={}
+    Table['TanAlph']=TanAlph[Order];Table['Row']=Order
+    Table['kp']=kp[Order];Table['kp2']=kp2[Order]
+    return Table
+
+def ShapeFactor(Table,Alph,Column):
+    """ shape factor (Column 'kp' or 'kp2') of the slope closest to Alph """
+    return float(Table[Column][Lookup.SortedIndexed(Table['TanAlph'],Alph,Table['Row'])])
+
+def ReefProfile(Index,AlphR,he,hr,dx):
+    # reef depth at grid points Index: rises from -he with slope AlphR and levels off at the reef top -hr
+    Y=AlphR*(num.asarray(Index)*dx)-he
+    return num.where(Y>-hr,-hr,Y)
+
+def RimDepth(Ho,To,AlphR,he,hr,dx,lx=None):
+    """ representative depth for waves breaking on the reef rim
+
+    The reef rises from -he with slope AlphR to the reef top at -hr, sampled
+    every dx over 10km (lx points).  Waves start breaking where the depth is
+    closest to the breaking depth db and break over the surf zone width xs;
+    the representative depth is the mean depth over that stretch.  Only the
+    points around the start and end of breaking are evaluated, so the cost
+    doesn't depend on the length of the reef profile.
+    """
+    if lx is None:
+        lx=len(num.arange(0.0,10000.0,dx))
+    Lo=g*To**2.0/(2.0*num.pi)
+    db=0.259*Ho*(tan(AlphR)**2*Ho/Lo)**(-0.17) # breaking wave height
+    if db<hr: db=hr
+    elif db>he: db=he
+    xs=(2+1.1*Ho/he)*To*(g*he)**.5 # surf zone width
+
+    if AlphR>0: # the profile only rises, so the closest depth is next to where it reaches -db
+        ii=int(num.clip(num.floor((he-db)/(AlphR*dx)),0,lx-1))
+        Index=num.arange(max(ii-2,0),min(ii+4,lx))
+    else:
+        Index=num.arange(lx)
+    loc1=Index[Lookup.Indexed(ReefProfile(Index,AlphR,he,hr,dx),-db)] # start brkg
+
+    ii=int(num.clip(num.floor((loc1*dx+xs)/dx),0,lx-1)) # the grid is uniform
+    Index=num.arange(max(ii-2,0),min(ii+4,lx))
+    loc2=Index[Lookup.Indexed(Index*dx,loc1*dx+xs,1)] # end brkg
+    return -num.average(ReefProfile(num.arange(loc1,loc2+1),AlphR,he,hr,dx)) # rep. depth
@@ -0,0 +1,327 @@
+# Marine InVEST: Coastal Protection (Beach Erosion)
+# Coded for ArcGIS 9.3, 10, 10.1
+
+import numpy as num
+from math import pi
+import CPf_WaveKinematics as WaveKinematics
+import CPf_WaveTransform as WaveTransform
+
+g=9.81
+
+ChunkSize=100000 # number of points ShearVelocity() iterates on at once
+CacheSize=256 # number of (A, Ho, To) breaking depths kept by BreakingDepth()
+BreakingCache={} # cached breaking depths, keyed on (A, Ho, To)
+CacheOrder=[] # cache keys, least recently used first
+
+def KDFunction(z,BetaKD):
+    """ Kriebel and Dean (1993) time scale equation and its derivative in z """
+    e=num.exp(-2.0*z/BetaKD)
+    f=e-num.cos(2.0*z)+num.sin(2.0*z)/BetaKD
+    df=-2.0*e/BetaKD+2.0*num.sin(2.0*z)+2.0*num.cos(2.0*z)/BetaKD
+    return f,df
+
+def KDRoot(BetaKD,tol=1e-12,maxiter=100):
+    """ root z in [pi/2,pi] of exp(-2z/BetaKD)-cos(2z)+sin(2z)/BetaKD=0
+
+    The equation is positive at pi/2 and negative at pi for any BetaKD>0, so
+    the root stays bracketed: each iteration takes a Newton step and falls
+    back to bisection when the step leaves the bracket.  BetaKD may be an
+    array, in which case every root is solved at once and an array is
+    returned; a scalar BetaKD returns a float.
+    """
+    BetaKD=num.asarray(BetaKD,dtype=float)
+    a=num.zeros(BetaKD.shape)+pi/2;b=num.zeros(BetaKD.shape)+pi # f(a)>0>f(b)
+    z=0.5*(a+b)
+    for it in range(maxiter):
+        f,df=KDFunction(z,BetaKD)
+        a=num.where(f>0,z,a);b=num.where(f>0,b,z) # keep the root bracketed
+        zn=z-f/df
+        zn=num.where((zn>a)&(zn<b),zn,0.5*(a+b)) # bisect when Newton leaves the bracket
+        done=(abs(zn-z)<=tol*z)|(f==0)
+        z=num.where(f==0,z,zn)
+        if done.all():
+            break
+    if z.ndim==0:
+        return float(z)
+    return z
+
+def BreakingDepth(A,Ho,To):
+    """ breaking depth on a Dean equilibrium profile h=A*x**(2/3)
+
+    Waves (Ho, To) are run over the first 10km of the profile, from deep water
+    to 0.5m depth, and the breaking depth is taken where the setdown is
+    largest.  The result only depends on (A, Ho, To), so it is cached; the
+    cache keeps the CacheSize most recently used values.
+    """
+    key=(float(A),float(Ho),float(To))
+    if key in BreakingCache:
+        CacheOrder.remove(key);CacheOrder.append(key) # most recently used
+        return BreakingCache[key]
+
+    x=num.arange(0,10000,1)
+    y=A*x**(2.0/3);y=y[::-1]
+    y=y[y>0.5];x=x[:len(y)]
+    Out=WaveTransform.Transform(x,y,Ho,To,None,0.01,None,'profile')
+    hb=float(y[num.argmin(Out['Eta'][0])])
+
+    BreakingCache[key]=hb;CacheOrder.append(key)
+    while len(CacheOrder)>CacheSize: # evict least recently used values
+        del BreakingCache[CacheOrder.pop(0)]
+    return hb
+
+def BermAdjustment(Base,Threshold):
+    """ smallest raise of the berm, in 0.5m steps, for which Base plus the
+    raise reaches Threshold; at least one step """
+    n=num.maximum(num.ceil((Threshold-Base)/0.5),1.0)
+    n=n+((0.5*n+Base)<Threshold) # guard against round-off at the threshold
+    n=num.where((n>1)&((0.5*(n-1)+Base)>=Threshold),n-1,n)
+    return 0.5*n
+
+def KDRetreat(A,Ho,To,StormDur,TWL,B,D,W,m):
+    """ Kriebel and Dean (1993) beach retreat for arrays of conditions
+
+    A: shape factor of the equilibrium beach profile (sediment size)
+    Ho, To: deep water wave height and period
+    StormDur: storm duration [hours]
+    TWL: total water level (surge plus setup)
+    B, D, W: berm elevation, dune height and dune width
+    m: foreshore slope
+
+    All inputs broadcast against each other.  The retreat is computed with
+    the breaking depth from the wave height (method 1) and from the wave
+    model on the equilibrium profile (method 2); where the water level is
+    too high for the model, the berm is raised in 0.5m steps first.
+
+    Returns the retreat R0 (the larger of the two methods, at least 0), R01,
+    R02, the berm raise (smaller of the two methods), the inundation flag
+    (water level above the backshore) and a dictionary of diagnostic arrays:
+    BermAdj1 and BermAdj2, the berm raise of each method, and DuneNotEroding,
+    true where both methods found the berm too wide for the dune to erode.
+    """
+    A,Ho,To,TWL,B,D,W,m=num.broadcast_arrays(*[num.asarray(val,dtype=float) for val in [A,Ho,To,TWL,B,D,W,m]])
+    BD=D+B
+    Inundation=TWL>BD
+    NoErosion=num.zeros(A.shape,dtype=int) # number of methods for which the berm is too wide for the dune to erode
+
+    # Erosion model 1
+    hb1=(((Ho**2.0)*g*To/(2*pi))/2.0)**(2.0/5.0)/(g**(1.0/5.0)*0.73**(4.0/5.0)) # breaking depth
+    Hb=0.78*hb1 # breaking wave height; used by both methods
+
+    # Erosion model 2; breaking depth from the wave model, once per (A,Ho,To)
+    hb2=num.zeros(A.shape)
+    Flat=[A.ravel(),Ho.ravel(),To.ravel()]
+    Depths={}
+    for ii in range(A.size):
+        key=(Flat[0][ii],Flat[1][ii],Flat[2][ii])
+        if key not in Depths:
+            Depths[key]=BreakingDepth(key[0],key[1],key[2])
+        hb2.flat[ii]=Depths[key]
+
+    Out=[]
+    for hb,Threshold in [(hb1,0.1),(hb2,1.0)]:
+        xb=(hb/A)**1.5 # cross-shore breaking location
+        Low=B+hb<=TWL/2 # the K&D model blows up or gives erroneous values; raise the berm
+        Badj=num.where(Low,BermAdjustment(B+hb-TWL/2,Threshold),0.0)
+        B1=B+Badj;BD1=B1+D
+
+        Term1=xb-hb/m
+        Rinf=(TWL*Term1)/(B1+hb-TWL/2.) # erosion without taking width into account
+        RinfD=(TWL*Term1)/(BD1+hb-TWL/2.)-W*(B1+hb-0.5*TWL)/(BD1+hb-0.5*TWL) # potential erosion distance
+        Wide=(D>0)&(RinfD<0)
+        NoErosion=NoErosion+Wide
+        Rinf=num.where((D>0)&~Wide,RinfD,Rinf)
+
+        TS=(320.0*(Hb**(3.0/2.0)/(g**.5*A**3.0))*(1.0/(1.0+hb/BD1+(m*xb)/hb)))/3600.0 # response time scale
+        BetaKD=2.0*pi*(TS/StormDur)
+        z=KDRoot(BetaKD) # root of the K&D time scale equation between pi/2 and pi
+        Out.append((0.5*Rinf*(1.0-num.cos(2.0*z)),Badj)) # final erosion distance
+
+    (R01,Badj1),(R02,Badj2)=Out
+    R0=num.maximum(num.maximum(R01,R02),0.0)
+    Diag={'BermAdj1':Badj1,'BermAdj2':Badj2,'DuneNotEroding':NoErosion==2}
+    return R0,R01,R02,num.minimum(Badj1,Badj2),Inundation,Diag
+
+def ShearVelocity(Uc,h,ks,nu,tol=1e-4,maxiter=200,chunk=None):
+    """ friction velocity and roughness length under a current
+
+    Solves zo=ks/30*(1-exp(-u*ks/(27*nu)))+nu/(9*u) and u=kap*Uc/(log(h/zo)-1)
+    by fixed-point iterations, starting from u=zo=0.01.  Each point stops
+    once its own change in u plus zo is below tol (or isn't a number), and
+    only points that haven't converged are updated.  Long profiles are
+    processed chunk points at a time (ChunkSize by default).
+    """
+    kap=0.4
+    Uc,h=num.broadcast_arrays(num.asarray(Uc,dtype=float).ravel(),num.asarray(h,dtype=float).ravel())
+    lx=len(Uc)
+    us=num.zeros(lx)+0.01;zo=num.zeros(lx)+0.01 # initial value for u* and zo
+    if chunk is None:
+        chunk=ChunkSize
+    for start in range(0,lx,chunk):
+        act=num.arange(start,min(lx,start+chunk)) # points still iterating
+        for it in range(maxiter):
+            zo2=ks/30*(1-num.exp(-us[act]*ks/(27*nu)))+nu/(9*us[act])
+            us2=kap*Uc[act]/(num.log(h[act]/zo2)-1)
+            dif=abs(us[act]-us2)+abs(zo[act]-zo2)
+            us[act]=us2;zo[act]=zo2
+            act=act[dif>=tol]
+            if len(act)==0:
+                break
+    return us,zo
+
+def MudErosion(Uc,Uw,h,To,me,Cm):
+    """ erosion of a muddy bed under waves and current
+
+    Uc, Uw: current and bottom wave orbital velocity; h: depth; To: period
+    me: erosion constant; Cm: dry density
+
+    Returns the bed erosion rate [cm/hr], the combined wave and current shear
+    stress, the current and wave shear stresses and the erosion threshold.
+    """
+    rho=1024.0;nu=1.36e-6;d50=0.00003
+    ks=2.5*d50
+    Uc=num.asarray(Uc,dtype=float);Uw=num.asarray(Uw,dtype=float);h=num.asarray(h,dtype=float)
+
+    # current
+    if Uc.max()<>0:
+        us,zo=ShearVelocity(Uc,h,ks,nu)
+        Tc=rho*us.reshape(h.shape)**2 # shear stress due to current
+    else:
+        Tc=h*0
+
+    # waves
+    Rw=Uw**2*To/(2*num.pi)/nu
+    fw=0.0521*Rw**(-0.187) # smooth turbulent flow
+    Tw=0.5*rho*fw*Uw**2
+
+    # combined wave and current
+    temp=Tc*(1+1.2*(Tw/(Tc+Tw))**3.2)
+    Trms=(temp**2+0.5*Tw**2)**0.5
+
+    # erosion
+    Te=h*0+0.0012*Cm**1.2 # erosion threshold
+    dmdt=num.maximum(me*(Trms-Te),0) # erosion rate
+    Rate=3600*dmdt/Cm*100 # rate of bed erosion [cm/hr]
+    return Rate,Trms,Tc,Tw,Te
+
+def RetreatTerms(Site,Ho,To,S,A,Roots=None,Trunk=None,Canop=None,VegXloc=None):
+    """ wave, runup and erosion chain of CP1_WavesErosion on a vegetated
+    profile, for several conditions at once; the inputs are those of
+    ProfileRetreat
+
+    Returns a dictionary of arrays with one value per condition: Bare, the
+    beach retreat without the habitat [m], Runup and RunupHabitat, the runup
+    without and with the habitat [m], and Dissipation, the mean ratio of the
+    wave energy dissipation with and without the habitat (NaN if the wave
+    model gives none) for sandy beaches; Bare and Habitat, the length of bed
+    where mud erodes without and with the habitat [m], otherwise.
+    """
+    X=num.asarray(Site['X'],dtype=float);h=num.asarray(Site['h'],dtype=float)
+    dx=abs(X[1]-X[0])
+    Ho,To,S,A=[num.atleast_1d(val) for val in num.broadcast_arrays(*[num.asarray(val,dtype=float) for val in [Ho,To,S,A]])]
+
+    # wave height at the first grid point: broken if the depth can't support it, shoaled otherwise
+    ko=WaveKinematics.WaveNumber(2.0*pi/To,h[0]);Lo=2.0*pi/ko
+    Cgo=Lo/To*0.5*(1+(2.0*ko*h[0]/num.sinh(2.0*ko*h[0]))) # group velocity at the first grid point
+    Ho1=num.where(Ho>0.78*h[0],0.78*h[0],num.where(h[0]>0.5*Lo,Ho,Ho*num.sqrt(0.5*g*To/(2.0*pi)/Cgo)))
+    Veg=[Site.get(name) for name in ['Roots','Trunk','Canop','VegXloc']]
+    for ii,val in enumerate([Roots,Trunk,Canop,VegXloc]):
+        if val is not None:
+            Veg[ii]=val
+    Plants=WaveTransform.Vegetation(h,Veg[0],Veg[1],Veg[2],Veg[3],range(len(X)))
+    Out=WaveTransform.Transform(X,h,Ho1,To,None,Site.get('Cf',0.01),Plants,None)
+
+    if Site['Sand']:
+        m=Site['m'];Lo=g*To**2.0/(2.0*pi)
+        hb=(((Ho**2.)*g*To/(2*pi))/2.)**(2./5.)/(g**(1./5.)*0.73**(4./5.)) # breaking depth
+        xb=(hb/A)**1.5 # surf zone width
+        mo=num.where(xb-hb/m<=0,num.floor(xb/hb),m) # foreshore slope too flat for Kriebel and Dean
+        Rnp1=1.1*(0.35*m*num.sqrt(Ho*Lo)+num.sqrt(Lo*(Ho*0.563*m**2.0+0.004*Ho))/2.0) # runup w/o vegetation effects
+        R1=KDRetreat(A,Ho,To,Site['StormDur'],S+Rnp1,Site['B'],Site['D'],Site['W'],mo)[0]
+
+        Emax=0.35*m*num.sqrt(Ho*Lo) # setup at the beach
+        coef0=num.nanmax(Out['Etas'][:,:-1],axis=1)/Emax # correction factor for MWL
+        Etap=num.maximum(num.nanmax(Out['Eta'][:,:-1],axis=1)/coef0,0) # corrected MWL at shoreline in presence of habitat
+        Hp=(Etap/(0.35*m))**2/Lo
+        Rnpveg=1.1*(Etap+num.sqrt(Lo*(Hp*0.563*m**2+Ho*0.004))/2) # runup with vegetation
+        Ratio=(Out['H']/Out['Hs'])**3;Valid=~num.isnan(Ratio)
+        Count=Valid.sum(axis=1)
+        Diss=num.where(Count>0,num.where(Valid,Ratio,0).sum(axis=1)/num.maximum(Count,1),num.nan) # dissipation due to vegetation
+        return {'Bare':R1,'Runup':Rnp1,'RunupHabitat':Rnpveg,'Dissipation':Diss}
+
+    Shore=num.arange(len(X))>=X.max() # shoreward of the shoreline, tested on the indices as in CP1_WavesErosion
+    Lengths=[]
+    for Ubot in [Out['Ubots'],Out['Ubot']]:
+        Ubot=num.nan_to_num(Ubot)
+        Rate,Trms,Tc,Tw,Te=MudErosion(Ubot*0,Ubot,h,To[:,num.newaxis],Site['me'],Site['Cm'])
+        Lengths.append(((Trms>Te)&Shore).sum(axis=1)*dx) # length of bed that erodes
+    return {'Bare':Lengths[0],'Habitat':Lengths[1]}
+
+def ScaledRetreat(R,Runup,RunupHabitat,Dissipation):
+    """ beach retreat R scaled by the runup with the habitat and by the
+    dissipation due to the habitat (by the runup only where Dissipation is
+    NaN) """
+    R_rnp=R*RunupHabitat/Runup
+    return R_rnp,num.where(num.isnan(Dissipation),R_rnp,R*Dissipation)
+
+def ProfileRetreat(Site,Ho,To,S,A,Roots=None,Trunk=None,Canop=None,VegXloc=None):
+    """ wave, runup and erosion chain of CP1_WavesErosion on a vegetated
+    profile, for several conditions at once
+
+    Site: dictionary of the profile and site inputs: X, h, Sand (1 sandy
+        beach, 0 mud), StormDur, Cf (optional), m, B, D, W for beaches and
+        me, Cm for mud; Roots, Trunk, Canop and VegXloc (as in
+        CP1_WavesErosion) unless they are passed as arguments
+    Ho, To, S, A: offshore wave height and period, surge and profile scale
+        factor, one value per condition (scalars are used for every
+        condition); the runup and the beach retreat use the offshore wave
+        height, the wave model the wave height at the first grid point
+
+    Returns the retreat without and with the habitat, one value per
+    condition: the beach retreat [m] for sandy beaches and the length of bed
+    where mud erodes [m] otherwise.
+    """
+    T=RetreatTerms(Site,Ho,To,S,A,Roots,Trunk,Canop,VegXloc)
+    if not Site['Sand']:
+        return T['Bare'],T['Habitat']
+    R_rnp,R_dissip=ScaledRetreat(T['Bare'],T['Runup'],T['RunupHabitat'],T['Dissipation'])
+    return T['Bare'],0.5*(R_rnp+R_dissip)
+
+def ScenarioRetreat(Initial,Management,Ho,To,S,A):
+    """ ProfileRetreat for the initial conditions and for a management
+    action, compared as in CP1_WavesErosion
+
+    Initial, Management: sites of the two conditions (see ProfileRetreat)
+
+    If the management action changes the habitats (scenario E of
+    CP1_WavesErosion) on a sandy beach, the runup with the habitat is capped
+    at the runup without it, the initial conditions use the smaller of the
+    two dissipation ratios, and both retreats are the mean of the runup and
+    dissipation scalings, or the runup scaling alone, whichever differs more
+    between the two conditions.  Otherwise each condition is ProfileRetreat.
+
+    Returns the (without, with the habitat) retreats of the initial
+    conditions and of the management action, one value per condition each.
+    """
+    T=[RetreatTerms(Case,Ho,To,S,A) for Case in [Initial,Management]]
+    if not Initial['Sand']:
+        return [(Case['Bare'],Case['Habitat']) for Case in T]
+    Changed=[not num.array_equal(Initial[name],Management[name]) for name in ['VegXloc','Roots','Trunk','Canop']]
+    if not num.any(Initial['VegXloc']) or not any(Changed): # scenarios A to D
+        Out=[]
+        for Case in T:
+            R_rnp,R_dissip=ScaledRetreat(Case['Bare'],Case['Runup'],Case['RunupHabitat'],Case['Dissipation'])
+            Out.append((Case['Bare'],0.5*(R_rnp+R_dissip)))
+        return Out
+
+    Before,After=T
+    Diss=num.minimum(Before['Dissipation'],After['Dissipation']) # NaN if either wave model gives none
+    R_rnp,R_dissip=ScaledRetreat(Before['Bare'],Before['Runup'],num.minimum(Before['RunupHabitat'],Before['Runup']),Diss)
+    R_rnpMA,R_dissipMA=ScaledRetreat(After['Bare'],After['Runup'],num.minimum(After['RunupHabitat'],After['Runup']),After['Dissipation'])
+    Mean=0.5*(R_rnp+R_dissip);MeanMA=0.5*(R_rnpMA+R_dissipMA)
+    Both=abs(Mean-MeanMA)>abs(R_rnp-R_rnpMA) # the pair that differs more
+    return [(Before['Bare'],num.where(Both,Mean,R_rnp)),(After['Bare'],num.where(Both,MeanMA,R_rnpMA))]
+
+def ClearCache():
+    """ empties the breaking depth cache """
+    BreakingCache.clear()
+    del CacheOrder[:]
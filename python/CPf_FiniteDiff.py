@@ -0,0 +1,71 @@
+# Marine InVEST: Coastal Protection (Finite Differences)
+# Coded for ArcGIS 9.3, 10, 10.1
+
+import time
+import numpy as num
+
+# All operators work along the last axis, so a (conditions x points) batch is
+# differenced or integrated row by row in one call.  dx is either the grid
+# spacing or the node positions of a non-uniform grid.
+
+def Spacing(dx):
+    """ grid steps for a uniform spacing (scalar) or node positions (array) """
+    if num.ndim(dx):
+        return num.diff(num.asarray(dx,dtype=float))
+    return dx
+
+def Gradient(f,dx):
+    """ centered differences of f, one-sided at both ends; same length as f """
+    f=num.asarray(f,dtype=float)
+    if num.ndim(dx):
+        x=num.asarray(dx,dtype=float)
+        dx1=x[1]-x[0];dxn=x[-1]-x[-2];dx2=x[2:]-x[:-2]
+    else:
+        dx1=dx;dxn=dx;dx2=2.0*dx
+    df=num.empty(f.shape)
+    df[...,0]=(f[...,1]-f[...,0])/dx1
+    df[...,1:-1]=(f[...,2:]-f[...,:-2])/dx2
+    df[...,-1]=(f[...,-1]-f[...,-2])/dxn
+    return df
+
+def Difference(f,dx):
+    """ one-sided differences between consecutive points of f; one point
+    shorter than f (forward differences at f[:-1], backward at f[1:]) """
+    f=num.asarray(f,dtype=float)
+    return (f[...,1:]-f[...,:-1])/Spacing(dx)
+
+def CumIntegral(f,dx):
+    """ cumulative trapezoidal integral of f, starting at 0 """
+    f=num.asarray(f,dtype=float)
+    out=num.zeros(f.shape)
+    out[...,1:]=num.cumsum(0.5*Spacing(dx)*(f[...,1:]+f[...,:-1]),axis=-1)
+    return out
+
+def ListGradient(f,z):
+    # the list based gradient() CP1_WavesErosion used before this module; kept as the benchmark reference
+    length=len(f)
+    df=length*[0.0]
+    df[0]=(f[1]-f[0])/z
+    for i in range(1,length-1):
+        df[i]=(f[i+1]-f[i-1])/(2.0*z)
+    df[length-1]=(f[length-1]-f[length-2])/z
+    return df
+
+def Benchmark(sizes=(100000,1000000),repeat=3):
+    """ times Gradient() against the list based gradient on random profiles
+
+    Returns a list of (points, list seconds, array seconds, largest difference).
+    """
+    Results=[]
+    for lx in sizes:
+        f=num.random.rand(lx);fl=f.tolist();dx=1.0
+        tl=ta=1e300
+        for ii in range(repeat):
+            t=time.time();ref=ListGradient(fl,dx);tl=min(tl,time.time()-t)
+            t=time.time();new=Gradient(f,dx);ta=min(ta,time.time()-t)
+        Results.append((lx,tl,ta,abs(num.array(ref)-new).max()))
+    return Results
+
+if __name__=="__main__":
+    for lx,tl,ta,err in Benchmark():
+        print "%8d points: list %.4fs, array %.5fs, %.0fx faster, max difference %.1e" % (lx,tl,ta,tl/ta,err)
@@ -0,0 +1,572 @@
+# Marine InVEST: Geoprocessor Backends
+# Coded for ArcGIS 9.3, 10, 10.1
+
+import os, sys, re, math, shutil
+import numpy as num
+
+# Create() returns the geoprocessor the scripts call as gp.  Two backends:
+#
+#   'arc'   ArcGIS (arcgisscripting, or arcpy).  Extensions asked for with
+#           CheckOutExtension are only checked out when a tool of their
+#           toolbox first runs, so a script that never runs a Spatial Analyst
+#           tool never waits for a Spatial Analyst license.
+#   'local' NumPy on plain files, without ArcGIS or licenses: messages,
+#           parameters from the command line, environment settings, folders,
+#           raster map algebra and the fetch grid tools on ESRI ASCII grids
+#           (.asc, added to names without an extension) and float grids
+#           (.flt/.hdr), and zonal statistics tables and points as CSV files.
+#           Tools it doesn't implement (vector analysis, ArcHydro, dbf
+#           cursors) raise an AttributeError naming the tool; a script that
+#           lists its tools in Create(Requires=...) gets that error before it
+#           starts, for all the missing tools at once.
+#
+# The backend is the one asked for, else the INVEST_GEOPROCESSOR environment
+# variable, else 'arc' where ArcGIS can be imported and 'local' elsewhere.
+# As in ArcGIS, the names of tools and settings aren't case sensitive.
+
+Backends=['arc','local']
+Toolboxes={'sa':'spatial'} # extension needed by each toolbox suffix, when it differs from the suffix
+
+def Create(Module="arcgisscripting",Backend=None,Deferred=1,Requires=None):
+    """ geoprocessor of the given backend; Module is the ArcGIS module the
+    script was written for ('arcgisscripting' or 'arcpy').  Deferred=0
+    checks extensions out at once, for scripts that call licensed tools
+    outside the geoprocessor.  Requires lists the tools the script runs;
+    the local backend raises an AttributeError naming those it lacks. """
+    if Backend is None:
+        Backend=os.environ.get("INVEST_GEOPROCESSOR","").lower() or None
+    if Backend is None:
+        try:
+            return Arc(Module,Deferred)
+        except ImportError:
+            Backend='local'
+    if Backend not in Backends:
+        raise ValueError, "Unknown geoprocessor backend: "+str(Backend)
+    if Backend=='arc':
+        return Arc(Module,Deferred)
+    Missing=[name for name in Requires or [] if name.lower() not in Tools]
+    if Missing:
+        raise AttributeError, "The local geoprocessor does not implement "+", ".join(Missing)+"; run this script with the ArcGIS backend"
+    return Local()
+
+class Arc(object):
+    """ ArcGIS geoprocessor with extensions checked out on first use """
+    Backend='arc'
+    def __init__(self,Module="arcgisscripting",Deferred=1):
+        if Module=="arcpy":
+            import arcpy
+            gp=arcpy
+        else:
+            import arcgisscripting
+            gp=arcgisscripting.create()
+        self.__dict__['gp']=gp;self.__dict__['Deferred']=Deferred;self.__dict__['Pending']=[]
+    def CheckOutExtension(self,Name):
+        if not self.Deferred:
+            return self.gp.CheckOutExtension(Name)
+        if Name.lower() not in self.Pending:
+            self.Pending.append(Name.lower())
+        return "CheckedOut"
+    def CheckOut(self,Toolbox):
+        # checks out the extension a toolbox needs, if it was asked for
+        Name=Toolboxes.get(Toolbox,Toolbox)
+        if Name in self.Pending:
+            self.gp.CheckOutExtension(Name) # a failure shows when the tool runs, as before
+            self.Pending.remove(Name)
+    def __getattr__(self,name):
+        val=getattr(self.gp,name)
+        if "_" not in name or not callable(val) or not self.Pending:
+            return val
+        Toolbox=name.split("_")[-1].lower()
+        def Tool(*args):
+            self.CheckOut(Toolbox)
+            return val(*args)
+        return Tool
+    def __setattr__(self,name,value):
+        setattr(self.gp,name,value)
+
+################################################
+############# LOCAL RASTERS AND TABLES ##########
+################################################
+
+NoData=-9999.0
+RasterExtensions=['.asc','.flt']
+
+def RasterPath(Path):
+    """ file of a raster: the name itself with a raster extension, an ESRI
+    ASCII grid (.asc) otherwise """
+    if os.path.splitext(Path)[1].lower() in RasterExtensions:
+        return Path
+    return Path+".asc"
+
+def TablePath(Path):
+    """ CSV file holding a table (a .dbf name is stored as .csv) """
+    return os.path.splitext(Path)[0]+".csv"
+
+def ReadHeader(Lines):
+    # grid header: ncols, nrows, corner (or cell center), cellsize and nodata value
+    Header={'nodata_value':NoData}
+    for line in Lines:
+        key,val=line.split()[:2]
+        Header[key.lower()]=val
+    for key in ['xllcenter','yllcenter']:
+        if key in Header:
+            Header[key[:3]+'corner']=float(Header[key])-0.5*float(Header['cellsize'])
+    Grid={'ncols':int(Header['ncols']),'nrows':int(Header['nrows']),'cellsize':float(Header['cellsize']),
+        'xllcorner':float(Header['xllcorner']),'yllcorner':float(Header['yllcorner'])}
+    return Grid,float(Header['nodata_value']),Header.get('byteorder','lsbfirst').lower()
+
+def ReadRaster(Path):
+    """ cell values (NaN for NoData, first row north) and grid of a raster """
+    Path=RasterPath(Path)
+    if Path.lower().endswith(".flt"):
+        Grid,Missing,Order=ReadHeader([line for line in open(Path[:-3]+"hdr","r").read().split("\n") if line.strip()])
+        Data=num.fromfile(Path,dtype=[">f4","<f4"][Order.startswith("lsb")]).astype(float)
+    else:
+        Text=open(Path,"r").read()
+        Lines=Text.split("\n",6)
+        Count=0
+        while Lines[Count].strip()[:1].isalpha(): # header lines
+            Count+=1
+        Grid,Missing,Order=ReadHeader(Lines[:Count])
+        Data=num.fromstring(" ".join(Text.split("\n",Count)[Count:]),sep=" ")
+    if Data.size<>Grid['nrows']*Grid['ncols']:
+        raise ValueError, "The raster doesn't have nrows x ncols values: "+Path
+    Data=Data.reshape(Grid['nrows'],Grid['ncols'])
+    Data[Data==Missing]=num.nan
+    return Data,Grid
+
+def WriteRaster(Path,Data,Grid):
+    """ writes a raster (NaN cells are NoData) as an ESRI ASCII or float grid """
+    Path=RasterPath(Path)
+    Data=num.where(num.isnan(Data),NoData,Data)
+    Header=["ncols %d" % Grid['ncols'],"nrows %d" % Grid['nrows'],"xllcorner %r" % Grid['xllcorner'],
+        "yllcorner %r" % Grid['yllcorner'],"cellsize %r" % Grid['cellsize'],"NODATA_value %r" % NoData]
+    if Path.lower().endswith(".flt"):
+        HeaderFile=open(Path[:-3]+"hdr","w")
+        HeaderFile.write("\n".join(Header+[["byteorder LSBFIRST","byteorder MSBFIRST"][sys.byteorder=="big"]])+"\n")
+        HeaderFile.close()
+        Data.astype(num.float32).tofile(Path)
+        return
+    Out=open(Path,"w")
+    try:
+        Out.write("\n".join(Header)+"\n")
+        num.savetxt(Out,Data,fmt="%.10g")
+    finally:
+        Out.close()
+
+def Extent(Grid):
+    # xmin, ymin, xmax, ymax of a grid
+    return (Grid['xllcorner'],Grid['yllcorner'],Grid['xllcorner']+Grid['ncols']*Grid['cellsize'],
+        Grid['yllcorner']+Grid['nrows']*Grid['cellsize'])
+
+def CellCenters(Grid):
+    # x of the columns and y of the rows (first row north)
+    x=Grid['xllcorner']+(num.arange(Grid['ncols'])+0.5)*Grid['cellsize']
+    y=Grid['yllcorner']+(Grid['nrows']-num.arange(Grid['nrows'])-0.5)*Grid['cellsize']
+    return x,y
+
+def Sample(Data,Grid,x,y,Interpolate=0):
+    """ raster values at points x, y: the cell holding each point, or a
+    bilinear interpolation between cell centers; NaN outside the raster """
+    x=num.asarray(x,dtype=float);y=num.asarray(y,dtype=float)
+    c=(x-Grid['xllcorner'])/Grid['cellsize']-0.5 # column of the point, 0 at the first cell center
+    r=Grid['nrows']-(y-Grid['yllcorner'])/Grid['cellsize']-0.5
+    Inside=(c>=-0.5)&(c<Grid['ncols']-0.5)&(r>=-0.5)&(r<Grid['nrows']-0.5)
+    if not Interpolate:
+        ci=num.clip(num.floor(c+0.5).astype(int),0,Grid['ncols']-1);ri=num.clip(num.floor(r+0.5).astype(int),0,Grid['nrows']-1)
+        return num.where(Inside,Data[ri,ci],num.nan)
+    c=num.clip(c,0,Grid['ncols']-1);r=num.clip(r,0,Grid['nrows']-1)
+    c0=num.minimum(num.floor(c).astype(int),max(Grid['ncols']-2,0));r0=num.minimum(num.floor(r).astype(int),max(Grid['nrows']-2,0))
+    c1=num.minimum(c0+1,Grid['ncols']-1);r1=num.minimum(r0+1,Grid['nrows']-1)
+    fc=c-c0;fr=r-r0
+    Val=(Data[r0,c0]*(1-fc)*(1-fr)+Data[r0,c1]*fc*(1-fr)+Data[r1,c0]*(1-fc)*fr+Data[r1,c1]*fc*fr)
+    return num.where(Inside,Val,num.nan)
+
+def ReadTable(Path):
+    """ rows of a CSV table with a header row, as dictionaries of numbers or text """
+    Lines=[line for line in open(TablePath(Path),"r").read().split("\n") if line.strip()]
+    Header=[val.strip() for val in Lines[0].split(",")]
+    Rows=[]
+    for line in Lines[1:]:
+        Row={}
+        for name,val in zip(Header,line.split(",")):
+            try:
+                Row[name]=float(val)
+            except ValueError:
+                Row[name]=val.strip()
+        Rows.append(Row)
+    return Header,Rows
+
+def WriteTable(Path,Header,Rows):
+    """ writes rows (dictionaries) as a CSV table """
+    Out=open(TablePath(Path),"w")
+    Out.write(",".join(Header)+"\n")
+    for Row in Rows:
+        Out.write(",".join([str(Row[name]) for name in Header])+"\n")
+    Out.close()
+
+################################################
+################ MAP ALGEBRA ###################
+################################################
+
+def Operand(gp,Value):
+    # a raster or a constant, with the grid of the raster (None for a constant)
+    if isinstance(Value,(int,long,float)):
+        return float(Value),None
+    try:
+        return float(Value),None
+    except ValueError:
+        return ReadRaster(gp.Path(Value))
+
+def SameGrid(Grids):
+    # the grid shared by the rasters of an operation
+    Grids=[Grid for Grid in Grids if Grid is not None]
+    if not Grids:
+        raise ValueError, "At least one input must be a raster"
+    for Grid in Grids[1:]:
+        if Grid<>Grids[0]:
+            raise ValueError, "The local geoprocessor needs rasters on the same grid"
+    return Grids[0]
+
+def Arithmetic(Op):
+    # Plus, Minus, Times and Divide tools
+    def Tool(gp,In1,In2,Out):
+        A,GridA=Operand(gp,In1);B,GridB=Operand(gp,In2)
+        Err=num.seterr(divide='ignore',invalid='ignore')
+        try:
+            Data=Op(A,B)
+        finally:
+            num.seterr(**Err)
+        Data=num.where(num.isinf(Data),num.nan,Data) # division by zero gives NoData
+        WriteRaster(gp.Path(Out),Data,SameGrid([GridA,GridB]))
+    return Tool
+
+def FocalMean(Data,Shape,Width,Height=None):
+    """ mean of the cells in a Width x Height rectangle around every cell,
+    ignoring NoData; NoData where the rectangle holds no data """
+    if Height is None:
+        Height=Width
+    Width=int(Width);Height=int(Height)
+    Valid=~num.isnan(Data)
+    Sums=[]
+    for Grid in [num.where(Valid,Data,0.0),Valid.astype(float)]:
+        Pad=num.zeros((Grid.shape[0]+Height,Grid.shape[1]+Width))
+        Pad[Height//2+1:Height//2+1+Grid.shape[0],Width//2+1:Width//2+1+Grid.shape[1]]=Grid
+        Cum=Pad.cumsum(0).cumsum(1) # window sums from the summed area table
+        Sums.append(Cum[Height:,Width:]-Cum[:-Height,Width:]-Cum[Height:,:-Width]+Cum[:-Height,:-Width])
+    Err=num.seterr(divide='ignore',invalid='ignore')
+    try:
+        return num.where(Sums[1]>0,Sums[0]/Sums[1],num.nan)
+    finally:
+        num.seterr(**Err)
+
+def Con(Condition,TrueValue,FalseValue=num.nan):
+    return num.where(num.nan_to_num(Condition).astype(bool),TrueValue,FalseValue)
+
+MapFunctions={'CON':Con,'ISNULL':num.isnan,'FOCALMEAN':FocalMean,'ABS':num.abs,'EXP':num.exp,'LN':num.log,
+    'SQRT':num.sqrt,'RECTANGLE':'RECTANGLE'}
+Delimiters=re.compile(r'(\s[-/]\s|[(),]|[<>=!]=|[<>]|[*+])') # - and / only between spaces, as they appear in paths
+
+def MapAlgebra(gp,Expression):
+    """ value and grid of a single output map algebra expression: arithmetic,
+    comparisons and the functions of MapFunctions on rasters named by path """
+    Names={};Grids=[];Code=[]
+    for Token in Delimiters.split(Expression):
+        Word=Token.strip()
+        if not Word:
+            continue
+        if Delimiters.match(Token):
+            Code.append(Word)
+        elif Word.upper() in MapFunctions:
+            Code.append(Word.upper())
+        else:
+            try:
+                Code.append(repr(float(Word)))
+            except ValueError:
+                if Word not in Names:
+                    Data,Grid=ReadRaster(gp.Path(Word))
+                    Names[Word]=("r%d" % len(Names),Data);Grids.append(Grid)
+                Code.append(Names[Word][0])
+    Values=dict(MapFunctions)
+    for Name,Data in Names.values():
+        Values[Name]=Data
+    Err=num.seterr(divide='ignore',invalid='ignore')
+    try:
+        Data=eval(" ".join(Code),{"__builtins__":{}},Values)
+    finally:
+        num.seterr(**Err)
+    Grid=SameGrid(Grids)
+    Data=num.zeros((Grid['nrows'],Grid['ncols']))+Data
+    return num.where(num.isinf(Data),num.nan,Data),Grid
+
+def ZoneValues(gp,Zones,Values):
+    # zone of every valid cell and its value
+    Zone,ZoneGrid=ReadRaster(gp.Path(Zones))
+    Data,Grid=ReadRaster(gp.Path(Values))
+    SameGrid([ZoneGrid,Grid])
+    Valid=~num.isnan(Zone)&~num.isnan(Data)
+    return Zone,Zone[Valid],Data[Valid],Grid,Valid
+
+def ZoneStats(Zone,Data,Cell):
+    # statistics of the values of every zone, as columns
+    Ids,Index=num.unique(Zone,return_inverse=True)
+    Count=num.bincount(Index).astype(float)
+    Sum=num.bincount(Index,Data);Mean=Sum/Count
+    Std=num.sqrt(num.maximum(num.bincount(Index,Data**2)/Count-Mean**2,0))
+    Order=num.lexsort((Data,Index))
+    First=num.searchsorted(Index[Order],num.arange(len(Ids)))
+    Last=num.searchsorted(Index[Order],num.arange(len(Ids)),side='right')-1
+    Min=Data[Order][First];Max=Data[Order][Last]
+    return {'VALUE':Ids,'COUNT':Count,'AREA':Count*Cell**2,'MIN':Min,'MAX':Max,'RANGE':Max-Min,
+        'MEAN':Mean,'STD':Std,'SUM':Sum},Index
+
+ZonalNames={'MEAN':'MEAN','SUM':'SUM','MINIMUM':'MIN','MAXIMUM':'MAX','RANGE':'RANGE','STD':'STD'}
+
+################################################
+################# LOCAL TOOLS ##################
+################################################
+
+def AddMessage(gp,Msg):
+    gp.Messages.append((0,str(Msg)));print Msg
+def AddWarning(gp,Msg):
+    gp.Messages.append((1,str(Msg)));print "WARNING: "+str(Msg)
+def AddError(gp,Msg):
+    gp.Messages.append((2,str(Msg)));sys.stderr.write("ERROR: "+str(Msg)+"\n")
+
+def GetMessages(gp,Severity=None):
+    return "\n".join([Msg for Level,Msg in gp.Messages if Severity is None or Level==Severity])
+
+def GetParameterAsText(gp,Index):
+    # script arguments; "#" stands for an empty optional parameter, as in ArcGIS
+    if Index+1<len(sys.argv) and sys.argv[Index+1]<>"#":
+        return sys.argv[Index+1]
+    return ""
+
+def GetInstallInfo(gp,Product="desktop"):
+    return {"Version":"local","ProductName":"Local NumPy geoprocessor"}
+
+def CheckOutExtension(gp,Name):
+    return "CheckedOut" # no licenses needed
+
+def Exists(gp,Path):
+    Path=gp.Path(Path)
+    return os.path.exists(Path) or os.path.exists(RasterPath(Path)) or os.path.exists(TablePath(Path))
+
+def Delete(gp,Path,DataType=None):
+    Path=gp.Path(Path)
+    for name in [Path,RasterPath(Path),TablePath(Path)]:
+        if os.path.isdir(name):
+            shutil.rmtree(name)
+        elif os.path.exists(name):
+            os.remove(name)
+            if name.lower().endswith(".flt") and os.path.exists(name[:-3]+"hdr"):
+                os.remove(name[:-3]+"hdr")
+
+def CreateFolder(gp,Parent,Name):
+    Path=os.path.join(gp.Path(Parent),Name)
+    if not os.path.isdir(Path):
+        os.makedirs(Path)
+
+class Description:
+    """ result of Describe(): the data type and, for rasters, the extent
+    ("xmin ymin xmax ymax"), cell size and number of columns and rows """
+    def __init__(self,Path):
+        self.CatalogPath=Path
+        if os.path.isdir(Path):
+            self.DataType="Folder"
+        elif os.path.exists(RasterPath(Path)):
+            Data,Grid=ReadRaster(Path)
+            self.DataType="RasterDataset"
+            self.Extent=" ".join([repr(val) for val in Extent(Grid)])
+            self.MeanCellWidth=self.MeanCellHeight=Grid['cellsize']
+            self.Width=Grid['ncols'];self.Height=Grid['nrows']
+        elif os.path.exists(TablePath(Path)):
+            self.DataType="Table"
+        else:
+            raise IOError, "Cannot describe "+Path
+
+def Describe(gp,Path):
+    return Description(gp.Path(Path))
+
+def CopyRaster(gp,In,Out,*args):
+    Data,Grid=ReadRaster(gp.Path(In))
+    WriteRaster(gp.Path(Out),Data,Grid)
+
+def SingleOutputMapAlgebra(gp,Expression,Out,*args):
+    Data,Grid=MapAlgebra(gp,Expression)
+    WriteRaster(gp.Path(Out),Data,Grid)
+
+def WeightedSum(gp,Table,Out):
+    # Table: "raster field weight;raster field weight;..." (the VALUE field only)
+    Total=None;Grids=[]
+    for Item in Table.split(";"):
+        Words=Item.split()
+        Data,Grid=ReadRaster(gp.Path(" ".join(Words[:-2])))
+        Grids.append(Grid)
+        if Total is None:
+            Total=Data*float(Words[-1])
+        else:
+            Total=Total+Data*float(Words[-1])
+    WriteRaster(gp.Path(Out),Total,SameGrid(Grids))
+
+def Slice(gp,In,Out,Zones,Method="EQUAL_INTERVAL",Base=1):
+    # cells grouped in Zones classes of equal range or of equal number of cells
+    Data,Grid=ReadRaster(gp.Path(In))
+    Zones=int(Zones);Valid=~num.isnan(Data);Values=Data[Valid]
+    if Method.upper()=="EQUAL_AREA":
+        Rank=num.empty(len(Values));Rank[num.argsort(Values,kind='mergesort')]=num.arange(len(Values))
+        Class=num.floor(Rank*Zones/len(Values))
+    else:
+        Span=Values.max()-Values.min()
+        Class=num.floor((Values-Values.min())*Zones/num.where(Span>0,Span,1))
+    Out_=num.zeros(Data.shape)+num.nan
+    Out_[Valid]=num.minimum(Class,Zones-1)+int(Base)
+    WriteRaster(gp.Path(Out),Out_,Grid)
+
+def GetRasterProperties(gp,In,Property):
+    Data,Grid=ReadRaster(gp.Path(In))
+    Property=Property.upper()
+    Properties={'MINIMUM':num.min,'MAXIMUM':num.max,'MEAN':num.mean,'STD':num.std}
+    if Property in Properties:
+        return float(Properties[Property](Data[~num.isnan(Data)]))
+    elif Property in ['CELLSIZEX','CELLSIZEY']:
+        return Grid['cellsize']
+    elif Property=='COLUMNCOUNT':
+        return Grid['ncols']
+    elif Property=='ROWCOUNT':
+        return Grid['nrows']
+    Names=['LEFT','BOTTOM','RIGHT','TOP']
+    if Property in Names:
+        return Extent(Grid)[Names.index(Property)]
+    raise ValueError, "Unknown raster property: "+Property
+
+def ZonalStatistics(gp,Zones,Field,Values,Out,Statistic="MEAN",IgnoreNoData="DATA"):
+    # raster zones only; every cell of a zone gets the statistic of the zone
+    Zone,ZoneIds,Data,Grid,Valid=ZoneValues(gp,Zones,Values)
+    Name=ZonalNames.get(Statistic.upper())
+    if Name is None:
+        raise ValueError, "The local geoprocessor can't compute the zonal "+Statistic
+    Stats,Index=ZoneStats(ZoneIds,Data,Grid['cellsize'])
+    Result=num.zeros(Zone.shape)+num.nan
+    Result[Valid]=Stats[Name][Index]
+    WriteRaster(gp.Path(Out),Result,Grid)
+
+def ZonalStatisticsAsTable(gp,Zones,Field,Values,Out,IgnoreNoData="DATA"):
+    # raster zones only; the table is written as CSV
+    Zone,ZoneIds,Data,Grid,Valid=ZoneValues(gp,Zones,Values)
+    Stats,Index=ZoneStats(ZoneIds,Data,Grid['cellsize'])
+    Header=[Field.upper(),'COUNT','AREA','MIN','MAX','RANGE','MEAN','STD','SUM']
+    Stats[Field.upper()]=Stats['VALUE']
+    Rows=[dict([(name,repr(float(Stats[name][ii]))) for name in Header]) for ii in range(len(Stats['VALUE']))]
+    WriteTable(gp.Path(Out),Header,Rows)
+
+def ExtractValuesToPoints(gp,Points,Raster,Out,Interpolate="NONE",*args):
+    # points: CSV table with X and Y columns; RASTERVALU is added, -9999 outside the raster
+    Header,Rows=ReadTable(gp.Path(Points))
+    Data,Grid=ReadRaster(gp.Path(Raster))
+    Val=Sample(Data,Grid,[Row['X'] for Row in Rows],[Row['Y'] for Row in Rows],Interpolate.upper()=="INTERPOLATE")
+    for Row,val in zip(Rows,num.where(num.isnan(Val),NoData,Val)):
+        Row['RASTERVALU']=repr(float(val))
+    WriteTable(gp.Path(Out),[name for name in Header if name<>'RASTERVALU']+['RASTERVALU'],Rows)
+
+def Clip(gp,In,Rectangle,Out,*args):
+    # cells whose centers are inside "xmin ymin xmax ymax"
+    Data,Grid=ReadRaster(gp.Path(In))
+    xmin,ymin,xmax,ymax=[float(val) for val in str(Rectangle).split()]
+    x,y=CellCenters(Grid)
+    Cols=num.nonzero((x>=xmin)&(x<=xmax))[0];Rows=num.nonzero((y>=ymin)&(y<=ymax))[0]
+    if not len(Cols) or not len(Rows):
+        raise ValueError, "The clip rectangle doesn't overlap "+In
+    Clipped=dict(Grid)
+    Clipped['ncols']=len(Cols);Clipped['nrows']=len(Rows)
+    Clipped['xllcorner']=Grid['xllcorner']+Cols[0]*Grid['cellsize']
+    Clipped['yllcorner']=Grid['yllcorner']+(Grid['nrows']-1-Rows[-1])*Grid['cellsize']
+    WriteRaster(gp.Path(Out),Data[Rows[0]:Rows[-1]+1,Cols[0]:Cols[-1]+1],Clipped)
+
+def Rotate(gp,In,Out,Angle,Pivot=None,Resampling="NEAREST"):
+    # clockwise rotation about the pivot "x y" (the grid center by default), nearest cell
+    Data,Grid=ReadRaster(gp.Path(In))
+    xmin,ymin,xmax,ymax=Extent(Grid)
+    if Pivot is None:
+        Pivot="%r %r" % (0.5*(xmin+xmax),0.5*(ymin+ymax))
+    px,py=[float(val) for val in str(Pivot).split()]
+    a=math.radians(float(Angle));ca=math.cos(a);sa=math.sin(a)
+    Cx=num.array([xmin,xmax,xmin,xmax])-px;Cy=num.array([ymin,ymin,ymax,ymax])-py
+    Rx=px+Cx*ca+Cy*sa;Ry=py-Cx*sa+Cy*ca # rotated corners
+    Cell=Grid['cellsize']
+    Rotated={'cellsize':Cell,'xllcorner':Rx.min(),'yllcorner':Ry.min(),
+        'ncols':int(math.ceil((Rx.max()-Rx.min())/Cell-1e-9)),'nrows':int(math.ceil((Ry.max()-Ry.min())/Cell-1e-9))}
+    x,y=CellCenters(Rotated)
+    X,Y=num.meshgrid(x-px,y-py)
+    Xi=px+X*ca-Y*sa;Yi=py+X*sa+Y*ca # back to the input grid
+    WriteRaster(gp.Path(Out),Sample(Data,Grid,Xi,Yi),Rotated)
+
+def RasterToFloat(gp,In,Out):
+    CopyRaster(gp,In,os.path.splitext(Out)[0]+".flt")
+def FloatToRaster(gp,In,Out):
+    CopyRaster(gp,os.path.splitext(In)[0]+".flt",Out)
+
+class Cursor:
+    """ rows of a CSV table, read with Next() (None after the last one) """
+    def __init__(self,Rows):
+        self.Rows=Rows;self.Index=0
+    def Next(self):
+        if self.Index>=len(self.Rows):
+            return None
+        self.Index+=1
+        return TableRow(self.Rows[self.Index-1])
+    next=Next
+    def Reset(self):
+        self.Index=0
+    reset=Reset
+
+class TableRow:
+    def __init__(self,Values):
+        self.Values=dict([(name.upper(),val) for name,val in Values.items()])
+    def GetValue(self,Name):
+        return self.Values[Name.upper()]
+    getValue=GetValue;getvalue=GetValue
+
+def SearchCursor(gp,Table,Where="",Reference="",Fields="",Sort=""):
+    # Where clauses aren't supported; Sort is "FIELD A" or "FIELD D", separated by ;
+    if Where:
+        raise ValueError, "The local geoprocessor doesn't filter cursors"
+    Header,Rows=ReadTable(gp.Path(Table))
+    for Key in reversed([key.split() for key in Sort.split(";") if key.strip()]):
+        Rows.sort(key=lambda Row: Row[Key[0]],reverse=len(Key)>1 and Key[1].upper()=="D")
+    return Cursor(Rows)
+
+Tools={}
+for name,Tool in [('AddMessage',AddMessage),('AddWarning',AddWarning),('AddError',AddError),('GetMessages',GetMessages),
+    ('GetParameterAsText',GetParameterAsText),('GetInstallInfo',GetInstallInfo),('CheckOutExtension',CheckOutExtension),
+    ('Exists',Exists),('Delete',Delete),('Delete_management',Delete),('CreateFolder_management',CreateFolder),
+    ('Describe',Describe),('CopyRaster_management',CopyRaster),('CopyRaster',CopyRaster),
+    ('Plus_sa',Arithmetic(num.add)),('Minus_sa',Arithmetic(num.subtract)),('Times_sa',Arithmetic(num.multiply)),
+    ('Divide_sa',Arithmetic(num.divide)),('SingleOutputMapAlgebra_sa',SingleOutputMapAlgebra),('WeightedSum_sa',WeightedSum),
+    ('Slice_sa',Slice),('GetRasterProperties_management',GetRasterProperties),('ZonalStatistics_sa',ZonalStatistics),
+    ('ZonalStatisticsAsTable_sa',ZonalStatisticsAsTable),('ExtractValuesToPoints_sa',ExtractValuesToPoints),
+    ('Clip_management',Clip),('Rotate_management',Rotate),('RasterToFloat_conversion',RasterToFloat),
+    ('FloatToRaster_conversion',FloatToRaster),('SearchCursor',SearchCursor)]:
+    Tools[name.lower()]=Tool
+
+class Local(object):
+    """ geoprocessor running the tools of Tools on NumPy arrays and plain files """
+    Backend='local'
+    def __init__(self):
+        self.__dict__['Messages']=[]
+        self.__dict__['Environment']={'workspace':os.getcwd(),'scratchworkspace':None,'overwriteoutput':1}
+    def Path(self,Path):
+        """ Path, relative to the workspace unless it is absolute """
+        return os.path.join(self.Environment['workspace'] or "",str(Path))
+    def __getattr__(self,name):
+        if name.startswith("__"): # copy and pickle look these up before __init__ has run
+            raise AttributeError, name
+        key=name.lower()
+        if key in Tools:
+            Tool=Tools[key]
+            return lambda *args: Tool(self,*args)
+        if key in self.Environment:
+            return self.Environment[key]
+        raise AttributeError, "The local geoprocessor does not implement "+name+"; run this tool with the ArcGIS backend"
+    def __setattr__(self,name,value):
+        self.Environment[name.lower()]=value
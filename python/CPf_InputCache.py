@@ -0,0 +1,100 @@
+# Marine InVEST: Coastal Protection (Parsed Input Cache)
+# Coded for ArcGIS 9.3, 10, 10.1
+
+import os, hashlib
+import numpy as num
+
+CacheVersion=1 # change when the parsing of the inputs changes, so older entries are never used
+CacheMaxBytes=64*1024*1024 # total size of the cache files kept in a cache directory
+
+def Key(Files,Extra=()):
+    """ hash of the content of Files and of the other values the parsing depends on """
+    Hash=hashlib.sha1("InputCache %d" % CacheVersion)
+    for FileName in Files:
+        Data=open(FileName,"rb")
+        try:
+            Block=Data.read(1<<20)
+            while Block:
+                Hash.update(Block)
+                Block=Data.read(1<<20)
+        finally:
+            Data.close()
+        Hash.update("\0")
+    Hash.update(repr(tuple([float(val) for val in Extra])))
+    return Hash.hexdigest()
+
+def Save(Dir,CacheKey,Params,Log=()):
+    """ stores Params (numbers, text, None or arrays) and the parsing messages
+    Log, a list of (kind, message), in Dir as CacheKey.npz; the oldest files
+    are then removed until the cache is within CacheMaxBytes.  Returns
+    whether the inputs could be stored: nothing is stored if a value has
+    another type, or is an object array (e.g. a worksheet range with empty
+    cells), which could only be saved as a pickle that Load() won't read. """
+    Arrays={};Empty=[]
+    for name,val in Params.items():
+        if val is None:
+            Empty.append(name)
+        elif isinstance(val,num.ndarray):
+            if val.dtype.hasobject:
+                return False
+            Arrays['a_'+name]=val
+        elif isinstance(val,(bool,int,long,float)):
+            Arrays['n_'+name]=num.array(val)
+        elif isinstance(val,basestring):
+            Arrays['s_'+name]=num.array(unicode(val))
+        else:
+            return False
+    Arrays['Empty']=num.array(Empty,dtype=unicode)
+    Arrays['Log']=num.array([[unicode(Kind),unicode(Msg)] for Kind,Msg in Log],dtype=unicode).reshape(-1,2)
+
+    if not os.path.isdir(Dir):
+        os.makedirs(Dir)
+    Path=os.path.join(Dir,CacheKey+".npz");Temp=Path+".tmp"
+    CacheFile=open(Temp,"wb")
+    try:
+        num.savez(CacheFile,**Arrays)
+    finally:
+        CacheFile.close()
+    if os.path.exists(Path):
+        os.remove(Path)
+    os.rename(Temp,Path)
+    Evict(Dir)
+    return True
+
+def Load(Dir,CacheKey):
+    """ (Params, Log) stored under CacheKey, or None if there are none """
+    Path=os.path.join(Dir,CacheKey+".npz")
+    if not os.path.exists(Path):
+        return None
+    try:
+        Data=num.load(Path)
+        try:
+            Params=dict([(str(name),None) for name in Data['Empty']])
+            for name in Data.files:
+                if name.startswith('a_'):
+                    Params[name[2:]]=Data[name]
+                elif name.startswith('n_'):
+                    Params[name[2:]]=Data[name].item()
+                elif name.startswith('s_'):
+                    Params[name[2:]]=unicode(Data[name])
+            Log=[(str(Kind),Msg) for Kind,Msg in Data['Log']]
+        finally:
+            Data.close()
+    except Exception: # unreadable entry; parse the inputs again
+        return None
+    os.utime(Path,None) # most recently used
+    return Params,Log
+
+def Evict(Dir,MaxBytes=None):
+    """ removes the least recently used cache files until the ones left in
+    Dir take at most MaxBytes (CacheMaxBytes by default) """
+    if MaxBytes is None:
+        MaxBytes=CacheMaxBytes
+    Files=[os.path.join(Dir,name) for name in os.listdir(Dir) if name.endswith(".npz")]
+    Files=[(os.path.getmtime(name),os.path.getsize(name),name) for name in Files]
+    Files.sort()
+    Total=sum([size for mtime,size,name in Files])
+    for mtime,size,name in Files:
+        if Total<=MaxBytes:
+            break
+        os.remove(name);Total-=size
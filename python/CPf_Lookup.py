@@ -0,0 +1,64 @@
+# Marine InVEST: Coastal Protection (Nearest Value Lookup)
+# Coded for ArcGIS 9.3, 10, 10.1
+
+import numpy as num
+
+# Indexed() returns the same point as the list based Indexed() the CP1 scripts
+# used to define: the first point of x whose value is closest to value.  On an
+# axis the caller knows to be ascending (a cross-shore grid) the point is found
+# by bisection, anywhere else by a single vectorized pass.  Callers that look
+# up several values on the same axis check IsSorted() once and pass the result.
+
+def IsSorted(x):
+    """ true if x is in ascending order (repeated values allowed) """
+    x=num.asarray(x)
+    return len(x)<2 or bool((x[1:]>=x[:-1]).all())
+
+def SortedIndexed(xs,values,Row=None):
+    """ positions in the ascending array xs of the values closest to values
+
+    values may be a scalar or an array.  Among equal values of xs the first
+    position is returned; between two values of xs that are equally close,
+    the one with the smaller Row (the smaller value if Row is None).
+    """
+    xs=num.asarray(xs,dtype=float);values=num.asarray(values,dtype=float)
+    ii=num.searchsorted(xs,values) # first point at or above the value
+    hi=num.searchsorted(xs,xs[num.minimum(ii,len(xs)-1)]) # first of equal values
+    lo=num.searchsorted(xs,xs[num.maximum(ii-1,0)])
+    dlo=abs(xs[lo]-values);dhi=abs(xs[hi]-values)
+    if Row is None:
+        Low=dlo<=dhi
+    else:
+        Row=num.asarray(Row)
+        Low=(dlo<dhi)|((dlo==dhi)&(Row[lo]<=Row[hi]))
+    return num.where(Low,lo,hi)
+
+def Indexed(x,value,Sorted=0):
+    """ index of the first point of x whose value is closest to value
+
+    Sorted: 1 if x is known to be in ascending order; x is not checked.
+    """
+    x=num.asarray(x,dtype=float)
+    if Sorted:
+        return int(SortedIndexed(x,value))
+    return int(num.nanargmin(abs(x-value)))
+
+def IndexedBatch(x,values,Sorted=None):
+    """ Indexed() for many values at once; returns an array of indices
+
+    An unsorted x is sorted once (keeping the order of equal values), so each
+    value costs a bisection whether x is sorted or not.
+    """
+    x=num.asarray(x,dtype=float)
+    if Sorted is None:
+        Sorted=IsSorted(x)
+    if Sorted:
+        return SortedIndexed(x,values)
+    Valid=num.nonzero(~num.isnan(x))[0]
+    Order=Valid[num.argsort(x[Valid],kind='mergesort')] # points by increasing value
+    return Order[SortedIndexed(x[Order],values,Order)]
+
+def Find(Condition):
+    """ indices where Condition is true, Condition being flattened
+    (matplotlib.mlab.find, which the CP1 scripts got from pylab) """
+    return num.nonzero(num.ravel(Condition))[0]
@@ -0,0 +1,173 @@
+# Marine InVEST: Coastal Protection (Monte Carlo Uncertainty)
+# Coded for ArcGIS 9.3, 10, 10.1
+
+import numpy as num
+from math import sqrt
+import CPf_Erosion as Erosion
+
+SampleChunk=50 # samples run by a worker at a time; statistics are updated after each chunk
+ReservoirSize=10000 # samples kept per output for the percentiles
+Uncertain=['Ho','To','S','A','VegDensity','VegExtent'] # inputs that can be sampled
+Outputs=['RetreatBare','RetreatHabitat','Avoided']
+Lower={'Ho':1e-3,'To':0.1,'A':1e-4,'VegDensity':0.0,'VegExtent':0.0} # sampled values are kept above these
+Upper={'VegExtent':1.0}
+
+def Draw(Spec,n,rs):
+    """ n values from the distribution Spec, a tuple: ('fixed',value),
+    ('uniform',low,high), ('normal',mean,sd), ('lognormal',mean,sd) of the
+    log of the value, or ('triangular',low,mode,high) """
+    Kind=Spec[0]
+    if Kind=='fixed':
+        return num.zeros(n)+Spec[1]
+    elif Kind=='uniform':
+        return rs.uniform(Spec[1],Spec[2],n)
+    elif Kind=='normal':
+        return rs.normal(Spec[1],Spec[2],n)
+    elif Kind=='lognormal':
+        return rs.lognormal(Spec[1],Spec[2],n)
+    elif Kind=='triangular':
+        return rs.triangular(Spec[1],Spec[2],Spec[3],n)
+    raise ValueError, "Unknown distribution: "+str(Kind)
+
+def Sample(Site,Inputs,n,rs):
+    """ n values of every uncertain input: drawn from Inputs[name] if it is
+    given, the nominal value in Site otherwise (1 for VegDensity and
+    VegExtent, which scale the vegetation density and the habitat length) """
+    Samples={}
+    for name in Uncertain:
+        if name in Inputs:
+            val=Draw(Inputs[name],n,rs)
+        else:
+            val=num.zeros(n)+Site.get(name,1.0)
+        if name in Lower:
+            val=num.maximum(val,Lower[name])
+        if name in Upper:
+            val=num.minimum(val,Upper[name])
+        Samples[name]=val
+    return Samples
+
+def Habitat(Site,Density,Extent):
+    """ vegetation of the site with every density scaled by Density and only
+    the shoreward fraction Extent of the vegetated points kept """
+    VegXloc=num.array(Site['VegXloc'],dtype=float)
+    Veg=num.nonzero(VegXloc)[0]
+    VegXloc[Veg[:len(Veg)-int(round(Extent*len(Veg)))]]=0 # the profile starts offshore
+    Layers=[]
+    for Layer in [Site['Roots'],Site['Trunk'],Site['Canop']]:
+        Layers.append([num.asarray(Layer[0],dtype=float)*Density,Layer[1],Layer[2]])
+    return Layers[0],Layers[1],Layers[2],VegXloc
+
+def RunSamples(Site,Ho,To,S,A,Density,Extent):
+    """ retreat without and with the habitat (see CPf_Erosion.ProfileRetreat)
+    and the avoided damage, (RetreatBare-RetreatHabitat)*Longshore*PropValue,
+    for samples that share the same vegetation; Ho, To, S and A hold one
+    value per sample """
+    Roots,Trunk,Canop,VegXloc=Habitat(Site,Density,Extent)
+    Bare,Hab=Erosion.ProfileRetreat(Site,Ho,To,S,A,Roots,Trunk,Canop,VegXloc)
+    return Bare,Hab,(Bare-Hab)*Site['Longshore']*Site['PropValue']
+
+def RunChunk(Args):
+    """ runs one chunk of samples; Args is (Site, Inputs, Seed, Chunk, n) and
+    the samples only depend on the seed and chunk number
+
+    Samples with the same vegetation density and extent (all of them when
+    those are not sampled) go through the chain in a single batched call.
+    """
+    Site,Inputs,Seed,Chunk,n=Args
+    rs=num.random.RandomState([Seed,Chunk])
+    Samples=Sample(Site,Inputs,n,rs)
+    Results=dict([(name,num.zeros(n)) for name in Outputs])
+    Groups={}
+    for ii in range(n):
+        Groups.setdefault((Samples['VegDensity'][ii],Samples['VegExtent'][ii]),[]).append(ii)
+    for (Density,Extent),Rows in Groups.items():
+        Values=RunSamples(Site,*[Samples[name][Rows] for name in ['Ho','To','S','A']]+[Density,Extent])
+        for name,val in zip(Outputs,Values):
+            Results[name][Rows]=val
+    return Results
+
+def NewStats(Seed=0):
+    """ running statistics of one output: count, mean, sum of squared
+    deviations, range and a uniform reservoir of at most ReservoirSize values """
+    return {'n':0,'Mean':0.0,'M2':0.0,'Min':num.inf,'Max':-num.inf,
+        'Reservoir':num.zeros(ReservoirSize),'rs':num.random.RandomState(Seed)}
+
+def UpdateStats(Stats,Values):
+    """ adds Values to the running statistics """
+    Values=num.asarray(Values,dtype=float);Values=Values[~num.isnan(Values)]
+    nb=len(Values)
+    if nb==0:
+        return Stats
+    na=Stats['n'];n=na+nb
+    Delta=Values.mean()-Stats['Mean'] # pairwise update of mean and variance
+    Stats['Mean']=Stats['Mean']+Delta*nb/n
+    Stats['M2']=Stats['M2']+((Values-Values.mean())**2).sum()+Delta**2*na*nb/n
+    Stats['Min']=min(Stats['Min'],Values.min());Stats['Max']=max(Stats['Max'],Values.max())
+
+    Index=num.arange(na,n) # reservoir sampling: value ii replaces a random slot with probability size/(ii+1)
+    Slot=num.where(Index<ReservoirSize,Index,(Stats['rs'].uniform(size=nb)*(Index+1)).astype(int))
+    Keep=Slot<ReservoirSize
+    Stats['Reservoir'][Slot[Keep]]=Values[Keep] # later values win, as in sequential order
+    Stats['n']=n
+    return Stats
+
+def Summary(Stats,Percentiles=(5,50,95)):
+    """ count, mean, standard deviation, range and percentiles (exact up to
+    ReservoirSize samples, estimated from the reservoir beyond) """
+    n=Stats['n']
+    Out={'n':n,'Mean':Stats['Mean'],'Std':num.nan,'Min':Stats['Min'],'Max':Stats['Max']}
+    if n>1:
+        Out['Std']=sqrt(Stats['M2']/(n-1))
+    for p in Percentiles:
+        if n:
+            Out['P'+str(p)]=num.percentile(Stats['Reservoir'][:min(n,ReservoirSize)],p)
+        else:
+            Out['P'+str(p)]=num.nan
+    return Out
+
+def Run(Site,Inputs,Samples,OutFile,Workers=None,Seed=0,Chunk=None,Percentiles=(5,50,95)):
+    """ Monte Carlo run of the wave, runup and erosion chain
+
+    Site: dictionary of the profile and nominal inputs: X, h, Roots, Trunk,
+        Canop, VegXloc (as in CP1_WavesErosion), Sand (1 sandy beach, 0 mud),
+        Ho, To, S (surge), A, StormDur, Longshore, PropValue, Cf (optional) and
+        m, B, D, W for beaches or me, Cm for mud
+    Inputs: distribution of each uncertain input (see Draw and Uncertain)
+    Samples: number of samples; OutFile: summary table
+    Workers: number of processes; None uses every processor, 1 runs here
+
+    Chunks of samples are run on a process pool and only the running
+    statistics are kept.  After each chunk the summary of every output is
+    appended to OutFile.  Returns the final summaries.  On Windows, call Run
+    from under an if __name__=="__main__": guard.
+    """
+    if Chunk is None:
+        Chunk=SampleChunk
+    Tasks=[(Site,Inputs,Seed,ii,min(Chunk,Samples-ii*Chunk)) for ii in range((Samples+Chunk-1)//Chunk)]
+    Pool=None
+    if Workers<>1:
+        try:
+            import multiprocessing
+            Pool=multiprocessing.Pool(Workers)
+        except (ImportError,OSError):
+            Pool=None
+    if Pool is None:
+        Results=(RunChunk(Task) for Task in Tasks)
+    else:
+        Results=Pool.imap(RunChunk,Tasks) # in order, so a seed always gives the same statistics
+
+    Stats=dict([(name,NewStats(Seed)) for name in Outputs])
+    Columns=['n','Mean','Std','Min','Max']+['P'+str(p) for p in Percentiles]
+    SummaryFile=open(OutFile,"w")
+    SummaryFile.write("Output,"+",".join(Columns)+"\n")
+    try:
+        for Result in Results:
+            for name in Outputs:
+                Out=Summary(UpdateStats(Stats[name],Result[name]),Percentiles)
+                SummaryFile.write(name+","+",".join(["%g" % Out[col] for col in Columns])+"\n")
+            SummaryFile.flush()
+    finally:
+        SummaryFile.close()
+        if Pool is not None:
+            Pool.terminate()
+    return dict([(name,Summary(Stats[name],Percentiles)) for name in Outputs])
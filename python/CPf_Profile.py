@@ -0,0 +1,69 @@
+# Marine InVEST: Coastal Protection (Cross-Shore Profile Files)
+# Coded for ArcGIS 9.3, 10, 10.1
+
+import os
+import numpy as num
+
+# A cross-shore profile is a list of distances X and elevations h.  It is
+# stored as a tab separated text file (one "X<tab>h" line per point), as an
+# .npy file holding a 2 x n array (X on the first row, h on the second) or
+# as an .npz file with X and h arrays.
+
+def Format(FileName):
+    """ 'npy', 'npz' or 'txt' (any other extension) """
+    Ext=os.path.splitext(FileName)[1].lower()
+    if Ext in ['.npy','.npz']:
+        return Ext[1:]
+    return 'txt'
+
+def Read(FileName,MemoryMap=1):
+    """ distances X and elevations h of a profile file
+
+    Text files are parsed in a single call; only the first two columns are
+    kept.  .npy files are memory-mapped (copy on write, so the arrays can be
+    changed without touching the file) unless MemoryMap is 0; .npz files
+    are always read in full.
+    """
+    Kind=Format(FileName)
+    if Kind=='npy':
+        if MemoryMap:
+            Data=num.load(FileName,mmap_mode='c')
+        else:
+            Data=num.load(FileName)
+        if Data.ndim<>2 or Data.shape[0]<>2:
+            raise ValueError, "A profile .npy file must hold a 2 x n array: "+FileName
+        return Data[0],Data[1]
+    elif Kind=='npz':
+        Data=num.load(FileName)
+        try:
+            X=Data['X'];h=Data['h']
+        finally:
+            Data.close()
+    else:
+        Text=open(FileName,"r").read().strip()
+        Columns=len(Text.split("\n",1)[0].split())
+        Data=num.fromstring(Text,sep=" ") # any white space separates the values; stops at the first bad one
+        if Columns<2 or Data.size<>Columns*(Text.count("\n")+1):
+            raise ValueError, "Every line of a profile must hold the same number (at least 2) of values: "+FileName
+        Data=Data.reshape(-1,Columns)
+        X=Data[:,0];h=Data[:,1]
+    if len(X)<>len(h):
+        raise ValueError, "X and h have different lengths in "+FileName
+    return X,h
+
+def Write(FileName,X,h):
+    """ writes a profile in the format of its extension (see Format) """
+    X=num.asarray(X,dtype=float);h=num.asarray(h,dtype=float)
+    if len(X)<>len(h):
+        raise ValueError, "X and h must have the same length"
+    Kind=Format(FileName)
+    if Kind=='npy':
+        num.save(FileName,num.vstack((X,h)))
+    elif Kind=='npz':
+        num.savez(FileName,X=X,h=h)
+    else:
+        num.savetxt(FileName,num.column_stack((X,h)),fmt="%.12g",delimiter="\t") # as str() writes them
+
+def Binary(FileName):
+    """ name of the .npy file written next to a text profile """
+    return os.path.splitext(FileName)[0]+".npy"
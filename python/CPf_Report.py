@@ -0,0 +1,337 @@
+# Marine InVEST: Coastal Protection (Plots of the Model Outputs)
+# Coded for ArcGIS 9.3, 10, 10.1
+
+import sys
+import numpy as num
+import CPf_Lookup as Lookup
+
+# The figures of the CP1 scripts.  matplotlib is only imported when the first
+# figure is drawn, with the non-interactive Agg backend: the figures are saved
+# as PNG files for the HTML outputs and never shown.  Each function draws one
+# figure and saves it to FileName.
+
+Dpi=640/8
+
+def Pyplot():
+    """ matplotlib.pyplot with the Agg backend (unless pyplot was already
+    imported, e.g. by another tool running in the same ArcGIS session) """
+    import matplotlib
+    if 'matplotlib.pyplot' not in sys.modules:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+def SmallFont():
+    """ font of the legends """
+    from matplotlib.font_manager import FontProperties
+    fontP=FontProperties()
+    fontP.set_size('small')
+    return fontP
+
+################################################
+############ WAVES AND EROSION MODEL ###########
+################################################
+
+def Habitats(plt,Xaxis,Depth,VegXloc,Xr):
+    """ draws the habitats present on the bed profile; returns the legend """
+    vegleg=['Bed']
+    for Code,Style,Name in [(1,'.r','Mangrove'),(2,'xr','Marsh'),(3,'+g','Seagrass'),(4,'og','Coral Reef')]:
+        if num.any(VegXloc==Code):
+            veg=Depth*0.+num.nan;veg[VegXloc==Code]=-Depth[VegXloc==Code]
+            plt.plot(Xaxis,veg,Style,linewidth=1)
+            vegleg.append(Name)
+    if num.any(VegXloc==5): # if an oyster reef is present
+        hi=-Depth[VegXloc==5]
+        Yrf=num.arange((hi),0.0,0.05);Xrf=(Yrf*0.0+Xr) # x-axis
+        plt.plot(Xrf,Yrf,'g',Xrf+.05,Yrf,'g',Xrf+.1,Yrf,'g',linewidth=2);plt.grid()
+        vegleg.append('Oyster Reef')
+    return vegleg
+
+def WaveHeight(plt,fontP,Xaxis,Wave,WaveMA,Scenario):
+    # wave height profile, before and after the management action in scenario E
+    if Scenario=="E": # only if management actions were performed on non-dune habitats will the wave height profile change
+        plt.plot(Xaxis,WaveMA,'r-',Xaxis,Wave,'g.',linewidth=2);plt.grid()
+        Legend=('After Mgmt','Before Mgmt')
+    else:
+        plt.plot(Xaxis,Wave,'g',linewidth=2);plt.grid()
+        Legend=('Wave Ht. Prof.')
+    plt.ylabel('Wave Height[m]',size='large')
+    plt.gca().legend(Legend,prop=fontP,loc='upper left',ncol=2)
+
+def WavePlot(FileName,X,Xaxis,Wave,WaveMA,Depth,VegXloc,Xr,Scenario):
+    """ wave height and bed profile with the habitats, over the whole profile """
+    plt=Pyplot();fontP=SmallFont()
+    plt.figure(1)
+    plt.subplot(211)
+    WaveHeight(plt,fontP,Xaxis,Wave,WaveMA,Scenario)
+    plt.xlim(X[-1],X[0])
+
+    ax=plt.subplot(212);plt.plot(Xaxis,-Depth,linewidth=2);plt.grid()
+    plt.xlim(X[-1],X[0])
+    vegleg=['Bed']
+    if Scenario in ["C","D","E"]: # only if there are non-dune habitats
+        vegleg=Habitats(plt,Xaxis,Depth,VegXloc,Xr)
+    plt.xlabel('Cross-Shore Distance from Shoreline',size='large')
+    ax.legend((vegleg),prop=fontP,loc='upper left',ncol=2)
+    plt.axvline(x=0,linewidth=1,color='k')
+    plt.annotate('Shoreline',xy=(1000,0))
+    plt.ylabel('Depth[m]',size='large')
+    plt.savefig(FileName,dpi=Dpi)
+
+def WavePlotZoom(FileName,Xaxis,Wave,WaveMA,Depth,VegXloc,Xr,Scenario):
+    """ WavePlot() zoomed in on the habitats """
+    plt=Pyplot();fontP=SmallFont()
+    if Scenario in ["C","D","E"]:
+        VegEnd=Lookup.Find(VegXloc>0);VegEnd=min(VegEnd[-1]+300,len(Wave)) # location of most offshore vegetation stem
+    else:
+        VegEnd=min(1000,len(Wave))
+    if VegEnd==len(Wave):
+        Xlim=(Xaxis[-1],Xaxis[0]);Ylim=(0,Wave[-1]+.3)
+    else:
+        Xlim=(Xaxis[VegEnd],Xaxis[0]);Ylim=(0,Wave[VegEnd]+.3)
+
+    plt.figure(2)
+    plt.subplot(211)
+    WaveHeight(plt,fontP,Xaxis,Wave,WaveMA,Scenario)
+    plt.xlim(*Xlim);plt.ylim(*Ylim)
+
+    ax=plt.subplot(212)
+    plt.plot(Xaxis,-Depth,linewidth=2);plt.grid()
+    vegleg=Habitats(plt,Xaxis,Depth,VegXloc,Xr)
+    plt.ylabel('Depth[m]',size='large')
+    plt.xlabel('Cross-Shore Distance from Shoreline',size='large')
+    ax.legend((vegleg),prop=fontP,loc='upper left',ncol=2)
+    plt.xlim(*Xlim)
+    plt.axvline(x=0,ymin=0.75,linewidth=1,color='k')
+    plt.savefig(FileName,dpi=Dpi)
+
+def BeachErosion(FileName,Xp,Yp,Yp0,Ypv,Lberm,W1,B1,D1,D2,Retreat1,Retreat2,W00,W0v,Scenario):
+    """ beach profiles before the storm, after it and after it with the
+    management action
+
+    Xp, Yp: initial profile, with the berm starting at Lberm
+    Yp0, Ypv: eroded profiles without and with the management action (Ypv is
+        None without a management action)
+    W1, B1: berm width and elevation; D1, D2: dune height without and with
+        the management action
+    W00, W0v: lengths eroded inland of the berm, without and with the
+        management action (None if the berm is not entirely eroded)
+    """
+    plt=Pyplot();fontP=SmallFont()
+    plt.figure(3)
+    ax=plt.subplot(211)
+
+    def Inland(W,Color):
+        plt.fill_between(Xp[int(Lberm+W1):int(Lberm+W1+W)],0,10,facecolor=Color,alpha=0.5)
+
+    if Scenario=="B" or Scenario=="D" or Scenario=="E" and Retreat1<>Retreat2:
+        Legend=('Initital','Before Mgmt','After Mgmt')
+        if Retreat2<=W1: # the berm is wider than the erosion distance both pre- and post-management action (MA)
+            axes_beg=max(Lberm-Retreat2,Lberm/2) # the start of the plot will begin offshore of the berm location by the same distance as post MA erosion
+            axes_end=Lberm+W1+10 # the plot will only show the true berm length plus 10 meters
+        else:
+            axes_beg=Lberm/2. # the start of the plot will be half way between the berm location and the shoreline
+            axes_end=Lberm+Retreat2+10 # the profile plot will extend 10 meters past the limit of dune retreat or of erosion
+        plt.plot(Xp,Yp,Xp,Yp0,'-.g',Xp,Ypv,'--r',linewidth=2);plt.grid()
+        plt.xlim(Xp[int(axes_beg)],Xp[int(axes_end)]);plt.ylim(0,B1+D1+.2)
+        Title='Erosion Profiles'
+        if Retreat2>W1: # erosion removed the entire berm, after the management action at least
+            Title=None
+            if Retreat1>W1 and D1<>0 and D2<>0: # the dune will retreat both pre and post
+                Title='Erosion Profiles'
+            elif Retreat1>W1 and D1==0: # no dune: inland areas are severely threatened
+                Inland(W00,'g');Inland(W0v,'r')
+            else:
+                Inland(W0v,'r')
+        plt.axvline(x=Lberm+W1,linewidth=2,color='k')
+        plt.annotate('Berm Limit',xy=(Lberm+W1,B1+.1))
+    else: # for all other scenarios or for scenarios 'B' and 'D' when then dune reduction has no impact on erosion, only one erosion plot is required
+        Legend=('Initital','After Storm')
+        axes_beg=Lberm/2. # start of the plot will be half way between the berm location and the shoreline
+        axes_end=Lberm+max(Retreat1,W1)+10 # profile plot will extend 10 meters past the limit of berm erosion or dune retreat
+        plt.plot(Xp,Yp,Xp,Yp0,'-.g',linewidth=2);plt.grid()
+        plt.xlim(Xp[int(axes_beg)],Xp[int(axes_end)]);plt.ylim(0,B1+D1+.2)
+        if D1==0 and Retreat1>W1: # erosion has removed the berm and the lack of dune means that inland areas are severely threatened
+            Inland(W00,'g')
+        Title='Erosion Profile'
+    ax.legend(Legend,prop=fontP,loc='upper left',ncol=2)
+    plt.ylabel('Backsh. Elev.[m]',size='large')
+    plt.xlabel('Cross-Shore Distance [m] from Shoreline',size='large')
+    if Title:
+        plt.title(Title,size='large',weight='bold')
+    plt.savefig(FileName,dpi=Dpi)
+
+def MudErosion(FileName,Xaxis,Retreat1,Retreat2,Trms1,Trms2,Te,Depth,VegXloc,Xr,Scenario):
+    """ erosion rate, bed shear stress and bed profile of a muddy backshore;
+    Retreat2 and Trms2 (after the management action) are only used in
+    scenario E """
+    plt=Pyplot();fontP=SmallFont()
+    plt.figure(2)
+    Xplot=Xaxis
+    Shorel=Lookup.Find(abs(Depth)==min(abs(Depth)))[0]
+    if Scenario=="E":
+        plt.subplot(311)
+        plt.plot(Xplot,Retreat1,'--g',Xplot,Retreat2,'r',linewidth=2);plt.grid()
+        plt.axvline(x=0,linewidth=1,color='k')
+        plt.xlim(0,Xplot[0])
+        plt.ylim(-0.,max(max(Retreat1[0:Shorel+10]),max(Retreat2[0:Shorel+10]))*1.1)
+        plt.ylabel('Erosion[cm/hr]',size='large')
+        ax=plt.subplot(312)
+        plt.plot(Xplot,Trms1,'--g',Xplot,Trms2,'r',Xplot,Te,'.k',linewidth=2);plt.grid()
+        ax.legend(('Before Mgmt','After Mgmt','Mvt Thresh.'),prop=fontP,loc='upper left',ncol=2)
+        plt.xlim(0,Xplot[0])
+        plt.ylim(-0.,max([max(Trms1[0:Shorel+10]),max(Trms2[0:Shorel+10]),max(Te[0:Shorel+10])])*1.1)
+    else:
+        plt.subplot(311)
+        plt.plot(Xplot,Retreat1,'--g',linewidth=2);plt.grid()
+        plt.axvline(x=0,linewidth=1,color='k')
+        plt.xlim(10,Xplot[0]-10)
+        plt.ylabel('Erosion[cm/hr]',size='large')
+        ax=plt.subplot(312)
+        plt.plot(Xplot,Trms1,'--g',Xplot,Te,'.k',linewidth=2);plt.grid()
+        ax.legend(('Bed Shear Stress','Mvt Thresh.'),prop=fontP,loc='upper left',ncol=2)
+        plt.xlim(10,Xplot[0]-10)
+        plt.ylim(-0.,max(max(Trms1[0:Shorel+10]),max(Te[0:Shorel+10]))*1.1)
+    plt.axvline(x=0,linewidth=1,color='k')
+    plt.ylabel('Stress[Nm-2]',size='large')
+
+    ax=plt.subplot(313)
+    plt.plot(Xplot,-Depth,'b',linewidth=2);plt.grid()
+    vegleg=Habitats(plt,Xaxis,Depth,VegXloc,Xr)
+    ax.legend((vegleg),prop=fontP,loc='upper left',ncol=2)
+    plt.ylabel('Depth[m]',size='large')
+    plt.xlabel('Cross-Shore Distance [m]',size='large')
+    plt.xlim(10,Xaxis[0]-10)
+    plt.axvline(x=0,linewidth=1,color='k')
+    plt.ylim(-.25,-Depth[0]+1)
+    plt.savefig(FileName,dpi=Dpi)
+
+################################################
+############## PROFILE GENERATOR ###############
+################################################
+
+def Levels(plt,fontP,xd,yd,MSL,HT):
+    # profile with mean sea level, mean low water and mean high water
+    plt.plot(xd,yd,xd,yd*0,'k',xd,yd*0-MSL,'--k',xd,yd*0+HT-MSL,'-.k',linewidth=2);plt.grid()
+    plt.gca().legend(('Created Profile','Mean Sea Level','Mean Low Water','Mean High Water'),prop=fontP,loc='upper left',ncol=2)
+
+def CreatedProfile(FileName,xd,yd,MSL,HT):
+    """ created profile, with the tide levels """
+    plt=Pyplot();fontP=SmallFont()
+    plt.figure(1)
+    plt.subplot(111)
+    Levels(plt,fontP,xd,yd,MSL,HT)
+    plt.ylabel('Depth [m]',size='large',weight='bold')
+    plt.xlabel('Cross-Shore Distance [m]',size='large',weight='bold')
+    plt.axvline(x=0,linewidth=1,color='k')
+    plt.xlim(xd[-1],xd[0])
+    plt.title('Created Profile',size='large',weight='bold')
+    plt.savefig(FileName,dpi=Dpi)
+
+def ZoomIns(FileName,Question,xd,yd,Dx,Dmeas,DistZero,MSL,HT,SmoothParameter,Xzoom):
+    """ nearshore bathymetry and, if Xzoom is not None, the created profile
+    up to the point Xzoom
+
+    Question: answer to the profile question of the tool ("(1) Yes" if the
+        profile was cut with GIS, "(2) ..." if it was uploaded, "(3) ..." if
+        it is a theoretical profile)
+    """
+    plt=Pyplot();fontP=SmallFont()
+    plt.figure(2)
+    Case=Question[:3]
+    if Case in ["(1)","(2)","(3)"]:
+        # zoom on nearshore area
+        plt.subplot(211)
+        if Case=="(1)": # profile was cut with GIS
+            plt.plot(Dx-DistZero,Dmeas-MSL,'b',xd,yd,'r',linewidth=2);plt.grid()
+        elif Case=="(2)":
+            plt.plot(Dx,Dmeas-MSL,'b',xd,yd,'r',linewidth=2);plt.grid()
+        else:
+            plt.plot(xd,yd,'r',linewidth=2);plt.grid()
+        if Case=="(3)":
+            plt.gca().legend(('Created Profile'),prop=fontP,loc='upper left',ncol=2)
+        else:
+            plt.gca().legend(('Initial Profile','Created Profile'),prop=fontP,loc='upper left',ncol=2)
+        plt.title('Bathymetry-Smoothing Factor='+str(SmoothParameter),size='large',weight='bold')
+        if Case=="(2)":
+            plt.xlim(max(Dx[-1],xd[-1]),0);plt.ylim(Dmeas[0]*1.1,MSL)
+        else:
+            plt.xlim(Dx[-1],-MSL)
+        plt.ylabel('Depth [m]',size='large',weight='bold')
+
+    if Xzoom is not None: # foreshore and backshore
+        plt.subplot(212)
+        Levels(plt,fontP,xd[0:Xzoom],yd[0:Xzoom],MSL,HT)
+        plt.xlabel('Cross-Shore Distance [m]',weight='bold')
+        plt.ylabel('Elevation [m]',size='large',weight='bold')
+        plt.xlim(xd[Xzoom],xd[0])
+        if yd[0]<yd[Xzoom]:
+            plt.ylim(yd[0]*1.1,yd[Xzoom]*1.1)
+        else:
+            plt.ylim(yd[Xzoom]*1.1,yd[0]*1.1)
+        plt.axvline(x=0,linewidth=1,color='k')
+        plt.title('Foreshore and Backshore Areas',size='large',weight='bold')
+    plt.savefig(FileName,dpi=Dpi)
+
+def GISProfile(FileName,Xorig,Dorig,Tempy1):
+    """ profile cut from the DEM and the bathymetry extracted from it """
+    plt=Pyplot();fontP=SmallFont()
+    fig=plt.figure(3)
+    ax=plt.subplot(211);plt.plot(Xorig,Dorig,Xorig,Tempy1,'r',Xorig,Dorig*0,'k',linewidth=2);plt.grid()
+    ax.legend(('Raw Profile','Extracted Bathy'),prop=fontP,loc='upper left',ncol=2)
+    plt.title('DEM Profile',size='large',weight='bold')
+    plt.ylabel('Elevation [m]',size='large',weight='bold')
+    plt.xlabel('Cross-Shore Distance [m]',size='large',weight='bold')
+    plt.xlim(Xorig[-1],Xorig[0])
+    plt.axvline(x=0,linewidth=1,color='k')
+    extent=ax.get_window_extent().transformed(fig.dpi_scale_trans.inverted()) # save subplot
+    plt.savefig(FileName,bbox_inches=extent.expanded(1.8,1.4),dpi=Dpi)
+
+def HabitatProfile(FileName,TempX,TempY,xd,yd,Panels):
+    """ habitats along the profile cut from the DEM, one panel per habitat
+
+    Panels: list of (name, habitat codes along TempX, shift of the habitat
+        points, whether the created profile is drawn too)
+    """
+    plt=Pyplot();fontP=SmallFont()
+    plt.figure(4)
+    leg=1 # only one legend
+    for HabCount in range(len(Panels)):
+        Name,Codes,Shift,Created=Panels[HabCount]
+        ax=plt.subplot(len(Panels),1,HabCount+1)
+        temp1=TempY+num.nan
+        la=num.nonzero(Codes);temp1[la]=TempY[la]
+        if Created:
+            plt.plot(TempX,TempY,xd,yd,'r')
+        else:
+            plt.plot(TempX,TempY)
+        plt.plot(TempX-Shift,temp1,'or',markersize=15);plt.grid()
+        plt.xlim(TempX[-1],TempX[0])
+        if leg:
+            if Created:
+                ax.legend(('Raw Profile (GIS)','Created Profile','Habitat'),prop=fontP,loc='upper left',ncol=2)
+            else:
+                ax.legend(('Raw Profile (GIS)','Habitat'),prop=fontP,loc='upper left',ncol=2)
+            leg=0
+        plt.ylabel(Name,size='large',weight='bold')
+        plt.axvline(x=0,linewidth=1,color='k')
+    plt.xlabel('Cross-Shore Distance [m]',weight='bold')
+    plt.savefig(FileName,dpi=Dpi)
+
+def Rose(FileName,Values,Title):
+    """ rose of 16 values, one per direction from 0 to 337.5 degrees """
+    plt=Pyplot()
+    theta16=[ii*22.5*num.pi/180.0 for ii in range(16)]
+    plt.rc('grid',color='#316931',linewidth=1,linestyle='-')
+    plt.rc('xtick',labelsize=0)
+    plt.rc('ytick',labelsize=15)
+    fig1=plt.figure() # square figure and square axes look better for polar plots
+    ax=fig1.add_axes([0.1,0.1,0.8,0.8],polar=True,axisbg='w')
+    bars=ax.bar(theta16,Values,width=.35,color='#ee8d18',lw=1)
+    for r,bar in zip(Values,bars):
+        bar.set_facecolor(plt.cm.YlOrRd(r/10.))
+        bar.set_alpha(.65)
+    ax.set_rmax(max(Values)+1)
+    plt.grid(True)
+    ax.set_title(Title,fontsize=15,weight='bold')
+    plt.savefig(FileName,dpi=Dpi)
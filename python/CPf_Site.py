@@ -0,0 +1,181 @@
+# Marine InVEST: Coastal Protection (Site Inputs)
+# Coded for ArcGIS 9.3, 10, 10.1
+
+import numpy as num
+import CPf_Workbook as Workbook
+import CPf_Profile as Profile
+import CPf_Lookup as Lookup
+
+# Site() reads a model input file and a cross-shore profile the way
+# CP1_WavesErosion does, without the geoprocessor, and returns the site
+# dictionary of CPf_Erosion.ProfileRetreat for the initial conditions and
+# for the management action.
+
+def AdjustProfile(X,h,MSL,S,Sand):
+    """ profile of the erosion models: starts offshore, keeps the points under
+    water (relative to MSL, and to the surge for mud) and gives positive
+    depths.  Returns X, h and the foreshore slope for mud (None for beaches). """
+    X=num.asarray(X,dtype=float);h=num.asarray(h,dtype=float)
+    flip=(h[0:100]>0).any() or h[0]>h[-1] # profile starts onshore
+    if not flip:
+        h=h[::-1]
+    h=h-MSL
+    m=None
+    if Sand:
+        keep=num.nonzero(h<-0.1)[0]
+        h=h[keep];X=X[keep]
+    else:
+        h=h-S
+        out=num.nonzero(h>-0.1)[0]
+        h=h[out[-1]+1:-1];X=X[out[-1]+1:-1]
+        dx=abs(X[1]-X[0]);m=abs(h[-1]-h[-int(10.0/dx)])/10 # average slope 10m from end of transect
+    h=-h
+    if flip:
+        h=h[::-1]
+    return X,h,m
+
+# warnings of Footprint(), worded as they always were in CP1_WavesErosion
+FootprintMessages={
+    'mangrove':{'Landward':"...Mangrove landward edge should be above mean sea level.  We'll move it for you.",
+        'Switched':"...You switched mangrove edge distances.  We'll change them for you.",
+        'SwitchedMA':"...You switched mangrove edge distances for the management action.  We'll change them for you.",
+        'Cut':"...The mangrove footprint you applied extends beyond the limits of your topo/bathy profile. The inland limit of the mangrove has been set to the inland limit of the topo/bathy profile. Check your inputs.",
+        'CutMA':"...The mangrove footprint you applied for the managment action extends beyond the limits of your topo/bathy profile. The inland limit of the mangrove post management action has been set to the inland limit of the topo/bathy profile. Check your inputs."},
+    'marsh':{'Landward':"...Marshes landward edge should be above mean sea level.  We'll move it for you.",
+        'Switched':"...You switched marsh offshore and shoreward edge.  We'll change them for you.",
+        'SwitchedMA':"...You switched marsh offshore and shoreward edge for the management action.  We'll change them for you.",
+        'Cut':"...The marsh footprint you applied extends beyond the limits of your topo/bathy profile. The inland limit of the marsh has been set to the inland limit of the topo/bathy profile. Check your inputs.",
+        'CutMA':"...The marsh footprint you applied post management extends beyond the limits of your topo/bathy profile. The inland limit of the marsh post management has been set to the inland limit of the topo/bathy profile. Check your inputs."},
+    'seagrass':{'Switched':"...You switched seagrass offshore and shoreward edge.  We'll change them for you.",
+        'SwitchedMA':"...You switched seagrass offshore and shoreward edge for the management action.  We'll change them for you.",
+        'Cut':"...The seagrass footprint you applied extends beyond the limits of your topo/bathy profile. The offshore limit of the seagrass has been set to the offshore limit of the topo/bathy profile. Check your inputs.",
+        'CutMA':"...The seagrass footprint you applied post management action extends beyond the limits of your topo/bathy profile. The offshore limit of the seagrass post management action has been set to the offshore limit of the topo/bathy profile. Check your inputs."}}
+
+def Footprint(Name,Edge,Limit,Log):
+    """ footprint of a habitat before and after the management action,
+    corrected as in CP1_WavesErosion, which uses this function too
+
+    Name: 'mangrove', 'marsh' or 'seagrass'
+    Edge: [inner, outer, inner MA, outer MA] edges, the outer one being
+        farthest from the profile limit Limit (mangroves and marshes end
+        landward, at the smallest X; seagrass offshore, at the largest X, and
+        is passed here with every X negated)
+    Log: list the warnings are appended to, as (kind, message)
+    """
+    Msg=FootprintMessages[Name]
+    Xs,Xo,XsMA,XoMA=Edge
+    if 'Landward' in Msg and Xo>0:
+        Log.append(("AddWarning",Msg['Landward']))
+        Xo=-Xo
+    if Xs<Xo:
+        Log.append(("AddWarning",Msg['Switched']))
+        Xs,Xo=Xo,Xs
+    if XsMA<XoMA:
+        Log.append(("AddWarning",Msg['SwitchedMA']))
+        XsMA,XoMA=XoMA,XsMA
+    if Xo<Limit and Xs<Limit:
+        Log.append(("AddWarning","...The "+Name+" footprint you applied lies completely outside the extent of your topo/bathy profile. The "+Name+" has been excluded in the analysis. Check your inputs."))
+        Xs=Xo=XsMA=XoMA=0
+    elif Xo<Limit:
+        Log.append(("AddWarning",Msg['Cut']))
+        Xo=Limit
+    if XoMA<Limit:
+        Log.append(("AddWarning",Msg['CutMA']))
+        XoMA=Limit
+    if XsMA+XoMA<>0:
+        Impacted="...Your impacted "+Name+" footprint has to be within your initial conditon footprint.  We'll change it for you."
+        if XsMA>Xs:
+            Log.append(("AddWarning",Impacted))
+            XsMA=Xs
+        if XoMA<Xo:
+            Log.append(("AddWarning",Impacted))
+            XoMA=Xo
+    return [Xs,Xo,XsMA,XoMA]
+
+def Place(X,Veg,Layers,Code,Edge,Values,Sorted=0):
+    """ sets the habitat code and the (density, diameter, height) of some
+    layers between the two edges of a footprint; nothing if both are 0
+
+    Sorted: 1 if X is in ascending order (see CPf_Lookup.Indexed)
+    """
+    if Edge[0]+Edge[1]==0:
+        return
+    ii=[int(X[-1]-X[0]-Lookup.Indexed(X,val,Sorted)) for val in Edge] # the grid is reversed, as in CP1_WavesErosion
+    Beg,End=min(ii),max(ii)
+    Veg[Beg:End+1]=Code
+    for Layer,Value in zip(Layers,Values):
+        for Array,val in zip(Layer,Value):
+            Array[Beg:End+1]=val
+
+def Site(InputTable,CSProfile,S,StormDur):
+    """ inputs of CPf_Erosion.ProfileRetreat for a site
+
+    InputTable: model input file (see CPf_Workbook.Open)
+    CSProfile: cross-shore profile (see CPf_Profile.Read)
+    S, StormDur: surge [m] and storm duration [hours]
+
+    Returns the site with the initial conditions, the site with the
+    management action (vegetation and dune height) and the messages of the
+    parsing, a list of (kind, message).  Coral and oyster reefs are not part
+    of ProfileRetreat; they are reported in the messages and left out.
+    """
+    P=Workbook.Parameters(Workbook.Open(InputTable))
+    Log=[]
+    if P['Backshore'] not in [1,2]:
+        raise ValueError, "You didn't specify a backshore type.  We won't be able to estimate amount of erosion."
+    Sand=int(P['Backshore']==1)
+    X,h=Profile.Read(CSProfile)
+    Xmin=float(num.min(X));Xmax=float(num.max(X))
+    Site={'Sand':Sand,'StormDur':StormDur}
+    Site['X'],Site['h'],m=AdjustProfile(X,h,P['MSL'],S,Sand)
+    if Sand:
+        Log.append(("AddMessage","...your backshore is a *sandy beach*"))
+        Slope=P['ForeshoreSlope']
+        if Slope<>0:
+            Site['m']=1.0/Slope
+        else:
+            Site['m']=0
+        Site['B']=P['BermElevation'];Site['W']=P['BermWidth'];Site['D']=P['DuneHeight']
+    else:
+        Log.append(("AddMessage","...your backshore is a *marsh/mangrove*"))
+        Site['m']=m;Site['Cm']=P['DryDensity'];Site['me']=P['ErosionConstant']
+    Site['A']=P['ScaleFactor'] # sediment scale factor
+
+    # vegetation, as rows of roots, trunks, canopy, marsh and seagrass of: height,
+    # diameter, density, 4 edges and the density reduction [%] of the management action
+    Rows=[[val or 0 for val in row] for row in P['Vegetation']]
+    Edges={}
+    for Name,Row in [('mangrove',0),('marsh',3)]:
+        Edges[Name]=Footprint(Name,Rows[Row][3:7],Xmin,Log)
+    Edges['seagrass']=[-val for val in Footprint('seagrass',[-val for val in Rows[4][3:7]],-Xmax,Log)]
+    if sum(Edges['marsh'])<>0 and sum(Edges['mangrove'])<>0:
+        raise ValueError, "You cannot have a marsh and a mangrove on the same profile."
+
+    Sites=[]
+    Ascending=Lookup.IsSorted(Site['X']) # checked once for every footprint
+    for MA in [0,1]:
+        n=len(Site['X']);Veg=num.zeros(n)
+        Roots,Trunk,Canop=[[num.zeros(n) for ii in range(3)] for layer in range(3)]
+        for Name,Code,Layers,LayerRows in [('seagrass',3,[Trunk],[4]),('marsh',2,[Trunk],[3]),('mangrove',1,[Roots,Trunk,Canop],[0,1,2])]:
+            Edge=Edges[Name][2*MA:2*MA+2]
+            Values=[]
+            for Row in LayerRows:
+                Density=Rows[Row][2]
+                if MA:
+                    Reduction=Rows[Row][7]
+                    if Edge[0]==0 and Edge[1]==0: # no habitat left
+                        Reduction=100.0
+                    Density=Density*(1-Reduction/100.0)
+                Values.append([Density,Rows[Row][1],Rows[Row][0]])
+            Place(Site['X'],Veg,Layers,Code,Edge,Values,Ascending)
+        Case=dict(Site)
+        Case['Roots']=Roots;Case['Trunk']=Trunk;Case['Canop']=Canop;Case['VegXloc']=Veg
+        if MA and Sand:
+            Case['D']=(100-(P['DuneReduction'] or 0))*Site['D']/100.0 # dune height after the management action
+        Sites.append(Case)
+
+    if P['CoralType'] in ["Barrier","Fringe","Fringe Lagoon"]:
+        Log.append(("AddWarning","...The coral reef is not modelled in batch runs and has been left out."))
+    if P['OysterReefType'] in ["Trapezoidal","Dome"]:
+        Log.append(("AddWarning","...The oyster reef is not modelled in batch runs and has been left out."))
+    return Sites[0],Sites[1],Log
@@ -0,0 +1,130 @@
+# Marine InVEST: Coastal Protection (Valuation)
+# Coded for ArcGIS 9.3, 10, 10.1
+
+import csv
+import numpy as num
+import CPf_Erosion as Erosion
+
+def PresentValueFactor(disc,TimeHoriz):
+    """ sum of the discount factors 1/(1+disc)**t over years t=1..TimeHoriz,
+    in closed form: (1-(1+disc)**-T)/disc, or T without discounting """
+    T=int(TimeHoriz)
+    if disc==0:
+        return float(T)
+    return (1.0-(1.0+disc)**(-T))/disc
+
+def EventWeights(AEP):
+    """ weight of each event in the expected annual damage
+
+    The damage is integrated over the annual exceedance probability with the
+    trapezoidal rule between events; storms rarer than the rarest event are
+    counted at its damage and storms more frequent than the most frequent
+    one do no damage.  The expected annual damage is sum(weights*damage); a
+    single event gets its own probability as weight, as in p*Dav.
+    """
+    AEP=num.asarray(AEP,dtype=float)
+    Order=num.argsort(-AEP,kind='mergesort') # most frequent first
+    p=AEP[Order];dp=p[:-1]-p[1:]
+    w=num.zeros(len(p))
+    w[:-1]=w[:-1]+0.5*dp;w[1:]=w[1:]+0.5*dp
+    w[-1]=w[-1]+p[-1] # tail beyond the rarest event
+    Weights=num.zeros(len(p));Weights[Order]=w
+    return Weights
+
+def ReadEvents(FileName):
+    """ storm events from a comma separated table with a header row: Ho, To,
+    S (surge) and either AEP (annual exceedance probability) or Tr (return
+    period, AEP=1/Tr); optional columns StormDur and Name """
+    Table=csv.reader(open(FileName,"rb"))
+    Header=None;Rows=[]
+    for row in Table:
+        if not [val for val in row if val.strip()]: # blank line
+            continue
+        row=[val.strip() for val in row]
+        if Header is None:
+            Header=row
+        elif len(row)<>len(Header):
+            raise ValueError, "Line %d of the storm table %s has %d values; the header has %d" % (Table.line_num,FileName,len(row),len(Header))
+        else:
+            Rows.append((Table.line_num,row))
+    if Header is None:
+        raise ValueError, "The storm table is empty: "+FileName
+    Events={}
+    for ii,name in enumerate(Header):
+        if name=='Name':
+            Events[name]=[row[ii] for line,row in Rows]
+            continue
+        Column=[]
+        for line,row in Rows:
+            try:
+                Column.append(float(row[ii]))
+            except ValueError:
+                raise ValueError, "Line %d of the storm table %s: %s is not a number (%r)" % (line,FileName,name,row[ii])
+        Events[name]=num.array(Column)
+    if 'AEP' not in Events:
+        if 'Tr' not in Events:
+            raise ValueError, "The storm table needs an AEP or a Tr column"
+        Events['AEP']=1.0/Events['Tr']
+    for name in ['Ho','To','S']:
+        if name not in Events:
+            raise ValueError, "The storm table has no "+name+" column"
+    return Events
+
+def StormClimate(Site,Events,disc,TimeHoriz):
+    """ expected value of the habitat over a storm climate
+
+    Site: site inputs of CPf_Erosion.ProfileRetreat plus A, Longshore and
+        PropValue; StormDur may come from Events instead
+    Events: Ho, To, S and AEP of each storm (see ReadEvents)
+    disc, TimeHoriz: discount rate and time horizon [years]
+
+    Every event is run through the wave and erosion chain in one batch.  The
+    damage with and without the habitat is integrated over the annual
+    exceedance probability (EventWeights) and discounted over the time
+    horizon.  Returns a dictionary with the expected annual damage without
+    and with the habitat (EAD, EADHabitat), the expected annual avoided
+    damage (EAAD) and its present value (EPV), and per-event arrays: AEP,
+    Weight, RetreatBare, RetreatHabitat, Damage, DamageHabitat, Avoided and
+    EADShare (the event's part of EAAD).
+    """
+    if 'StormDur' in Events:
+        Site=dict(Site);Site['StormDur']=Events['StormDur']
+    Bare,Hab=Erosion.ProfileRetreat(Site,Events['Ho'],Events['To'],Events['S'],Site['A'])
+    return ClimateDamage(Events['AEP'],Bare,Hab,Site['Longshore']*Site['PropValue'],disc,TimeHoriz)
+
+def ClimateDamage(AEP,Bare,Hab,Value,disc,TimeHoriz):
+    """ valuation part of StormClimate(), for retreats computed elsewhere
+
+    AEP, Bare, Hab: annual exceedance probability and retreat without and
+        with the habitat of each event
+    Value: value of a meter of retreat (Longshore*PropValue)
+
+    Returns the same dictionary as StormClimate().
+    """
+    Out={'AEP':num.asarray(AEP,dtype=float)}
+    Out['Weight']=EventWeights(Out['AEP'])
+    Out['RetreatBare']=Bare;Out['RetreatHabitat']=Hab
+    Out['Damage']=num.maximum(Bare,0)*Value;Out['DamageHabitat']=num.maximum(Hab,0)*Value
+    Out['Avoided']=Out['Damage']-Out['DamageHabitat']
+    Out['EADShare']=Out['Weight']*Out['Avoided']
+    Out['EAD']=float(num.sum(Out['Weight']*Out['Damage']))
+    Out['EADHabitat']=float(num.sum(Out['Weight']*Out['DamageHabitat']))
+    Out['EAAD']=float(num.sum(Out['EADShare']))
+    Out['EPV']=Out['EAAD']*PresentValueFactor(disc,TimeHoriz)
+    return Out
+
+def WriteEventTable(Out,FileName,Names=None):
+    """ writes the per-event breakdown of StormClimate() and its totals """
+    Columns=['AEP','Weight','RetreatBare','RetreatHabitat','Damage','DamageHabitat','Avoided','EADShare']
+    TableFile=open(FileName,"wb")
+    Table=csv.writer(TableFile,lineterminator="\n")
+    Table.writerow(["Event"]+Columns)
+    for ii in range(len(Out['AEP'])):
+        if Names is None:
+            Name=str(ii+1)
+        else:
+            Name=Names[ii]
+        Table.writerow([Name]+["%g" % Out[col][ii] for col in Columns])
+    for name in ['EAD','EADHabitat','EAAD','EPV']:
+        Table.writerow([name,"%g" % Out[name]])
+    TableFile.close()
@@ -0,0 +1,255 @@
+# Marine InVEST: Coastal Protection (Wave Energy Flux Marching Kernel)
+# Coded for ArcGIS 9.3, 10, 10.1
+
+import types
+import numpy as num
+from math import sqrt, exp, pi
+try:
+    from math import erf
+except ImportError: # Python 2.6
+    from scipy.special import erf
+
+g=9.81;rho=1024.0;NaN=float('nan')
+
+# the numba backend is optional; the pure Python backend is always available.
+# numba is slow to import, so it is only looked for here; if it is found but
+# can't be imported, Compiled() falls back to the Python backend
+import imp
+try:
+    imp.find_module("numba")
+    HaveNumba=1
+except ImportError:
+    HaveNumba=0
+
+Backends=['python']
+if HaveNumba:
+    Backends.append('numba')
+Backend=Backends[-1] # backend used when March() isn't told otherwise
+
+def BreakingShape(Hr):
+    # Battjes-Janssen shape function of Hr=Hb/H; breaking dissipation is BrkCoef*H**3*BreakingShape(Hb/H)
+    # in MarchLoop; BreakingShapes is the array form used by BreakingDissipation
+    e=exp(-Hr*Hr)
+    if e>0.0:
+        temp1=(Hr*Hr*Hr+1.5*Hr)*e
+    else:
+        temp1=0.0
+    return temp1+0.75*sqrt(pi)*(1.0-erf(Hr))
+
+ErfArray=None # array erf, looked up by BreakingShapes() on first use
+
+def BreakingShapes(Hr):
+    """ BreakingShape for arrays of Hr """
+    global ErfArray
+    if ErfArray is None:
+        try:
+            from scipy.special import erf as ErfArray # SciPy is slow to import, so only when needed
+        except ImportError:
+            ErfArray=num.vectorize(erf,otypes=[float])
+    Hr=num.asarray(Hr,dtype=float)
+    old=num.seterr(over='ignore',invalid='ignore') # e is 0 where Hr**3 overflows
+    e=num.exp(-Hr*Hr)
+    temp1=num.where(e>0.0,(Hr*Hr*Hr+1.5*Hr)*e,0.0)
+    num.seterr(**old)
+    return temp1+0.75*sqrt(pi)*(1.0-ErfArray(Hr))
+
+def MarchLoop(dx,Cg,C,Hb,BrkCoef,FricCoef,VegCoef,RollCoef,NoBreak,H,Ef,Er,Br,Db,Df,Dveg):
+    # energy flux recursion Ef[xx+1]=Ef[xx]-dx*(Db+Df+Dveg); every dissipation term depends on the new wave height
+    # inputs are indexable by position (lists for the Python backend, arrays for numba); H[0] must be set and
+    # the other outputs must be zero at the first grid point.  Outputs are filled in place.
+    E=0.125*rho*g
+    for xx in range(len(H)-1):
+        Ef[xx]=E*H[xx]*H[xx]*Cg[xx] # Ef at (xx)
+        Ef[xx+1]=Ef[xx]-dx*(Db[xx]+Df[xx]+Dveg[xx]) # Ef at [xx+1]
+
+        q=Ef[xx+1]/(E*Cg[xx+1])
+        if q>=0.0: # no wave left once the energy flux goes negative
+            H[xx+1]=sqrt(q) # wave height at [xx+1]
+        else:
+            H[xx+1]=NaN
+        Br[xx+1]=Br[xx]-dx*(Er[xx]*RollCoef[xx]-0.5*Db[xx]) # roller flux
+        Er[xx+1]=Br[xx+1]/C[xx+1] # roller energy
+
+        H3=H[xx+1]*H[xx+1]*H[xx+1]
+        if NoBreak:
+            Er[xx+1]=0.0;Db[xx+1]=0.0
+        elif H[xx+1]>0.0: # dissipation due to brkg
+            Db[xx+1]=BrkCoef[xx+1]*H3*BreakingShape(Hb[xx+1]/H[xx+1])
+        elif H[xx+1]==0.0:
+            Db[xx+1]=0.0
+        else:
+            Db[xx+1]=NaN
+        Df[xx+1]=FricCoef[xx+1]*H3 # dissipation due to bottom friction
+        Dveg[xx+1]=VegCoef[xx+1]*H3 # dissipation due to vegetation
+
+MarchLoopJIT=None
+def Compiled():
+    """ MarchLoop compiled by numba, imported on the first call
+
+    Returns None if numba fails to import (a broken install); the numba
+    backend is then dropped and Backend switched to 'python'.
+    """
+    global MarchLoopJIT, Backend
+    if MarchLoopJIT is None:
+        try:
+            import numba
+        except Exception:
+            if 'numba' in Backends:
+                Backends.remove('numba')
+            Backend='python'
+            return None
+        Globals=dict(MarchLoop.__globals__)
+        Globals['BreakingShape']=numba.njit(BreakingShape) # numba only calls compiled functions
+        MarchLoopJIT=numba.njit(types.FunctionType(MarchLoop.__code__,Globals,'MarchLoop'))
+    return MarchLoopJIT
+
+def March(dx,Ho,Cg,C,Hb,BrkCoef,FricCoef,VegCoef,RollCoef,NoBreak=0,backend=None):
+    """ marches the RMS wave height Ho across the profile
+
+    Cg, C: group and phase velocity
+    Hb: breaking wave height
+    BrkCoef, FricCoef, VegCoef: dissipation by breaking, bottom friction and
+        vegetation is coef*H**3 (times the Battjes-Janssen shape function for
+        breaking); pass zeros for VegCoef on a bare bed
+    RollCoef: roller dissipation g*sin(Beta)/C
+    NoBreak: if 1, breaking and the roller are switched off (flat bottom)
+    backend: 'numba' or 'python'; defaults to the module's Backend
+
+    Returns the wave height, energy flux, roller energy, roller flux and the
+    breaking, friction and vegetation dissipation as float64 arrays.
+    """
+    if backend is None:
+        backend=Backend
+    if backend not in Backends:
+        raise ValueError, "Unknown or unavailable marching backend: "+str(backend)
+
+    lx=len(Cg)
+    if backend=='numba':
+        Loop=Compiled()
+        if Loop is None: # numba can't be imported
+            backend='python'
+    if backend=='numba':
+        Out=[num.zeros(lx) for ii in range(7)]
+        Out[0][0]=Ho
+        Inputs=[num.ascontiguousarray(val,dtype=float) for val in [Cg,C,Hb,BrkCoef,FricCoef,VegCoef,RollCoef]]
+        Loop(float(dx),Inputs[0],Inputs[1],Inputs[2],Inputs[3],Inputs[4],Inputs[5],Inputs[6],int(NoBreak),
+            Out[0],Out[1],Out[2],Out[3],Out[4],Out[5],Out[6])
+    else:
+        Out=[lx*[0.0] for ii in range(7)]
+        Out[0][0]=float(Ho)
+        Inputs=[num.asarray(val,dtype=float).tolist() for val in [Cg,C,Hb,BrkCoef,FricCoef,VegCoef,RollCoef]]
+        MarchLoop(float(dx),Inputs[0],Inputs[1],Inputs[2],Inputs[3],Inputs[4],Inputs[5],Inputs[6],int(NoBreak),
+            Out[0],Out[1],Out[2],Out[3],Out[4],Out[5],Out[6])
+        Out=[num.array(val) for val in Out]
+
+    H,Ef,Er,Br,Db,Df,Dveg=Out
+    return H,Ef,Er,Br,Db,Df,Dveg
+
+def BreakingDissipation(H,Hb,BrkCoef):
+    """ Battjes-Janssen dissipation by breaking for arrays of RMS wave heights
+
+    H, Hb (breaking wave height) and BrkCoef broadcast against each other, so
+    whole profiles or (conditions x points) batches are evaluated at once.
+    Zero wave heights dissipate nothing; NaN heights (no wave left) give NaN.
+    The shape function is BreakingShape, which MarchLoop also uses.
+    """
+    H=num.asarray(H,dtype=float)
+    wet=H>0.0
+    Db=BrkCoef*H**3*BreakingShapes(Hb/num.where(wet,H,1.0))
+    return num.where(wet,Db,num.where(H==0.0,0.0,NaN))
+
+def FrictionDissipation(H,FricCoef):
+    """ dissipation by bottom friction (or by vegetation, with VegCoef) for
+    arrays of RMS wave heights """
+    return FricCoef*num.asarray(H,dtype=float)**3
+
+def MarchRows(dx,Cg,C,Hb,BrkCoef,FricCoef,VegCoef,RollCoef,NoBreak,H,Ef,Er,Br,Db,Df,Dveg):
+    # same recursion as MarchLoop, advanced for every row (offshore condition) at once;
+    # all arrays are (conditions x points)
+    E=0.125*rho*g
+    for xx in range(H.shape[1]-1):
+        Ef[:,xx]=E*H[:,xx]**2*Cg[:,xx] # Ef at (xx)
+        Ef[:,xx+1]=Ef[:,xx]-dx*(Db[:,xx]+Df[:,xx]+Dveg[:,xx]) # Ef at [xx+1]
+
+        q=Ef[:,xx+1]/(E*Cg[:,xx+1])
+        H[:,xx+1]=num.sqrt(num.where(q>=0.0,q,NaN)) # no wave left once the energy flux goes negative
+        Br[:,xx+1]=Br[:,xx]-dx*(Er[:,xx]*RollCoef[:,xx]-0.5*Db[:,xx]) # roller flux
+        Er[:,xx+1]=Br[:,xx+1]/C[:,xx+1] # roller energy
+
+        if NoBreak:
+            Er[:,xx+1]=0.0;Db[:,xx+1]=0.0
+        else:
+            Db[:,xx+1]=BreakingDissipation(H[:,xx+1],Hb[:,xx+1],BrkCoef[:,xx+1]) # dissipation due to brkg
+        Df[:,xx+1]=FrictionDissipation(H[:,xx+1],FricCoef[:,xx+1]) # dissipation due to bottom friction
+        Dveg[:,xx+1]=FrictionDissipation(H[:,xx+1],VegCoef[:,xx+1]) # dissipation due to vegetation
+
+def MarchBatch(dx,Ho,Cg,C,Hb,BrkCoef,FricCoef,VegCoef,RollCoef,NoBreak=0,backend=None):
+    """ March() for several offshore conditions at once
+
+    Ho holds one RMS wave height per condition and the other inputs are
+    (conditions x points) arrays.  The numba backend marches each condition
+    with the compiled loop; the Python backend marches all conditions
+    together, one grid point at a time.  Returns the same outputs as March()
+    as (conditions x points) arrays.
+    """
+    if backend is None:
+        backend=Backend
+    if backend not in Backends:
+        raise ValueError, "Unknown or unavailable marching backend: "+str(backend)
+
+    Ho=num.atleast_1d(num.asarray(Ho,dtype=float))
+    Inputs=[num.ascontiguousarray(val,dtype=float) for val in [Cg,C,Hb,BrkCoef,FricCoef,VegCoef,RollCoef]]
+    shape=num.broadcast(Ho[:,num.newaxis],*Inputs).shape
+    Inputs=[num.ascontiguousarray(val*num.ones(shape)) for val in Inputs]
+    Out=[num.zeros(shape) for ii in range(7)]
+    Out[0][:,0]=Ho
+
+    if backend=='numba':
+        Loop=Compiled()
+        if Loop is None: # numba can't be imported
+            backend='python'
+    if backend=='numba':
+        for ii in range(shape[0]):
+            Row=[val[ii] for val in Inputs+Out]
+            Loop(float(dx),Row[0],Row[1],Row[2],Row[3],Row[4],Row[5],Row[6],int(NoBreak),
+                Row[7],Row[8],Row[9],Row[10],Row[11],Row[12],Row[13])
+    else:
+        MarchRows(float(dx),Inputs[0],Inputs[1],Inputs[2],Inputs[3],Inputs[4],Inputs[5],Inputs[6],int(NoBreak),
+            Out[0],Out[1],Out[2],Out[3],Out[4],Out[5],Out[6])
+
+    H,Ef,Er,Br,Db,Df,Dveg=Out
+    return H,Ef,Er,Br,Db,Df,Dveg
+
+def CheckBackends(lx=5000,To=8.0,Ho=1.0):
+    """ runs every available backend, single and batched, on a synthetic
+    vegetated slope and returns the largest relative difference in wave height
+    against the Python backend, and that of the dissipation operators against
+    the dissipation used in the march """
+    import CPf_WaveKinematics as WaveKinematics
+    h=num.linspace(10.0,0.5,lx);dx=1.0;fp=1.0/To
+    k,n,C,Cg=WaveKinematics.Kinematics(To,h)
+    Gam=0.5+0.4*num.tanh(33.0*Ho*k[0]/(2.0*pi))
+    Hb=0.88/k*num.tanh(Gam*k*h/0.88)
+    BrkCoef=0.25*rho*g*fp/h
+    FricCoef=rho*0.01/(12.0*pi)*(2.0*pi*fp/num.sinh(k*h))**3.0
+    VegCoef=num.zeros(lx);VegCoef[int(0.8*lx):]=0.05*FricCoef[int(0.8*lx):]
+    RollCoef=g*num.sin(0.05)/C
+
+    Ref=March(dx,Ho,Cg,C,Hb,BrkCoef,FricCoef,VegCoef,RollCoef,backend='python')[0]
+    Diff={}
+    for backend in list(Backends):
+        H=March(dx,Ho,Cg,C,Hb,BrkCoef,FricCoef,VegCoef,RollCoef,backend=backend)[0]
+        if backend not in Backends: # numba failed to import; March() used the Python backend
+            continue
+        Diff[backend]=num.nanmax(abs(H-Ref)/Ref)
+        H=MarchBatch(dx,[Ho,Ho],Cg,C,Hb,BrkCoef,FricCoef,VegCoef,RollCoef,backend=backend)[0]
+        Diff[backend+' batch']=num.nanmax(abs(H-Ref)/Ref)
+
+    # the array dissipation operators against the dissipation the march used
+    Out=March(dx,Ho,Cg,C,Hb,BrkCoef,FricCoef,VegCoef,RollCoef,backend='python')
+    Db=BreakingDissipation(Out[0],Hb,BrkCoef);Df=FrictionDissipation(Out[0],FricCoef)
+    Diff['operators']=max(num.nanmax(abs(Db-Out[4])[1:]/Db.max()),num.nanmax(abs(Df-Out[5])[1:]/Df.max()))
+    return Diff
+
+if __name__=="__main__":
+    print CheckBackends()
@@ -0,0 +1,201 @@
+# Marine InVEST: Coastal Protection (Wave Transformation)
+# Coded for ArcGIS 9.3, 10, 10.1
+#
+# Single and batched wave transformation share this module: Transform takes
+# one or several offshore conditions (Ho, To, Etao) and returns (conditions x
+# points) arrays, and WaveModelBatch is the batched form of WaveModel in
+# CP1_WavesErosion.
+
+import numpy as num
+from math import pi, sqrt, sin
+import CPf_SignalSmooth as SignalSmooth
+import CPf_WaveKinematics as WaveKinematics
+import CPf_WaveKernel as WaveKernel
+import CPf_WaveSetup as WaveSetup
+import CPf_FiniteDiff as FiniteDiff
+
+g=9.81;rho=1024.0
+
+SetupGrids=['profile','fine','adaptive']
+SetupGrid='fine' # grid used for the setup with vegetation when Transform() isn't told otherwise
+BatchRows=16 # rows from which the Python backend marches them together (the scalar loop is faster below)
+
+def Regrid(Xi,X,F):
+    """ linear interpolation of every row of F from grid X onto grid Xi """
+    return num.array([num.interp(Xi,X,row) for row in F])
+
+def Vegetation(h,Roots,Trunk,Canop,VegXloc,TrigRange):
+    """ vegetation properties in the segment of interest
+
+    Roots, Trunk, Canop: density, diameter and height of each layer
+    VegXloc: habitat code at each point (1 mangrove, 2 marsh, 3 seagrass)
+    TrigRange: the points of the segment
+
+    Returns the relative heights of the layers (each capped so the layers fill
+    at most the water column), the density*diameter of each layer, the
+    smoothed drag coefficient and whether any vegetation is present.
+    """
+    NRoots,dRoots,hRoots=[num.asarray(val)[TrigRange] for val in Roots]
+    NTrunk,dTrunk,hTrunk=[num.asarray(val)[TrigRange] for val in Trunk]
+    NCanop,dCanop,hCanop=[num.asarray(val)[TrigRange] for val in Canop]
+    Vegxloc=num.asarray(VegXloc)[TrigRange]
+    h=num.asarray(h,dtype=float)
+
+    # create relative depth values for roots, trunk and canopy
+    alphr=hRoots/h;alpht=hTrunk/h;alphc=hCanop/h
+    alpht=num.where(alphr>1,0,num.where(alphr+alpht>1,1-alphr,alpht)) # roots only; roots and trunk
+    alphc=num.where(alphr+alpht>=1,0,num.where(alphr+alpht+alphc>1,1-alphr-alpht,alphc)) # roots, trunk and canopy
+    alphr=num.minimum(alphr,1)
+
+    # drag coefficent for vegetation; mangrove and marsh win over seagrass if they overlap
+    CdVeg=num.zeros(len(h))
+    CdVeg[Vegxloc==1]=1 # mangrove
+    CdVeg[Vegxloc==2]=0.1 # marsh
+    CdVeg[Vegxloc==3]=0.1 # seagrass
+    CdVeg=SignalSmooth.smooth(CdVeg,int(len(CdVeg)*0.01),'hanning')
+
+    Present=sum(Vegxloc)<>0
+    return [alphr,alpht,alphc],[dRoots*NRoots,dTrunk*NTrunk,dCanop*NCanop],CdVeg,Present
+
+def MarchRows(dx,Ho,Cg,C,Hb,BrkCoef,FricCoef,VegCoef,RollCoef,NoBreak,backend):
+    """ marches every row of the (rows x points) inputs
+
+    Rows go one at a time through WaveKernel.March, unless the backend is numba
+    and there are several rows or the Python backend has BatchRows or more:
+    those go through WaveKernel.MarchBatch.  Returns the outputs of March() as
+    (rows x points) arrays.
+    """
+    if backend is None:
+        backend=WaveKernel.Backend
+    nr=len(Ho)
+    if (backend=='numba' and nr>1) or nr>=BatchRows:
+        return WaveKernel.MarchBatch(dx,Ho,Cg,C,Hb,BrkCoef,FricCoef,VegCoef,RollCoef,NoBreak,backend)
+    Out=[WaveKernel.March(dx,Ho[ii],Cg[ii],C[ii],Hb[ii],BrkCoef[ii],FricCoef[ii],VegCoef[ii],RollCoef[ii],NoBreak,backend)
+        for ii in range(nr)]
+    return [num.array([val[jj] for val in Out]) for jj in range(7)]
+
+def Transform(X,h,Ho,To,Etao=None,Cf=0.01,Plants=None,Grid='profile',NoBreak=0,backend=None):
+    """ wave transformation over one profile, with and without vegetation
+
+    X, h: cross-shore positions (1st point offshore) and still water depths
+    Ho, To: significant wave height and period at the first grid point, one
+        value per condition (scalars are used for every condition)
+    Etao: setup at the first grid point; if None, the setdown under the
+        incident wave (0 if NoBreak)
+    Cf: bottom friction coefficient
+    Plants: output of Vegetation(), or None for a bare bed
+    Grid: grid for the setup with vegetation; 'profile' uses X, 'fine' a
+        uniform 1m grid and 'adaptive' a grid from CPf_WaveSetup.AdaptiveGrid
+        that is 1m wherever depth, wave energy, roller energy or the drag on
+        the plants change quickly and coarser elsewhere (the bare-bed setup
+        then uses it too); None uses SetupGrid
+    NoBreak: if 1, breaking and the roller are switched off (flat bottom)
+    backend: marching backend passed on to CPf_WaveKernel
+
+    Wave kinematics and breaking heights are computed once and shared by the
+    vegetated and bare-bed solutions, which are marched by MarchRows.  Returns a
+    dictionary of (conditions x points) arrays: H, Eta and Ubot with
+    vegetation, Hs, Etas and Ubots on a bare bed, and Ds, Dss the energy dissipation
+    with and without vegetation.  SetupIter and SetupNodes hold the number
+    of setup iterations and grid nodes used for the setup with vegetation.
+    """
+    B=1.0;Beta=0.05
+    if Grid is None:
+        Grid=SetupGrid
+    if Grid not in SetupGrids:
+        raise ValueError, "Unknown setup grid: "+str(Grid)
+
+    # offshore conditions
+    Ho,To=num.broadcast_arrays(num.atleast_1d(num.asarray(Ho,dtype=float)),num.atleast_1d(num.asarray(To,dtype=float)))
+    fp=(1.0/To)[:,num.newaxis];sig=2.0*pi*fp # wave frequency and angular frequency
+    X=num.asarray(X,dtype=float);h=num.array(h,dtype=float)
+    dx=abs(X[1]-X[0]);nc=len(Ho)
+
+    # wave kinematics, one row per condition; periods that repeat come from the cache
+    Kin=[WaveKinematics.Kinematics(T,h) for T in To]
+    k=num.array([val[0] for val in Kin]);C=num.array([val[2] for val in Kin]);Cg=num.array([val[3] for val in Kin])
+    So=Ho*k[:,0]/(2.0*pi) # deep water wave steepness
+    Gam=(0.5+0.4*num.tanh(33.0*So))[:,num.newaxis] # Gam from Battjes and Stive 85 (as per Alsina & Baldock)
+
+    # terms that only depend on depth, period and vegetation; D=coef*H**3
+    Hb=0.88/k*num.tanh(Gam*k*h/0.88) # breaking wave height
+    BrkCoef=0.25*rho*g*fp*B/h # dissipation due to brkg, without the wave height terms
+    FricCoef=rho*Cf/(12.0*pi)*(2.0*pi*fp/num.sinh(k*h))**3.0 # dissipation due to bot friction
+    RollCoef=g*sin(Beta)/C # roller dissipation
+    Veg=Plants is not None and Plants[3] # bare bed waves only if there's vegetation (time saver)
+    if Veg:
+        alph,NDia,CdVeg=Plants[0],Plants[1],Plants[2]
+        ah=num.cumsum(alph,axis=0)*h # top of roots, trunk and canopy
+        s=[num.zeros(k.shape)]+[num.sinh(k*val) for val in ah]
+        CdDN=CdVeg*sum([NDia[ii]*(3*s[ii+1]-3*s[ii]+s[ii+1]**3-s[ii]**3) for ii in range(3)])
+        VegCoef=rho*CdDN*(k*g/(2.0*sig))**3.0/(2.0*sqrt(pi))/(3.0*k*num.cosh(k*h)**3) # dissipation due to vegetation
+        Rows=lambda val: num.concatenate([val,val]) # vegetated conditions first, then bare bed
+        Marched=MarchRows(dx,Rows(Ho/sqrt(2.0)),Rows(Cg),Rows(C),Rows(Hb),Rows(BrkCoef),
+            Rows(FricCoef),num.concatenate([VegCoef,0.0*VegCoef]),Rows(RollCoef),NoBreak,backend)
+        H,Ef,Er=[val[:nc] for val in Marched[:3]];Hs,Efs,Ers=[val[nc:] for val in Marched[:3]]
+    else:
+        H,Ef,Er=MarchRows(dx,Ho/sqrt(2.0),Cg,C,Hb,BrkCoef,FricCoef,0.0*k,RollCoef,NoBreak,backend)[:3]
+        Hs,Efs,Ers=H,Ef,Er
+
+    if Etao is None: # setdown under the incident wave
+        Etao=-0.125*H[:,0]**2.0*k[:,0]/num.sinh(2.0*k[:,0]*h[0])*(not NoBreak)
+    Etao=num.atleast_1d(num.asarray(Etao,dtype=float))*num.ones(nc)
+
+    # estimate MWS; vegetation adds the force on the plants, as if they were emergent
+    Ew=0.125*rho*g*H**2.0 # energy density
+    if Veg:
+        Fxg=rho*g*CdVeg*H**3.0*k/(12.0*pi*num.tanh(k*h))
+        fx=-Fxg*sum([alph[ii]*NDia[ii] for ii in range(3)]) # scale by height of indiv. elements
+    else:
+        fx=None
+    Ews=0.125*rho*g*Hs**2.0 # energy density in the absence of vegetation
+    if Grid=='profile':
+        Xi=X;dxi=dx
+    elif Grid=='fine': # use smaller dx to get smoother result
+        Xi=num.arange(X[0],X[-1]+1.0,1.0);dxi=1.0
+    else: # refine only where the forcing changes quickly, for both setups
+        Fields=[h,Ew,Er]
+        if Veg:
+            Fields=Fields+[fx,Ews,Ers]
+        Xi=WaveSetup.AdaptiveGrid(X,Fields);dxi=Xi
+    SetupNodes=len(Xi)
+
+    if Grid=='profile':
+        Eta,SetupIter=WaveSetup.Setup(dx,h,k,Ew,Er,Etao,fx)
+    else:
+        if fx is not None:
+            fx=Regrid(Xi,X,fx)
+        Eta,SetupIter=WaveSetup.Setup(dxi,num.interp(Xi,X,h),Regrid(Xi,X,k),Regrid(Xi,X,Ew),Regrid(Xi,X,Er),Etao,fx)
+        Eta=Regrid(X,Xi,Eta)
+
+    d=h
+    if Veg: # setup in the absence of vegetation; on the profile grid unless the grid is adaptive
+        if Grid=='adaptive':
+            Etas,SetupIters=WaveSetup.Setup(dxi,num.interp(Xi,X,h),Regrid(Xi,X,k),Regrid(Xi,X,Ews),Regrid(Xi,X,Ers),Etao)
+            Etas=Regrid(X,Xi,Etas)
+        else:
+            Etas,SetupIters=WaveSetup.Setup(dx,h,k,Ews,Ers,Etao)
+        d=h+Etas # water depth
+    else:
+        Etas=Eta.copy()
+
+    Out={}
+    Out['H']=H*sqrt(2);Out['Eta']=Eta
+    Out['Hs']=Hs*sqrt(2);Out['Etas']=Etas
+    Out['Ubot']=pi*H/(To[:,num.newaxis]*num.sinh(k*d)) # bottom velocity
+    Out['Ubots']=pi*Hs/(To[:,num.newaxis]*num.sinh(k*h)) # bottom velocity on a bare bed, as without Plants
+    Out['Ds']=-FiniteDiff.Gradient(Ef,dx);Out['Dss']=-FiniteDiff.Gradient(Efs,dx) # energy dissipation
+    Out['SetupIter']=SetupIter;Out['SetupNodes']=SetupNodes
+    return Out
+
+def WaveModelBatch(X,h,Ho,To,Etao,Roots,Trunk,Canop,VegXloc,TrigRange,backend=None):
+    """ WaveModel in CP1_WavesErosion for several offshore conditions at once
+
+    Ho, To, Etao: one value per condition (scalars are used for every condition)
+
+    Returns the wave height, setup, wave height and setup without vegetation
+    and the bottom orbital velocity as (conditions x points) arrays.
+    """
+    Plants=Vegetation(h,Roots,Trunk,Canop,VegXloc,TrigRange)
+    Out=Transform(X,h,Ho,To,Etao,0.01,Plants,None,0,backend)
+    return Out['H'],Out['Eta'],Out['Hs'],Out['Etas'],Out['Ubot']
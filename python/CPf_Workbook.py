@@ -0,0 +1,302 @@
+# Marine InVEST: Coastal Protection (Input Workbook)
+# Coded for ArcGIS 9.3, 10, 10.1
+
+import os, zipfile
+from xml.etree import ElementTree
+
+# The model inputs live in cells of the ModelInput and ReefShapeFactor sheets
+# of the Excel workbook.  Open() reads them straight from an .xlsx file, or
+# from a JSON or CSV file that names each input as in Layout, and returns a
+# Book whose sheets are read like the Excel COM ones: Range("f5").Value is a
+# value (None if empty) and Range("f49:m53").Value a tuple of rows.
+
+Layout=[ # name, sheet and cells of every input read by the CP1 scripts
+    ('MSL','ModelInput','f5'), # mean sea level
+    ('HighTide','ModelInput','g5'), # mean high water
+    ('Backshore','ModelInput','i10'), # 1 sandy beach, 2 marsh/mangrove
+    ('SedimentSize','ModelInput','e15'), # d50 [mm]
+    ('ScaleFactor','ModelInput','e17'), # sediment scale factor A
+    ('DuneHeight','ModelInput','j15'),
+    ('BermWidth','ModelInput','j16'),
+    ('BermElevation','ModelInput','j17'),
+    ('ForeshoreSlope','ModelInput','j18'),
+    ('DryDensity','ModelInput','e25'),
+    ('ErosionConstant','ModelInput','f25'),
+    ('ProfileModification','ModelInput','e33:g35'), # slope, offshore and shoreward distance of 3 modifications
+    ('HabitatID','ModelInput','e39:j39'),
+    ('HabitatName','ModelInput','e40:j40'),
+    ('DuneReduction','ModelInput','e45'), # [%]
+    ('Vegetation','ModelInput','f49:m53'), # mangrove roots, trunks, canopy, marsh and seagrass
+    ('CoralType','ModelInput','d56'),
+    ('Coral','ModelInput','e56:l56'),
+    ('OysterReefType','ModelInput','d59'),
+    ('OysterReef','ModelInput','e59:i59'),
+    ('ReefSlope','ReefShapeFactor','a2:a202'),
+    ('ReefKp','ReefShapeFactor','b2:b202'),
+    ('ReefKp2','ReefShapeFactor','c2:c202')]
+
+def CellIndex(Ref):
+    """ (row, column) of a cell reference such as "f49"; both start at 1 """
+    Ref=Ref.upper().replace("$","")
+    ii=0;col=0
+    while Ref[ii].isalpha():
+        col=col*26+ord(Ref[ii])-ord("A")+1
+        ii+=1
+    return int(Ref[ii:]),col
+
+def RangeIndex(Ref):
+    """ first and last (row, column) of a cell or range reference """
+    Cells=Ref.split(":")
+    return CellIndex(Cells[0]),CellIndex(Cells[-1])
+
+class Cells(object):
+    """ cells of a Range; Value (or value) reads and writes them """
+    def __init__(self,Store,Ref):
+        self.Store=Store
+        (self.r0,self.c0),(self.r1,self.c1)=RangeIndex(Ref)
+    def GetValue(self):
+        if (self.r0,self.c0)==(self.r1,self.c1):
+            return self.Store.get((self.r0,self.c0))
+        return tuple([tuple([self.Store.get((r,c)) for c in range(self.c0,self.c1+1)]) for r in range(self.r0,self.r1+1)])
+    def SetValue(self,Value):
+        if (self.r0,self.c0)==(self.r1,self.c1):
+            self.Store[(self.r0,self.c0)]=Value
+            return
+        Rows=RangeRows(Value,self.r1-self.r0+1,self.c1-self.c0+1)
+        for r in range(len(Rows)):
+            for c in range(len(Rows[r])):
+                self.Store[(self.r0+r,self.c0+c)]=Rows[r][c]
+    Value=property(GetValue,SetValue)
+    value=Value
+
+class Sheet:
+    """ a worksheet of a Book """
+    def __init__(self,Store):
+        self.Store=Store
+    def Range(self,Ref):
+        return Cells(self.Store,Ref)
+
+class Book:
+    """ the input cells of a workbook, JSON or CSV parameter file """
+    def __init__(self,FileName,Format,Sheets):
+        self.FileName=FileName;self.Format=Format;self.Sheets=Sheets
+    def Worksheets(self,Name):
+        if Name not in self.Sheets:
+            self.Sheets[Name]={}
+        return Sheet(self.Sheets[Name])
+    def Save(self,FileName=None):
+        """ writes the inputs back to a JSON or CSV file (FileName by default) """
+        if FileName is None:
+            FileName=self.FileName
+        Export(self,FileName)
+
+def RangeRows(Value,nr,nc):
+    """ value of a range as a list of rows; a flat list fills a single row or column """
+    Value=list(Value)
+    if len(Value) and not isinstance(Value[0],(list,tuple)):
+        if nr==1:
+            return [Value]
+        return [[val] for val in Value]
+    return [list(row) for row in Value]
+
+def Format(FileName):
+    """ 'xlsx', 'json', 'csv' or 'excel' (any other workbook, read through Excel) """
+    Ext=os.path.splitext(FileName)[1].lower()
+    if Ext in ['.xlsx','.xlsm']:
+        return 'xlsx'
+    elif Ext in ['.json','.csv']:
+        return Ext[1:]
+    return 'excel'
+
+def Local(tag):
+    # tag without its XML namespace
+    return tag.split("}")[-1]
+
+def Children(Node,Name):
+    return [child for child in Node if Local(child.tag)==Name]
+
+def Text(Node):
+    # text of all the t elements under Node (rich text runs are concatenated)
+    return "".join([el.text or "" for el in Node.getiterator() if Local(el.tag)=="t"])
+
+def ReadXlsx(FileName):
+    """ cell values of every sheet of an .xlsx workbook: {sheet: {(row, column): value}}
+
+    Numbers are floats, text is unicode and formulas give their last
+    computed value, as Excel returns them.
+    """
+    Zip=zipfile.ZipFile(FileName,"r")
+    try:
+        Names=Zip.namelist()
+        Targets={}
+        for Rel in ElementTree.fromstring(Zip.read("xl/_rels/workbook.xml.rels")):
+            Target=Rel.get("Target")
+            if Target.startswith("/"):
+                Target=Target[1:]
+            else:
+                Target="xl/"+Target
+            Targets[Rel.get("Id")]=Target
+        Strings=[]
+        if "xl/sharedStrings.xml" in Names:
+            Strings=[Text(si) for si in ElementTree.fromstring(Zip.read("xl/sharedStrings.xml")) if Local(si.tag)=="si"]
+
+        Sheets={}
+        Workbook=ElementTree.fromstring(Zip.read("xl/workbook.xml"))
+        for Node in Workbook.getiterator():
+            if Local(Node.tag)<>"sheet":
+                continue
+            Id=[val for key,val in Node.items() if Local(key)=="id"][0]
+            Store={}
+            for c in ElementTree.fromstring(Zip.read(Targets[Id])).getiterator():
+                if Local(c.tag)<>"c":
+                    continue
+                Type=c.get("t","n");v=Children(c,"v")
+                if Type=="inlineStr":
+                    Value=Text(c)
+                elif not v or v[0].text is None:
+                    continue
+                elif Type=="s":
+                    Value=Strings[int(v[0].text)]
+                elif Type in ["str","e"]:
+                    Value=v[0].text
+                elif Type=="b":
+                    Value=v[0].text=="1"
+                else:
+                    Value=float(v[0].text)
+                Store[CellIndex(c.get("r"))]=Value
+            Sheets[Node.get("name")]=Store
+    finally:
+        Zip.close()
+    return Sheets
+
+def ReadExcel(FileName):
+    # the Layout cells read through Excel, for workbooks that aren't .xlsx
+    from win32com.client import Dispatch
+    xlApp=Dispatch("Excel.Application")
+    xlApp.Visible=0
+    xlApp.DisplayAlerts=0
+    xlApp.Workbooks.Open(FileName)
+    try:
+        Sheets={}
+        for Name,SheetName,Ref in Layout:
+            Sheets.setdefault(SheetName,{})
+            Cells(Sheets[SheetName],Ref).Value=xlApp.Worksheets(SheetName).Range(Ref).Value
+    finally:
+        xlApp.ActiveWorkbook.Close(SaveChanges=0)
+        xlApp.Quit()
+    return Sheets
+
+def ImportJSON():
+    try:
+        import json
+    except ImportError: # Python 2.5
+        import simplejson as json
+    return json
+
+def ParseValue(Value):
+    # CSV value: number, empty (None), TRUE/FALSE or text
+    Value=Value.strip()
+    if Value=="":
+        return None
+    elif Value.upper() in ["TRUE","FALSE"]:
+        return Value.upper()=="TRUE"
+    try:
+        return float(Value)
+    except ValueError:
+        return Value
+
+def CSVText(Value):
+    # text of a value in a CSV file
+    if Value is None:
+        return ""
+    elif isinstance(Value,float):
+        return repr(Value)
+    return str(Value)
+
+def ReadCSV(FileName):
+    """ named inputs from lines "Name,value,value,..."; a range with several
+    rows repeats its name on consecutive lines; # starts a comment """
+    Params={}
+    for line in open(FileName,"r").read().split("\n"):
+        line=line.strip()
+        if not line or line.startswith("#"):
+            continue
+        Row=line.split(",")
+        Name=Row[0].strip();Values=[ParseValue(val) for val in Row[1:]]
+        Params.setdefault(Name,[]).append(Values)
+    for Name in Params.keys():
+        Rows=Params[Name]
+        if len(Rows)==1 and len(Rows[0])==1:
+            Params[Name]=Rows[0][0]
+        elif len(Rows)==1:
+            Params[Name]=Rows[0]
+    return Params
+
+def Floats(Value):
+    # numbers as floats, as Excel returns them
+    if isinstance(Value,(list,tuple)):
+        return [Floats(val) for val in Value]
+    elif isinstance(Value,(int,long)) and not isinstance(Value,bool):
+        return float(Value)
+    return Value
+
+def Cells2Sheets(Params):
+    # cell values of named inputs, placed as in Layout
+    Known=dict([(Name,(SheetName,Ref)) for Name,SheetName,Ref in Layout])
+    Sheets=dict([(SheetName,{}) for Name,SheetName,Ref in Layout])
+    for Name,Value in Params.items():
+        if Name not in Known:
+            raise ValueError, "Unknown model input: "+str(Name)
+        SheetName,Ref=Known[Name]
+        Cells(Sheets[SheetName],Ref).Value=Floats(Value)
+    return Sheets
+
+def Open(FileName):
+    """ reads the model inputs of an .xlsx, JSON or CSV file (other workbooks
+    go through Excel) and returns a Book """
+    Kind=Format(FileName)
+    if Kind=='xlsx':
+        Sheets=ReadXlsx(FileName)
+    elif Kind=='json':
+        Sheets=Cells2Sheets(ImportJSON().load(open(FileName,"r")))
+    elif Kind=='csv':
+        Sheets=Cells2Sheets(ReadCSV(FileName))
+    else:
+        Sheets=ReadExcel(FileName)
+    return Book(FileName,Kind,Sheets)
+
+def Parameters(Input):
+    """ named inputs of a Book, as in Layout; ranges are lists of rows, or a
+    flat list for a single row or column """
+    Params={}
+    for Name,SheetName,Ref in Layout:
+        Value=Input.Worksheets(SheetName).Range(Ref).Value
+        if isinstance(Value,tuple):
+            Value=[list(row) for row in Value]
+            if len(Value)==1:
+                Value=Value[0]
+            elif len(Value[0])==1:
+                Value=[row[0] for row in Value]
+        Params[Name]=Value
+    return Params
+
+def Export(Input,FileName):
+    """ writes the inputs of a Book to a JSON or CSV parameter file """
+    Params=Parameters(Input)
+    Out=open(FileName,"w")
+    try:
+        if Format(FileName)=='json':
+            ImportJSON().dump(Params,Out,indent=1,sort_keys=True)
+        elif Format(FileName)=='csv':
+            for Name,SheetName,Ref in Layout:
+                Value=Params[Name]
+                if not isinstance(Value,list):
+                    Value=[[Value]]
+                elif not isinstance(Value[0],list):
+                    Value=[Value]
+                for Row in Value:
+                    Out.write(Name+","+",".join([CSVText(val) for val in Row])+"\n")
+        else:
+            raise ValueError, "Parameters can only be saved as JSON or CSV: "+FileName
+    finally:
+        Out.close()
@@ -0,0 +1,83 @@
+# Marine InVEST: Coastal Protection (Erosion tests)
+# run with: python -m unittest test_CPf_Erosion
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as num
+import CPf_Profile as Profile
+import CPf_Workbook as Workbook
+import CPf_Site as Site
+import CPf_Erosion as Erosion
+
+# retreats [m] of the initial conditions and of the management action given
+# by CP1_WavesErosion (scenario E: the management action moves the seagrass
+# bed) on a 1:83 beach with a 1 m surge and a 12 hour storm, for the dune
+# reduction [%], Ho [m] and To [s]
+Pinned=[((0.0,2.0,8.0),13.627543,19.537375),
+    ((50.0,2.0,8.0),13.627543,23.801324),
+    ((50.0,1.0,6.0),3.859717,8.009251),
+    ((0.0,3.0,10.0),28.150050,35.730572),
+    ((50.0,3.0,10.0),28.150050,42.227020)]
+
+def Inputs(Vegetation,DuneReduction):
+    # sandy beach parameters with one habitat
+    Empty=[0]*8
+    return {'MSL':0.0,'HighTide':1.0,'Backshore':1,'SedimentSize':0.3,'ScaleFactor':0.1,
+        'DuneHeight':2.0,'BermWidth':20.0,'BermElevation':1.5,'ForeshoreSlope':10.0,
+        'DryDensity':900.0,'ErosionConstant':0.001,'ProfileModification':[[0,0,0]]*3,
+        'HabitatID':[0]*6,'HabitatName':['']*6,'DuneReduction':DuneReduction,
+        'Vegetation':[Empty]*4+[Vegetation],'CoralType':'None','Coral':Empty,
+        'OysterReefType':'Dome','OysterReef':[0]*5,'ReefSlope':list(num.linspace(0.05,2,201)),
+        'ReefKp':[0.1]*201,'ReefKp2':[0.1]*201}
+
+class ScenarioRetreatTest(unittest.TestCase):
+    """ batch retreats against CP1_WavesErosion """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.Dir=tempfile.mkdtemp()
+        X=num.arange(-100,900,1.0)
+        Profile.Write(os.path.join(cls.Dir,"Profile.txt"),X,2-12*(X+100)/1000.)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.Dir)
+
+    def setUp(self):
+        Erosion.ClearCache()
+
+    def Sites(self,Vegetation,DuneReduction):
+        FileName=os.path.join(self.Dir,"Inputs.json")
+        Out=open(FileName,"w")
+        Workbook.ImportJSON().dump(Inputs(Vegetation,DuneReduction),Out)
+        Out.close()
+        return Site.Site(FileName,os.path.join(self.Dir,"Profile.txt"),1.0,12.0)[:2]
+
+    def test_Script(self):
+        # seagrass from 100 to 500 m offshore, from 50 to 400 m with the management action
+        for (Reduction,Ho,To),R1,R2 in Pinned:
+            Initial,Management=self.Sites([0.5,0.01,500,100,400,150,400,50],Reduction)
+            (Bare,Hab),(Bare2,HabMA)=Erosion.ScenarioRetreat(Initial,Management,Ho,To,1.0,Initial['A'])
+            self.assertAlmostEqual(float(Hab[0]),R1,5)
+            self.assertAlmostEqual(float(HabMA[0]),R2,5)
+
+    def test_Events(self):
+        # a batch of storms gives the retreats of the storms taken one at a time,
+        # within the setup tolerance (the batch iterates until all storms converge)
+        Initial,Management=self.Sites([0.5,0.01,500,100,400,150,400,50],50.0)
+        Ho=num.array([1.0,2.0,3.0]);To=num.array([6.0,8.0,10.0]);S=num.ones(3)
+        Pairs=Erosion.ScenarioRetreat(Initial,Management,Ho,To,S,Initial['A'])
+        for ii in range(3):
+            One=Erosion.ScenarioRetreat(Initial,Management,Ho[ii],To[ii],1.0,Initial['A'])
+            for Case in range(2):
+                self.assertAlmostEqual(float(Pairs[Case][1][ii]),float(One[Case][1][0]),5)
+
+    def test_NoHabitat(self):
+        Initial,Management=self.Sites([0]*8,50.0)
+        for Bare,Hab in Erosion.ScenarioRetreat(Initial,Management,2.0,8.0,1.0,Initial['A']):
+            self.assertAlmostEqual(float(Hab[0]),float(Bare[0]),8)
+
+if __name__=="__main__":
+    unittest.main()
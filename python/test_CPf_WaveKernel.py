@@ -0,0 +1,64 @@
+# Marine InVEST: Coastal Protection (Wave Energy Flux Marching Kernel tests)
+# run with: python -m unittest test_CPf_WaveKernel
+
+import sys
+import unittest
+import CPf_WaveKernel as WaveKernel
+
+Tolerance=1e-9 # largest relative difference allowed between backends
+
+class CheckBackendsTest(unittest.TestCase):
+    """ every marching backend against the Python one """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.Diff=WaveKernel.CheckBackends(lx=2000)
+
+    def Check(self,Name):
+        if Name.startswith('numba') and 'numba' not in WaveKernel.Backends:
+            self.skipTest("numba is not installed")
+        self.assertTrue(self.Diff[Name]<Tolerance,"%s: %g" % (Name,self.Diff[Name]))
+
+    def test_Python(self):
+        self.Check('python');self.Check('python batch')
+
+    def test_Numba(self):
+        self.Check('numba');self.Check('numba batch')
+
+    def test_Operators(self):
+        self.Check('operators')
+
+class BrokenNumbaTest(unittest.TestCase):
+    """ numba is found but fails to import: the march falls back to the Python backend """
+
+    def setUp(self):
+        self.Saved=dict([(name,getattr(WaveKernel,name)) for name in ['MarchLoopJIT','Backends','Backend']])
+        self.Numba=sys.modules.get('numba')
+        sys.modules['numba']=None # import numba raises ImportError
+        WaveKernel.MarchLoopJIT=None;WaveKernel.Backends=['python','numba'];WaveKernel.Backend='numba'
+        self.Inputs=([5.0]*10,[5.0]*10,[2.0]*10,[0.0]*10,[0.0]*10,[0.0]*10,[0.0]*10)
+
+    def tearDown(self):
+        if self.Numba is None:
+            del sys.modules['numba']
+        else:
+            sys.modules['numba']=self.Numba
+        for name,val in self.Saved.items():
+            setattr(WaveKernel,name,val)
+
+    def Fallback(self):
+        self.assertEqual(WaveKernel.Backend,'python')
+        self.assertEqual(WaveKernel.Backends,['python'])
+
+    def test_March(self):
+        H=WaveKernel.March(1.0,1.0,*self.Inputs)[0]
+        self.assertEqual(H[-1],1.0)
+        self.Fallback()
+
+    def test_MarchBatch(self):
+        H=WaveKernel.MarchBatch(1.0,[1.0,0.5],*self.Inputs)[0]
+        self.assertEqual(list(H[:,-1]),[1.0,0.5])
+        self.Fallback()
+
+if __name__=="__main__":
+    unittest.main()
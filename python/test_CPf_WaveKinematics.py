@@ -0,0 +1,51 @@
+# Marine InVEST: Coastal Protection (Wave Kinematics tests)
+# run with: python -m unittest test_CPf_WaveKinematics
+
+import unittest
+import numpy as num
+from math import pi
+import CPf_WaveKinematics as WaveKinematics
+import CPf_Erosion as Erosion
+
+g=9.81
+
+# breaking depth and Kriebel-Dean retreat (method 1, method 2) with the Newton
+# wave number; the fixed-point solver gave 2.1688, 4.6001, 6.4199 m for the
+# breaking depth and 7.9206, 16.4339, 10.5615 m for the method 2 retreat
+Pinned=[((0.1,1.0,6.0),2.096593,3.071362,7.351984),
+    ((0.1,2.0,8.0),4.441481,7.720408,15.557261),
+    ((0.15,3.0,10.0),6.188544,4.978747,9.875774)]
+
+class WaveNumberTest(unittest.TestCase):
+    """ Newton wave number against the dispersion relation """
+
+    def test_Dispersion(self):
+        h=num.array([0.1,0.5,1.0,5.0,20.0,200.0])
+        for T in [2.0,6.0,12.0,20.0]:
+            sigma=2.0*pi/T
+            k=WaveKinematics.WaveNumber(sigma,h)
+            self.assertTrue(num.allclose(g*k*num.tanh(k*h),sigma**2,rtol=1e-10))
+
+    def test_Dry(self):
+        k=WaveKinematics.WaveNumber(1.0,num.array([2.0,0.0,-1.0]))
+        self.assertTrue(k[0]>0)
+        self.assertTrue(num.isnan(k[1:]).all())
+
+class ModelOutputTest(unittest.TestCase):
+    """ model outputs that depend on the wave number """
+
+    def setUp(self):
+        WaveKinematics.ClearCache();Erosion.ClearCache()
+
+    def test_BreakingDepth(self):
+        for (A,Ho,To),hb,R1,R2 in Pinned:
+            self.assertAlmostEqual(Erosion.BreakingDepth(A,Ho,To),hb,4)
+
+    def test_KDRetreat(self):
+        for (A,Ho,To),hb,R1,R2 in Pinned:
+            Out=Erosion.KDRetreat(A,Ho,To,12.0,1.6,1.5,2.0,20.0,0.1)
+            self.assertAlmostEqual(float(Out[1]),R1,4)
+            self.assertAlmostEqual(float(Out[2]),R2,4)
+
+if __name__=="__main__":
+    unittest.main()
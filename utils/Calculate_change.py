@@ -11,10 +11,16 @@
 # ---------------------------------------------------------------------------
 
 # Import system modules
-import sys, string, os, arcgisscripting, time, datetime
+import sys, string, os, time, datetime
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+import CPf_Geoprocessor as Geoprocessor
 
 # Create the Geoprocessor object
-gp = arcgisscripting.create()
+gp = Geoprocessor.Create(Requires=[
+    "AddField","CreateFolder_management","CreateTable_management",
+    "Delete_management","DeleteField_management","InsertCursor","Minus_sa",
+    "SearchCursor","SingleOutputMapAlgebra_sa","UpdateCursor",
+    "ZonalStatistics_sa","ZonalStatisticsAsTable_sa"])
 
 # Check out any necessary licenses
 gp.CheckOutExtension("spatial")
@@ -11,10 +11,17 @@
 # ---------------------------------------------------------------------------
 
 # Import system modules
-import sys, string, os, arcgisscripting, time, datetime
+import sys, string, os, time, datetime
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+import CPf_Geoprocessor as Geoprocessor
 
 # Create the Geoprocessor object
-gp = arcgisscripting.create()
+gp = Geoprocessor.Create(Requires=[
+    "AddField_management","CalculateField_management",
+    "CreateFolder_management","Delete_management","DeleteField_management",
+    "Dissolve_management","Divide_sa","GetRasterProperties_management",
+    "RasterToPolygon_conversion","SearchCursor","Slice_sa","Times_sa",
+    "UpdateCursor","WeightedSum_sa","ZonalStatisticsAsTable_sa"])
 
 # Check out any necessary licenses
 gp.CheckOutExtension("spatial")
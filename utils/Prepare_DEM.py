@@ -11,10 +11,18 @@
 # ---------------------------------------------------------------------------
 
 # Import system modules
-import sys, string, os, arcgisscripting, time, datetime
+import sys, string, os, time, datetime
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+import CPf_Geoprocessor as Geoprocessor
 
 # Create the Geoprocessor object
-gp = arcgisscripting.create()
+gp = Geoprocessor.Create(Requires=[
+    "AddField_management","BuildRasterAttributeTable_management",
+    "CalculateField_management","CopyFeatures_management","CopyRaster",
+    "CopyRaster_management","CreateFolder_management","Delete_management",
+    "FeatureToRaster_conversion","Fill_sa","FlowDirection_sa","Idw_sa",
+    "Minus_sa","RasterToPoint_conversion","SearchCursor",
+    "SingleOutputMapAlgebra_sa"])
 
 # Check out any necessary licenses
 gp.CheckOutExtension("spatial")